@@ -0,0 +1,151 @@
+"""
+Load test of the public read-only pages: gunicorn sync workers (wsgi.py, the sync
+views) against uvicorn workers (asgi.py, the async views on a connection pool).
+
+Both servers run the same number of worker processes against the same seeded
+PostgreSQL database; an aiohttp client keeps BENCHMARK_CONCURRENCY requests in
+flight over the fixtures, results, table, stats and sponsors pages and reports
+throughput and latency percentiles for each.
+
+    BENCHMARK_DATABASE_URL=postgres://... python -m benchmarks.async_load
+
+The database is migrated and, when empty, seeded with benchmarks.seed.
+"""
+
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "iccl_league_app.settings_benchmark")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from benchmarks.seed import seed_league  # noqa: E402
+from league.models import Tournament  # noqa: E402
+
+REQUESTS = int(os.getenv("BENCHMARK_REQUESTS", "2000"))
+CONCURRENCY = int(os.getenv("BENCHMARK_CONCURRENCY", "32"))
+WORKERS = int(os.getenv("BENCHMARK_WORKERS", "2"))
+PAGES = ["fixtures/", "results/", "table/", "stats/", "sponsors/"]
+
+SERVERS = {
+    "wsgi (sync views)": ["iccl_league_app.wsgi"],
+    "asgi (async views)": [
+        "iccl_league_app.asgi",
+        "--worker-class",
+        "uvicorn_worker.UvicornWorker",
+    ],
+}
+
+
+def prepare_database():
+    """Migrates the benchmark database and seeds it once; returns a tournament id."""
+    call_command("migrate", verbosity=0)
+    if not Tournament.objects.exists():
+        seed_league()
+    tournament = Tournament.objects.order_by("id").last()
+    connection.close()
+    return tournament.id
+
+
+def start_server(args, port):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="iccl_league_app.settings_benchmark")
+    if "uvicorn_worker.UvicornWorker" in args:
+        env.update(DATABASE_POOL="True", DJANGO_ASYNC_PARALLEL_QUERIES="True")
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            *args,
+            f"--bind=127.0.0.1:{port}",
+            f"--workers={WORKERS}",
+            "--log-level=warning",
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+async def wait_until_up(session, base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with session.get(f"{base_url}/healthz") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{base_url} did not start")
+        await asyncio.sleep(0.2)
+
+
+async def drive(base_url, tournament_id):
+    """Keeps CONCURRENCY requests in flight; returns (seconds, latencies in ms)."""
+    urls = [
+        f"{base_url}/t/{tournament_id}/{PAGES[n % len(PAGES)]}" for n in range(REQUESTS)
+    ]
+    latencies = []
+
+    async with aiohttp.ClientSession() as session:
+        await wait_until_up(session, base_url)
+        # Warm every worker's connections and template caches first.
+        for url in urls[: len(PAGES) * WORKERS]:
+            async with session.get(url) as response:
+                await response.read()
+
+        async def client(queue):
+            while queue:
+                url = queue.pop()
+                start = time.perf_counter()
+                async with session.get(url) as response:
+                    await response.read()
+                    if response.status != 200:
+                        raise RuntimeError(f"{url} returned {response.status}")
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client(urls) for _ in range(CONCURRENCY)))
+        return time.perf_counter() - start, latencies
+
+
+def main():
+    tournament_id = prepare_database()
+    print(
+        f"{REQUESTS} requests, {CONCURRENCY} concurrent, {WORKERS} workers "
+        f"against {connection.settings_dict['HOST']}"
+    )
+    print(f"{'server':<20} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for port, (name, args) in enumerate(SERVERS.items(), start=8701):
+        server = start_server(args, port)
+        try:
+            seconds, latencies = asyncio.run(
+                drive(f"http://127.0.0.1:{port}", tournament_id)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        percentiles = statistics.quantiles(latencies, n=20)
+        print(
+            f"{name:<20} {len(latencies) / seconds:>8.1f} "
+            f"{statistics.median(latencies):>8.1f} {percentiles[-1]:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
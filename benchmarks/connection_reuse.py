@@ -0,0 +1,86 @@
+"""
+Measures per-request database connection setup for the three connection modes:
+
+- per-request: CONN_MAX_AGE=0, the old behaviour (a new connection per request)
+- persistent:  CONN_MAX_AGE=600 with health checks (gunicorn sync workers)
+- pool:        psycopg connection pool (the ASGI entry point)
+
+Requests go through Django's full WSGI handler, so the request_started /
+request_finished signals close (or keep) connections exactly as in production.
+
+    BENCHMARK_DATABASE_URL=postgres://... python -m benchmarks.connection_reuse
+"""
+
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "iccl_league_app.settings_benchmark")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.backends.signals import connection_created  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+
+from iccl_league_app.settings import database_pool_options  # noqa: E402
+
+REQUESTS = int(os.getenv("BENCHMARK_REQUESTS", "200"))
+URL = "/healthz"
+
+
+def run(mode, requests=REQUESTS):
+    """Serves ``requests`` health checks in ``mode``; returns (backends, latencies)."""
+    connection.close()
+    if connection.pool is not None:
+        connection.close_pool()
+
+    db = connection.settings_dict
+    db["OPTIONS"].pop("pool", None)
+    db["CONN_HEALTH_CHECKS"] = mode != "per-request"
+    db["CONN_MAX_AGE"] = 600 if mode == "persistent" else 0
+    if mode == "pool":
+        db["OPTIONS"]["pool"] = database_pool_options()
+
+    backends = set()
+
+    def record_backend(sender, connection, **kwargs):
+        backends.add(connection.connection.info.backend_pid)
+
+    connection_created.connect(record_backend)
+    handler = WSGIHandler()
+    environ = RequestFactory().get(URL, HTTP_HOST="127.0.0.1").environ
+    latencies = []
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = handler(dict(environ), lambda status, headers: None)
+            b"".join(response)
+            response.close()
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        connection_created.disconnect(record_backend)
+        connection.close()
+    return backends, latencies
+
+
+def main():
+    print(f"{REQUESTS} requests to {URL} against {connection.settings_dict['HOST']}")
+    print(f"{'mode':<12} {'backends':>9} {'mean ms':>9} {'p95 ms':>9}")
+    for mode in ("per-request", "persistent", "pool"):
+        backends, latencies = run(mode)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(
+            f"{mode:<12} {len(backends):>9} "
+            f"{statistics.mean(latencies):>9.2f} {p95:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
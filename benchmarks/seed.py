@@ -0,0 +1,134 @@
+"""
+Seeds a multi-season league for the query-plan tests and the load benchmarks.
+"""
+
+from datetime import date, timedelta
+
+from django.db import connection
+
+from league.models import (
+    Tournament,
+    Team,
+    Player,
+    Match,
+    Team_Standing,
+    Goal,
+    Card,
+    TeamOfTheWeek,
+    MATCH_TIMES,
+)
+
+TOURNAMENTS = 20
+TEAMS_PER_TOURNAMENT = 10
+PLAYERS_PER_TEAM = 12
+
+
+def seed_league():
+    """
+    Bulk-creates a multi-season league large enough for the planner to prefer
+    indexes: 20 tournaments, 10 teams each, a full round robin of results with
+    standings, goals, cards and team of the week rows.
+    """
+    weeks = TEAMS_PER_TOURNAMENT - 1
+    tournaments = Tournament.objects.bulk_create(
+        Tournament(
+            short_description=f"ICCL {n}",
+            tournament_start_date=date(2005 + n, 6, 1),
+        )
+        for n in range(TOURNAMENTS)
+    )
+
+    teams = Team.objects.bulk_create(
+        Team(name=f"T{t.pk} Team {n}", tournament=t)
+        for t in tournaments
+        for n in range(TEAMS_PER_TOURNAMENT)
+    )
+    players = Player.objects.bulk_create(
+        Player(name=f"{team.name} Player {n}", team=team, tournament=team.tournament)
+        for team in teams
+        for n in range(PLAYERS_PER_TEAM)
+    )
+    squads = {}
+    for player in players:
+        squads.setdefault(player.team_id, []).append(player)
+
+    matches = []
+    for tournament in tournaments:
+        rotation = [team for team in teams if team.tournament_id == tournament.pk]
+        for week in range(1, weeks + 1):
+            match_date = tournament.tournament_start_date + timedelta(weeks=week)
+            for slot in range(TEAMS_PER_TOURNAMENT // 2):
+                home, away = rotation[slot], rotation[-slot - 1]
+                matches.append(
+                    Match(
+                        week_number=week,
+                        match_date=match_date,
+                        kickoff=MATCH_TIMES[slot % len(MATCH_TIMES)],
+                        home_team=home,
+                        away_team=away,
+                        home_score=(week + slot) % 4,
+                        away_score=(week * slot) % 3,
+                        is_played=True,
+                        mom=squads[home.pk][week % PLAYERS_PER_TEAM],
+                        tournament=tournament,
+                    )
+                )
+            rotation.insert(1, rotation.pop())
+    matches = Match.objects.bulk_create(matches)
+
+    standings, goals, cards = [], [], []
+    for match in matches:
+        for team in (match.home_team, match.away_team):
+            standings.append(
+                Team_Standing(
+                    name=team.name,
+                    matches_played=match.week_number,
+                    points=match.week_number,
+                    match=match,
+                    tournament=match.tournament,
+                )
+            )
+        for n in range(match.home_score):
+            goals.append(
+                Goal(
+                    match=match,
+                    player=squads[match.home_team.pk][n],
+                    tournament=match.tournament,
+                )
+            )
+        cards.append(
+            Card(
+                match=match,
+                player=squads[match.away_team.pk][match.week_number % PLAYERS_PER_TEAM],
+                card_type="RED" if match.week_number % 5 == 0 else "YELLOW",
+                tournament=match.tournament,
+            )
+        )
+    Team_Standing.objects.bulk_create(standings)
+    Goal.objects.bulk_create(goals)
+    Card.objects.bulk_create(cards)
+
+    totw = []
+    for tournament in tournaments:
+        pool = [p for p in players if p.tournament_id == tournament.pk]
+        for week in range(1, weeks + 1):
+            picks = pool[week:][:6]
+            totw.append(
+                TeamOfTheWeek(
+                    week_number=week,
+                    weekend_date=tournament.tournament_start_date
+                    + timedelta(weeks=week),
+                    goal_keeper=picks[0],
+                    left_defence=picks[1],
+                    right_defence=picks[2],
+                    left_mid=picks[3],
+                    right_mid=picks[4],
+                    striker=picks[5],
+                    tournament=tournament,
+                )
+            )
+    TeamOfTheWeek.objects.bulk_create(totw)
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return tournaments
@@ -11,6 +11,12 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "iccl_league_app.iccl_league_app.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "iccl_league_app.settings")
+
+# Requests are served from a thread pool under ASGI, so per-thread persistent
+# connections would pile up; share a psycopg connection pool instead.
+os.environ.setdefault("DATABASE_POOL", "True")
+# Serve the public read-only pages from the async views (league/async_views.py).
+os.environ.setdefault("DJANGO_ASYNC_VIEWS", "True")
 
 application = get_asgi_application()
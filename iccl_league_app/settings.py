@@ -11,12 +11,12 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import copy
 import os  # Add this at the top if not already there
 # from dotenv import load_dotenv
 import environ
 
 BASE_DIR = Path(__file__).resolve().parent.parent  # This defines BASE_DIR
-print(BASE_DIR)
 # Load environment variables from .env file
 # load_dotenv(os.path.join(BASE_DIR, ".env"))
 env = environ.Env()
@@ -28,15 +28,6 @@ with open(os.path.join(BASE_DIR, ".env")) as f:
             key, value = line.strip().split("=", 1)
             os.environ[key] = value  # force override
             
-print(os.getenv("DJANGO_DEBUG"))
-print(os.getenv("DATABASE_NAME"))
-print(os.getenv("DATABASE_USER"))
-print(os.getenv("DATABASE_HOST"))
-print(os.getenv("DATABASE_PORT"))
-print(os.getenv("DATABASE_PASSWORD"))
-
-print("DEBUG from .env:", env("DJANGO_DEBUG", default="NOT FOUND"))
-print("DEBUG from os.environ:", os.environ.get("DATABASE_HOST"))
 
 CLOUDINARY_STORAGE = {
     "CLOUD_NAME": os.environ.get("CLOUDINARY_CLOUD_NAME"),
@@ -88,22 +79,28 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "league.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "tracking.middleware.VisitorTrackingMiddleware",
+    "league.middleware.StalePageMiddleware",
+    "league.middleware.PrimaryPinningMiddleware",
+    "league.middleware.BufferedTrackingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "league.middleware.ProfilerMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "league.middleware.TournamentMiddleware",
 ]
 
 ROOT_URLCONF = "iccl_league_app.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates, timing each render for the /metrics endpoint
+        "BACKEND": "league.metrics.TimedDjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -126,6 +123,30 @@ WSGI_APPLICATION = "iccl_league_app.wsgi.application"
 
 # iccl_league_app/settings.py
 
+# Connection reuse: opening a TLS connection to the hosted Postgres costs more than
+# most of our queries, so never open one per request.
+# - DATABASE_POOL=True: a psycopg (v3) connection pool shared by the threads of a
+#   process. Required for the ASGI entry point (asgi.py turns it on), where
+#   persistent per-thread connections are not safe.
+# - otherwise: persistent connections kept for DATABASE_CONN_MAX_AGE seconds per
+#   gunicorn worker.
+# CONN_HEALTH_CHECKS checks a reused connection before handing it out, because the
+# hosted database drops idle connections: Django pings persistent connections, and
+# passes ConnectionPool.check_connection to the pool as its ``check`` callback.
+DATABASE_POOL = os.getenv("DATABASE_POOL") == "True"
+DATABASE_CONN_MAX_AGE = int(os.getenv("DATABASE_CONN_MAX_AGE", "600"))
+
+
+def database_pool_options():
+    """psycopg_pool.ConnectionPool options for DATABASES["default"]["OPTIONS"]."""
+    return {
+        "min_size": int(os.getenv("DATABASE_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DATABASE_POOL_MAX_SIZE", "10")),
+        "timeout": float(os.getenv("DATABASE_POOL_TIMEOUT", "10")),
+        "max_idle": float(os.getenv("DATABASE_POOL_MAX_IDLE", "300")),
+    }
+
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",  # Use the postgres SQL
@@ -135,9 +156,89 @@ DATABASES = {
         "HOST": os.getenv("DATABASE_HOST"),
         "PORT": os.getenv("DATABASE_PORT"),
         "OPTIONS": {"sslmode": "require"},
+        "CONN_MAX_AGE": 0 if DATABASE_POOL else DATABASE_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+if DATABASE_POOL:
+    DATABASES["default"]["OPTIONS"]["pool"] = database_pool_options()
+
+# Optional streaming read replica: public league pages read from it, admin pages and
+# all writes use the primary (see league/routers.py).
+if os.getenv("DATABASE_REPLICA_HOST"):
+    DATABASES["replica"] = copy.deepcopy(DATABASES["default"])
+    DATABASES["replica"].update(
+        {
+            "HOST": os.getenv("DATABASE_REPLICA_HOST"),
+            "PORT": os.getenv("DATABASE_REPLICA_PORT", os.getenv("DATABASE_PORT")),
+        }
+    )
+
+DATABASE_ROUTERS = ["league.routers.PrimaryReplicaRouter"]
+
+# How long a browser keeps reading from the primary after it wrote league data.
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv("DATABASE_REPLICA_PIN_SECONDS", "30"))
+
+# Async public views (league/async_views.py). asgi.py turns them on; under gunicorn's
+# sync workers the regular views are served. With ASYNC_PARALLEL_QUERIES the
+# independent queries of a page run at the same time, each on its own pooled
+# connection (DATABASE_POOL_MAX_SIZE bounds how many a process opens).
+ASYNC_VIEWS = os.getenv("DJANGO_ASYNC_VIEWS") == "True"
+ASYNC_PARALLEL_QUERIES = os.getenv("DJANGO_ASYNC_PARALLEL_QUERIES", "True") == "True"
+
+# How long JSON API responses (league/api.py) are cached, in the server cache and by
+# clients. Clients revalidate with the ETag afterwards.
+API_CACHE_SECONDS = int(os.getenv("API_CACHE_SECONDS", "60"))
+
+# Local file cache shared by the worker processes of a host (no external service).
+CACHE_DIR = os.getenv("DJANGO_CACHE_DIR", "/tmp/iccl_league_cache")
+CACHES = {
+    "default": {
+        "BACKEND": "league.metrics.MeteredFileBasedCache",
+        "LOCATION": os.path.join(CACHE_DIR, "default"),
+        "OPTIONS": {"MAX_ENTRIES": 5000, "METRICS_NAME": "default"},
+    },
+    # Last good copy of each public page, served when the database is unreachable
+    # (league.middleware.StalePageMiddleware). Never expires; when full, a quarter
+    # of the copies is evicted.
+    "stale_pages": {
+        "BACKEND": "league.metrics.MeteredFileBasedCache",
+        "LOCATION": os.path.join(CACHE_DIR, "stale_pages"),
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "METRICS_NAME": "stale_pages",
+            "MAX_ENTRIES": int(os.getenv("STALE_PAGE_MAX_ENTRIES", "1000")),
+            "CULL_FREQUENCY": 4,
+        },
+    },
+}
+
+# Table and stats data (league/cache.py): fresh for PAGE_CACHE_SECONDS, then served
+# stale for up to PAGE_CACHE_STALE_SECONDS while one process refills it. Saving
+# league data of a tournament invalidates its entries straight away.
+PAGE_CACHE_SECONDS = int(os.getenv("PAGE_CACHE_SECONDS", "300"))
+PAGE_CACHE_STALE_SECONDS = int(os.getenv("PAGE_CACHE_STALE_SECONDS", "600"))
+# How long a request waits for another process to fill a missing entry, and after
+# how long a fill lock is considered abandoned.
+SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "5"))
+SINGLE_FLIGHT_LOCK_SECONDS = float(os.getenv("SINGLE_FLIGHT_LOCK_SECONDS", "30"))
+
+# How often the stale copy of a page is refreshed from a successful render.
+STALE_PAGE_REFRESH_SECONDS = int(os.getenv("STALE_PAGE_REFRESH_SECONDS", "60"))
+
+# Cache-Control max-age of the canonical /t/<tournament>/ pages (league/canonical.py).
+# A tournament is archived once every match is decided and the last one is
+# TOURNAMENT_ARCHIVE_AFTER_DAYS old; until then it is live and changes every matchday.
+# Neither outlives local midnight, when the birthday banner changes.
+TOURNAMENT_ARCHIVE_AFTER_DAYS = int(os.getenv("TOURNAMENT_ARCHIVE_AFTER_DAYS", "14"))
+TOURNAMENT_ARCHIVED_MAX_AGE = int(os.getenv("TOURNAMENT_ARCHIVED_MAX_AGE", "86400"))
+TOURNAMENT_LIVE_MAX_AGE = int(os.getenv("TOURNAMENT_LIVE_MAX_AGE", "60"))
+
+# How long each process keeps its copy of the tournaments table (league/tournaments.py).
+# Saving a tournament drops the copy of that process at once.
+TOURNAMENT_CACHE_SECONDS = int(os.getenv("TOURNAMENT_CACHE_SECONDS", "60"))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -185,6 +286,90 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Visitor tracking (league/visits.py): hits are buffered in each process and
+# written in bulk every TRACK_FLUSH_SECONDS or TRACK_FLUSH_SIZE hits, keeping
+# TRACK_SAMPLE_RATE of the visitors. Up to TRACK_BUFFER_MAX hits wait while the
+# database is unreachable.
+TRACK_FLUSH_SECONDS = float(os.getenv("TRACK_FLUSH_SECONDS", "5"))
+TRACK_FLUSH_SIZE = int(os.getenv("TRACK_FLUSH_SIZE", "200"))
+TRACK_BUFFER_MAX = int(os.getenv("TRACK_BUFFER_MAX", "10000"))
+TRACK_SAMPLE_RATE = float(os.getenv("TRACK_SAMPLE_RATE", "1.0"))
+# Record every page view (with django-tracking2's defaults only visitors are
+# kept) but not redirects, so a legacy URL and its canonical page count once.
+TRACK_PAGEVIEWS = True
+TRACK_IGNORE_STATUS_CODES = [301, 302]
+TRACK_IGNORE_URLS = (
+    r"^(favicon\.ico|robots\.txt)$",
+    r"^(static|media|admin|api|tracking)/",
+    r"^(healthz|metrics)$",
+)
+
+# Traffic rollups (league/traffic.py, manage.py rollup_traffic): raw page views are
+# read TRAFFIC_ROLLUP_CHUNK rows at a time and deleted once rolled up and older
+# than TRACK_RAW_RETENTION_DAYS; hourly rollups are kept for
+# TRAFFIC_HOURLY_RETENTION_DAYS, daily ones for good.
+TRAFFIC_ROLLUP_CHUNK = int(os.getenv("TRAFFIC_ROLLUP_CHUNK", "2000"))
+TRACK_RAW_RETENTION_DAYS = int(os.getenv("TRACK_RAW_RETENTION_DAYS", "30"))
+TRAFFIC_HOURLY_RETENTION_DAYS = int(os.getenv("TRAFFIC_HOURLY_RETENTION_DAYS", "90"))
+
+# Metrics (league/metrics.py) at /metrics for staff, or for a Prometheus scraper
+# sending "Authorization: Bearer $METRICS_TOKEN". Workers share their samples
+# through CACHE_DIR every METRICS_SHARE_SECONDS.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_SHARE_SECONDS = int(os.getenv("METRICS_SHARE_SECONDS", "10"))
+
+# Request profiles (league/profiling.py): staff add ?profile=1 or an X-Profile
+# header to any page to save a cProfile run of it, viewable in the admin. Keeps
+# the newest PROFILE_KEEP profiles, each listing PROFILE_TOP_FUNCTIONS functions.
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", "60"))
+
+# Order of the league table (league/standings.py): each rule settles the ties left
+# by the rules before it. head_to_head_goals_for is also available; head-to-head
+# rules only count the matches between the tied teams.
+TABLE_TIEBREAKERS = os.getenv(
+    "TABLE_TIEBREAKERS",
+    "points,goal_difference,goals_for,head_to_head_points,"
+    "head_to_head_goal_difference,fair_play,lots",
+).split(",")
+
+# Season projections on the table page (league/projections.py): the rest of the
+# tournament is simulated PROJECTION_SIMULATIONS times, optionally over
+# PROJECTION_PROCESSES processes. Team strength is pulled towards the league
+# average by PROJECTION_PRIOR_MATCHES matches. Cached until the next result, or
+# PROJECTION_CACHE_SECONDS.
+PROJECTION_SIMULATIONS = int(os.getenv("PROJECTION_SIMULATIONS", "20000"))
+PROJECTION_PROCESSES = int(os.getenv("PROJECTION_PROCESSES", "1"))
+PROJECTION_PRIOR_MATCHES = float(os.getenv("PROJECTION_PRIOR_MATCHES", "3"))
+PROJECTION_CACHE_SECONDS = int(os.getenv("PROJECTION_CACHE_SECONDS", "86400"))
+
+# Elo team ratings (league/ratings.py): teams start at ELO_INITIAL_RATING; a
+# result moves up to ELO_K points (more for big wins), with ELO_HOME_ADVANTAGE
+# added to the home side's rating when predicting it. manage.py replay_ratings
+# reads and writes ELO_REPLAY_CHUNK rows at a time.
+ELO_INITIAL_RATING = float(os.getenv("ELO_INITIAL_RATING", "1500"))
+ELO_K = float(os.getenv("ELO_K", "30"))
+ELO_HOME_ADVANTAGE = float(os.getenv("ELO_HOME_ADVANTAGE", "0"))
+ELO_REPLAY_CHUNK = int(os.getenv("ELO_REPLAY_CHUNK", "2000"))
+
+# Records page and API: boards of the RECORDS_TOP_N people (or seasons), read
+# from the rollups in league/people.py.
+RECORDS_TOP_N = int(os.getenv("RECORDS_TOP_N", "10"))
+
+# Player and team search (league/search.py): at most SEARCH_LIMIT of each for
+# terms of SEARCH_MIN_LENGTH characters or more, cached per term for
+# SEARCH_CACHE_SECONDS.
+SEARCH_MIN_LENGTH = int(os.getenv("SEARCH_MIN_LENGTH", "2"))
+SEARCH_LIMIT = int(os.getenv("SEARCH_LIMIT", "10"))
+SEARCH_CACHE_SECONDS = int(os.getenv("SEARCH_CACHE_SECONDS", "300"))
+
+# Sized image URLs (league/images.py): Cloudinary transformations in production,
+# or derivatives of the files in IMAGE_LOCAL_ROOT made with Pillow for offline
+# development (served from IMAGE_LOCAL_URL while DEBUG is on).
+IMAGE_BACKEND = os.getenv("IMAGE_BACKEND", "league.images.CloudinaryImageBackend")
+IMAGE_LOCAL_ROOT = os.getenv("IMAGE_LOCAL_ROOT", os.path.join(BASE_DIR, "media"))
+IMAGE_LOCAL_URL = "/media/"
+
 # Media files
 # Path where uploaded player images will be stored
 # # A top-level 'media' directory is the standard practice
@@ -204,17 +389,50 @@ EMAIL_HOST_PASSWORD = (
 
 CSRF_TRUSTED_ORIGINS = ["https://phonotypically-unchanneled-sommer.ngrok-free.app"]
 
-# settings.py
+# Logging: LOG_LEVEL (INFO) to the console; set DB_LOG_LEVEL=DEBUG to see every
+# SQL statement. Statements slower than SLOW_QUERY_SECONDS are logged with their
+# view, tournament, week, template line and stack (league/slow_queries.py) as JSON
+# lines to LOG_DIR/slow_queries.log, rotated at LOG_FILE_BYTES.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_DIR = os.getenv("LOG_DIR", "/tmp/iccl_league_logs")
+LOG_FILE_BYTES = int(os.getenv("LOG_FILE_BYTES", str(5 * 1024 * 1024)))
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.2"))
+os.makedirs(LOG_DIR, exist_ok=True)
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "formatters": {
+        "console": {"format": "{asctime} {levelname} {name}: {message}", "style": "{"},
+        "json": {"()": "league.logs.JsonFormatter"},
+    },
     "handlers": {
         "console": {
             "class": "logging.StreamHandler",
+            "formatter": "console",
+        },
+        "slow_queries": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": os.path.join(LOG_DIR, "slow_queries.log"),
+            "maxBytes": LOG_FILE_BYTES,
+            "backupCount": 5,
+            "delay": True,
+            "formatter": "json",
         },
     },
     "root": {
         "handlers": ["console"],
-        "level": "DEBUG",
+        "level": LOG_LEVEL,
+    },
+    "loggers": {
+        "django.db.backends": {
+            "level": os.getenv("DB_LOG_LEVEL", "WARNING"),
+        },
+        "league.slow_queries": {
+            "handlers": ["slow_queries"],
+            "level": "WARNING",
+            # Not on the console as well.
+            "propagate": False,
+        },
     },
 }
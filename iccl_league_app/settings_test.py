@@ -2,6 +2,7 @@
 
 # Import everything from base settings
 from .settings import *  # noqa: F403,F401
+import tempfile
 
 # Override database settings for testing to use a fast, in-memory SQLite database.
 # This avoids relying on environment variables and connecting to a live PostgreSQL database.
@@ -26,14 +27,19 @@ DEBUG = True
 # This can sometimes speed up the test suite.
 # You can remove 'tracking.middleware.VisitorTrackingMiddleware' if it's not essential.
 MIDDLEWARE = [
+    "league.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "league.middleware.StalePageMiddleware",
+    "league.middleware.PrimaryPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "league.middleware.ProfilerMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "league.middleware.TournamentMiddleware",
 ]
 
 # Set a dummy secret key for testing, if a different one is needed.
@@ -42,3 +48,26 @@ SECRET_KEY = "test-secret-key"
 
 # Set up a dummy email backend to prevent tests from sending actual emails.
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+# The in-memory test database lives on one connection inside the test transaction,
+# so async views must run their queries on the main thread.
+ASYNC_PARALLEL_QUERIES = False
+
+# Don't let cached API responses or page data leak between tests.
+API_CACHE_SECONDS = 0
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    "stale_pages": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+# Test transactions roll tournaments back without a delete signal, so don't keep
+# a copy of the tournaments table between lookups.
+TOURNAMENT_CACHE_SECONDS = 0
+CACHE_DIR = tempfile.mkdtemp(prefix="iccl-test-cache-")
+
+# Sized images come from a local directory instead of Cloudinary.
+IMAGE_BACKEND = "league.images.LocalImageBackend"
+IMAGE_LOCAL_ROOT = tempfile.mkdtemp(prefix="iccl-test-images-")
+
+# The slow-query log goes to a temporary directory.
+LOG_DIR = tempfile.mkdtemp(prefix="iccl-test-logs-")
+LOGGING["handlers"]["slow_queries"]["filename"] = f"{LOG_DIR}/slow_queries.log"  # noqa: F405
@@ -29,4 +29,8 @@ urlpatterns = [
 
 # Add this at the end to serve media files in development
 if settings.DEBUG:
+    # Sized images of the local image backend (league/images.py)
+    urlpatterns += static(
+        settings.IMAGE_LOCAL_URL, document_root=settings.IMAGE_LOCAL_ROOT
+    )
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -15,8 +15,6 @@ from django.core.wsgi import get_wsgi_application
 # This will be 'C:\Users\maste\Documents\Arpit\myproject'
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
-print("*********project root*************", project_root)
-print(sys.path)
 os.environ.setdefault(
     "DJANGO_SETTINGS_MODULE", "iccl_league_app.settings"
 )
@@ -1,18 +1,66 @@
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
 from django.core.mail import send_mail
 from django.contrib.auth.models import Group
 from .models import Team, Match, Player, Card, Goal
-from .models import Team_Standing, Tournament, TeamOfTheWeek, Sponsor
+from .models import Team_Standing, Tournament, TeamOfTheWeek, Sponsor, TrafficRollup
+from .models import Person, RequestProfile
+from .people import birthday_of, person_key
+from .search import name_search, normalize
 from more_admin_filters import DropdownFilter
 from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.utils.html import format_html, format_html_join, strip_tags
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Q, Sum
+from datetime import timedelta
+from urllib.parse import urlencode
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 # from tracking.models import Visitor
 
 
+def picker_match(request):
+    """
+    The match whose goal or card player picker sent an autocomplete request
+    (``?match=`` of MatchPlayerSelect), or None.
+    """
+    if request.GET.get("model_name") not in ("goal", "card"):
+        return None
+    try:
+        return Match.objects.filter(pk=int(request.GET.get("match", ""))).first()
+    except ValueError:
+        return None
+
+
+class MatchPlayerSelect(AutocompleteSelect):
+    """Player picker of a match's goals and cards; its searches name the match."""
+
+    def __init__(self, field, admin_site, match_id, **kwargs):
+        super().__init__(field, admin_site, **kwargs)
+        self.match_id = match_id
+
+    def get_url(self):
+        return f"{super().get_url()}?{urlencode({'match': self.match_id})}"
+
+
+class MatchPlayerInlineMixin:
+    """
+    Goal and card inlines of a match's change page: the player picker only
+    offers the players of the match's two teams (see picker_match).
+    """
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        match_id = request.resolver_match.kwargs.get("object_id")
+        if db_field.name == "player" and match_id:
+            kwargs["widget"] = MatchPlayerSelect(
+                db_field, self.admin_site, match_id, using=kwargs.get("using")
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
 class TournamentAdminMixin:
     def tournament_short_description(self, obj):
         if hasattr(obj, "tournament"):
@@ -53,10 +101,10 @@ class TeamAdmin(TournamentAdminMixin, admin.ModelAdmin):
         return initial
 
 
-class CardInline(admin.TabularInline):
+class CardInline(MatchPlayerInlineMixin, admin.TabularInline):
     model = Card
     extra = 1
-    # autocomplete_fields = ["player"]
+    autocomplete_fields = ["player"]
 
     def get_formset(self, request, obj=None, **kwargs):
         """
@@ -73,9 +121,10 @@ class CardInline(admin.TabularInline):
         return formset
 
 
-class GoalInline(admin.TabularInline):
+class GoalInline(MatchPlayerInlineMixin, admin.TabularInline):
     model = Goal
     extra = 1
+    autocomplete_fields = ["player"]
 
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "player":
@@ -98,7 +147,7 @@ class MatchAdmin(TournamentAdminMixin, admin.ModelAdmin):
     list_display = (
         "week_number",
         "match_date",
-        "match_time",
+        "kickoff",
         "home_team",
         "away_team",
         "is_played",
@@ -107,7 +156,7 @@ class MatchAdmin(TournamentAdminMixin, admin.ModelAdmin):
     )
     readonly_fields = (
         "match_date",
-        "match_time",
+        "kickoff",
         "home_team",
         "away_team",
     )
@@ -115,7 +164,7 @@ class MatchAdmin(TournamentAdminMixin, admin.ModelAdmin):
     def get_fields(self, request, obj=None):
         return [
             "match_date",
-            "match_time",
+            "kickoff",
             "home_team",
             "away_team",
             "is_played",
@@ -209,9 +258,9 @@ class MatchAdmin(TournamentAdminMixin, admin.ModelAdmin):
             send_mail(
                 subject, plain_message, from_email, to_email, html_message=html_message
             )
-            print("Email sent successfully!")
-        except Exception as e:
-            print(f"Error sending email: {e}")
+            logger.info("Sent the details of match %s", match.pk)
+        except Exception:
+            logger.exception("Could not send the details of match %s", match.pk)
 
     def get_changeform_initial_data(self, request):
         """
@@ -284,6 +333,24 @@ class PlayerAdmin(TournamentAdminMixin, admin.ModelAdmin):
 
     # To order the list of players alphabetically by name (A-Z) by default.
     ordering = ("name",)
+    # Relink a row to the right person when name and date of birth got it wrong.
+    autocomplete_fields = ("person",)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Name search through the trigram (or prefix) indexes of league/search.py,
+        also behind the goal and card player pickers of a match, which only
+        offer the players of its two teams.
+        """
+        match = picker_match(request)
+        if match is not None:
+            queryset = queryset.filter(
+                team__in=[match.home_team_id, match.away_team_id]
+            )
+        term = normalize(search_term)
+        if not term:
+            return queryset, False
+        return name_search(queryset, term), False
 
     def get_changeform_initial_data(self, request):
         """
@@ -304,6 +371,57 @@ class PlayerAdmin(TournamentAdminMixin, admin.ModelAdmin):
         return initial
 
 
+class PlayerRowInline(admin.TabularInline):
+    model = Player
+    fields = ("name", "team", "tournament")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    show_change_link = True
+
+
+@admin.register(Person)
+class PersonAdmin(admin.ModelAdmin):
+    """
+    The people behind the Player rows of each tournament (league/people.py).
+    Career totals are kept up to date from goals, cards and awards; to merge two
+    people, point the player rows of one at the other.
+    """
+
+    list_display = (
+        "name",
+        "dob",
+        "tournaments",
+        "goals",
+        "motm_awards",
+        "totw_appearances",
+        "yellow_cards",
+        "red_cards",
+    )
+    search_fields = ("name",)
+    fields = (
+        ("name", "dob"),
+        "current_player",
+        ("tournaments", "goals", "motm_awards", "totw_appearances"),
+        ("yellow_cards", "red_cards"),
+    )
+    readonly_fields = (
+        "current_player",
+        "tournaments",
+        "goals",
+        "motm_awards",
+        "totw_appearances",
+        "yellow_cards",
+        "red_cards",
+    )
+    inlines = [PlayerRowInline]
+
+    def save_model(self, request, obj, form, change):
+        obj.key = person_key(obj.name)
+        obj.birthday = birthday_of(obj.dob)
+        super().save_model(request, obj, form, change)
+
+
 admin.site.unregister(Group)
 
 
@@ -334,7 +452,7 @@ class TeamOfTheWeekAdmin(TournamentAdminMixin, admin.ModelAdmin):
 
 def _update_or_create_standing(match_instance):
     teams = [match_instance.home_team, match_instance.away_team]
-    print(teams)
+    logger.debug("Updating standings of %s", teams)
     # Get the tournament from the match instance
     tournament_instance = match_instance.tournament
 
@@ -400,7 +518,7 @@ def _cascade_standing_updates(team, start_week):
         Q(home_team=team) | Q(away_team=team),
         week_number__gte=start_week,
         is_played=True,
-    ).order_by("week_number", "match_date", "match_time")
+    ).order_by("week_number", "match_date", "kickoff")
 
     for match in subsequent_matches:
         _update_or_create_standing(match)
@@ -488,3 +606,146 @@ class SponsorsAdmin(TournamentAdminMixin, admin.ModelAdmin):
             initial["tournament"] = latest_tournament.id
 
         return initial
+
+
+@admin.register(TrafficRollup)
+class TrafficRollupAdmin(admin.ModelAdmin):
+    """
+    Traffic dashboard: summaries over the rollups above the list of rollup
+    rows. Reads only TrafficRollup, never the raw tracking tables.
+    """
+
+    change_list_template = "admin/league/trafficrollup/change_list.html"
+    list_display = (
+        "period_start",
+        "period",
+        "page",
+        "tournament",
+        "week_number",
+        "views",
+        "visitors",
+    )
+    list_filter = ("period", "page", "tournament")
+    date_hierarchy = "period_start"
+    list_select_related = ("tournament",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def dashboard(self):
+        now = timezone.now()
+        daily = TrafficRollup.objects.filter(
+            period=TrafficRollup.DAY, period_start__gte=now - timedelta(days=14)
+        )
+        # Hourly rows, so today's completed hours count too.
+        last_week = TrafficRollup.objects.filter(
+            period=TrafficRollup.HOUR, period_start__gte=now - timedelta(days=7)
+        )
+        return {
+            "hourly_totals": TrafficRollup.objects.filter(
+                period=TrafficRollup.HOUR,
+                page=TrafficRollup.ALL_PAGES,
+                period_start__gte=now - timedelta(hours=48),
+            ).order_by("-period_start"),
+            "daily_totals": daily.filter(page=TrafficRollup.ALL_PAGES).order_by(
+                "-period_start"
+            ),
+            "top_pages": last_week.exclude(page=TrafficRollup.ALL_PAGES)
+            .values("page")
+            .annotate(views=Sum("views"))
+            .order_by("-views")[:10],
+            "top_weeks": last_week.filter(tournament__isnull=False)
+            .exclude(week_number=None)
+            .values("tournament__short_description", "page", "week_number")
+            .annotate(views=Sum("views"))
+            .order_by("-views")[:10],
+        }
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {**(extra_context or {}), **self.dashboard()}
+        return super().changelist_view(request, extra_context=extra_context)
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """
+    Profiles saved by staff requests with ``?profile=1`` (league/profiling.py).
+    Read-only; the change page shows the time breakdown and the cProfile report.
+    """
+
+    list_display = (
+        "created",
+        "method",
+        "path",
+        "view",
+        "status_code",
+        "total_ms",
+        "sql_queries",
+        "sql_ms",
+        "template_ms",
+        "user",
+    )
+    list_filter = ("view", "method")
+    search_fields = ("path",)
+    date_hierarchy = "created"
+    list_select_related = ("user",)
+    fields = (
+        ("created", "user"),
+        ("method", "path", "view", "status_code"),
+        ("total_ms", "sql_queries", "sql_ms", "template_ms"),
+        "time_by_part",
+        "profile_report",
+    )
+    readonly_fields = (
+        "created",
+        "user",
+        "method",
+        "path",
+        "view",
+        "status_code",
+        "total_ms",
+        "sql_queries",
+        "sql_ms",
+        "template_ms",
+        "time_by_part",
+        "profile_report",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Total (ms)", ordering="total_seconds")
+    def total_ms(self, obj):
+        return round(obj.total_seconds * 1000)
+
+    @admin.display(description="SQL (ms)", ordering="sql_seconds")
+    def sql_ms(self, obj):
+        return round(obj.sql_seconds * 1000)
+
+    @admin.display(description="Templates (ms)", ordering="template_seconds")
+    def template_ms(self, obj):
+        return round(obj.template_seconds * 1000)
+
+    @admin.display(description="Own time by part")
+    def time_by_part(self, obj):
+        return format_html(
+            "<table>{}</table>",
+            format_html_join(
+                "",
+                "<tr><td>{}</td><td>{} ms</td></tr>",
+                (
+                    (part, round(seconds * 1000, 1))
+                    for part, seconds in obj.breakdown.items()
+                ),
+            ),
+        )
+
+    @admin.display(description="Report")
+    def profile_report(self, obj):
+        return format_html("<pre>{}</pre>", obj.report)
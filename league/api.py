@@ -0,0 +1,495 @@
+"""
+Read-only JSON API (v1) over the league data the public pages show.
+
+Responses are compact JSON, cached for API_CACHE_SECONDS and carry an ETag, so
+clients polling for new results get a 304 until something changes. Collections
+that grow with the league (all matches of a tournament, its players) use cursor
+pagination: a page holds ``results`` and the URL of the ``next`` page, if any.
+
+    /api/v1/tournaments/
+    /api/v1/tournaments/<id>/weeks/
+    /api/v1/tournaments/<id>/fixtures/?week=<n>      (no week: every match, paged)
+    /api/v1/tournaments/<id>/results/?week=<n>       (no week: latest results week)
+    /api/v1/tournaments/<id>/standings/?week=<n>     (no week: latest matchweek)
+    /api/v1/tournaments/<id>/leaderboards/
+    /api/v1/tournaments/<id>/players/
+    /api/v1/players/<id>/
+    /api/v1/records/?tournament=<id>                 (no tournament: all-time)
+    /api/v1/search/?q=<text>                         (players and teams by name)
+    /api/v1/ratings/                                 (every team's Elo rating)
+    /api/v1/teams/<id>/ratings/                      (a team's rating history)
+"""
+
+import base64
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_response_headers
+from django.views.decorators.http import conditional_page, require_GET
+
+from . import views
+from .cache import all_tournaments_cache_key, league_cache_key
+from .models import Match, Player, Team
+from .ratings import rating_history, rating_table
+from .search import search as search_names
+from .tournaments import all_tournaments, get_tournament as find_tournament
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class BadRequest(Exception):
+    """Invalid query parameter; answered with a 400 and the message."""
+
+
+def api_response(data, status=200):
+    return JsonResponse(
+        data,
+        status=status,
+        json_dumps_params={"separators": (",", ":"), "ensure_ascii": False},
+    )
+
+
+def api_view(view):
+    """
+    GET-only JSON view: errors come back as ``{"error": ...}``, successful
+    responses are cached for API_CACHE_SECONDS (keyed on the league cache
+    generation, see cache.py) and answer If-None-Match.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = api_cache_key(request, kwargs)
+        try:
+            data = cache.get(key)
+            if data is None:
+                data = view(request, *args, **kwargs)
+                cache.set(key, data, settings.API_CACHE_SECONDS)
+        except BadRequest as e:
+            return api_response({"error": str(e)}, status=400)
+        except Http404:
+            return api_response({"error": "Not found"}, status=404)
+        response = api_response(data)
+        patch_response_headers(response, settings.API_CACHE_SECONDS)
+        return response
+
+    return conditional_page(require_GET(wrapper))
+
+
+def api_cache_key(request, kwargs):
+    """
+    Cache key of a response: its URL under the generation of the tournament it
+    belongs to, or the generation shared by all of them, so saving a result
+    drops the cached responses it changes.
+    """
+    url = hashlib.sha256(request.get_full_path().encode()).hexdigest()
+    tournament = find_tournament(kwargs.get("tournament_id"))
+    if tournament is not None:
+        return league_cache_key(tournament, "api", url)
+    return all_tournaments_cache_key("api", url)
+
+
+def int_param(request, name, default=None):
+    value = request.GET.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise BadRequest(f"'{name}' must be an integer")
+
+
+# -------------------------------
+# Cursor pagination
+# -------------------------------
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise BadRequest("Invalid cursor")
+
+
+def paginate(request, queryset, key_fields, serialize):
+    """
+    Keyset-paginates ``queryset`` ordered by ``key_fields`` (ending in a unique
+    field). The cursor holds the key of the last row of the previous page, so
+    every page is one indexed range query however deep the client pages.
+    """
+    limit = min(max(int_param(request, "limit", DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE)
+    queryset = queryset.order_by(*key_fields)
+
+    cursor = request.GET.get("cursor")
+    if cursor:
+        last = decode_cursor(cursor)
+        if not isinstance(last, list) or len(last) != len(key_fields):
+            raise BadRequest("Invalid cursor")
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        after = Q()
+        for n, field in enumerate(key_fields):
+            after |= Q(
+                **dict(zip(key_fields[:n], last[:n])), **{f"{field}__gt": last[n]}
+            )
+        try:
+            # Values of the wrong type fail while the lookups are prepared.
+            queryset = queryset.filter(after)
+        except (TypeError, ValueError, ValidationError):
+            raise BadRequest("Invalid cursor")
+
+    rows = list(queryset[: limit + 1])
+    next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        params = request.GET.copy()
+        params["cursor"] = encode_cursor(
+            [getattr(rows[-1], field) for field in key_fields]
+        )
+        next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+    return {"results": [serialize(row) for row in rows], "next": next_url}
+
+
+# -------------------------------
+# Serialisation
+# -------------------------------
+
+
+def team_json(team):
+    return {"id": team.id, "name": team.name} if team else None
+
+
+def player_json(player):
+    return {"id": player.id, "name": player.name} if player else None
+
+
+def career_json(person):
+    """A person's totals over every tournament they played in."""
+    if person is None:
+        return None
+    return {
+        "person": person.id,
+        "tournaments": person.tournaments,
+        "goals": person.goals,
+        "yellow_cards": person.yellow_cards,
+        "red_cards": person.red_cards,
+        "motm": person.motm_awards,
+        "totw": person.totw_appearances,
+        "players": list(person.players.order_by("id").values_list("id", flat=True)),
+    }
+
+
+def fixture_json(match):
+    return {
+        "id": match.id,
+        "week": match.week_number,
+        "date": match.match_date.isoformat(),
+        "kickoff": match.kickoff.strftime("%H:%M") if match.kickoff else None,
+        "home": team_json(match.home_team),
+        "away": team_json(match.away_team),
+        "played": match.is_played or match.is_walkover,
+    }
+
+
+def result_json(match):
+    data = fixture_json(match)
+    data.update(
+        {
+            "score": [match.home_score, match.away_score],
+            "walkover_winner": (
+                team_json(match.walkover_winner) if match.is_walkover else None
+            ),
+            "mom": player_json(match.mom),
+            "goals": [
+                {
+                    "player": player_json(goal.player),
+                    "team": goal.player.team_id,
+                    "goals": goal.goals,
+                    "own_goal": goal.own_goal,
+                }
+                for goal in match.goals.all()
+            ],
+            "cards": [
+                {
+                    "player": player_json(card.player),
+                    "team": card.player.team_id,
+                    "card": card.card_type,
+                }
+                for card in match.cards.all()
+            ],
+        }
+    )
+    return data
+
+
+def get_tournament(tournament_id):
+    tournament = find_tournament(tournament_id)
+    if tournament is None:
+        raise Http404("No such tournament")
+    return tournament
+
+
+# -------------------------------
+# Endpoints
+# -------------------------------
+
+
+@api_view
+def tournaments(request):
+    return {
+        "results": [
+            {
+                "id": t.id,
+                "name": t.short_description,
+                "start_date": (
+                    t.tournament_start_date.isoformat()
+                    if t.tournament_start_date
+                    else None
+                ),
+            }
+            for t in all_tournaments()
+        ]
+    }
+
+
+@api_view
+def weeks(request, tournament_id):
+    tournament = get_tournament(tournament_id)
+    return {
+        "tournament": tournament.id,
+        "results": [
+            {"week": week, "label": label}
+            for week, label in views.get_week_labels(tournament).items()
+        ],
+    }
+
+
+@api_view
+def fixtures(request, tournament_id):
+    tournament = get_tournament(tournament_id)
+    week = int_param(request, "week")
+    if week is None:
+        return paginate(
+            request,
+            Match.objects.filter(tournament=tournament).select_related(
+                "home_team", "away_team"
+            ),
+            ["week_number", "id"],
+            fixture_json,
+        )
+    return {
+        "tournament": tournament.id,
+        "week": week,
+        "results": [
+            fixture_json(match) for match in views.fixtures_queryset(tournament, week)
+        ],
+    }
+
+
+@api_view
+def results(request, tournament_id):
+    tournament = get_tournament(tournament_id)
+    week = int_param(request, "week")
+    if week is None:
+        week = views.get_default_result_week(tournament)
+    return {
+        "tournament": tournament.id,
+        "week": week,
+        "results": [
+            result_json(match) for match in views.results_queryset(tournament, week)
+        ],
+    }
+
+
+@api_view
+def standings(request, tournament_id):
+    tournament = get_tournament(tournament_id)
+    week = int_param(request, "week")
+    if week is None:
+        week = views.get_standing_weeks(tournament).last() or 1
+    rows = views.ranked_standings(tournament, week)
+    return {
+        "tournament": tournament.id,
+        "week": week,
+        "results": [
+            {"position": position, **row} for position, row in enumerate(rows, 1)
+        ],
+    }
+
+
+@api_view
+def leaderboards(request, tournament_id):
+    tournament = get_tournament(tournament_id)
+    boards = views.stats_querysets(tournament)
+    return {
+        "tournament": tournament.id,
+        "top_scorers": [
+            [row["player__name"], row["player__team__name"], row["total_goals"]]
+            for row in boards["top_scorers"]
+        ],
+        "yellow_cards": [
+            [row["player__name"], row["player__team__name"], row["total_yellows"]]
+            for row in boards["yellow_cards"]
+        ],
+        "red_cards": [
+            [row["player__name"], row["player__team__name"], row["total_reds"]]
+            for row in boards["red_cards"]
+        ],
+        "motm": [
+            [
+                row["mom__name"],
+                row["mom__team__name"],
+                row["total_mom_count"],
+                sorted(row["week_numbers"]),
+            ]
+            for row in boards["motm_list"]
+        ],
+        "columns": {
+            "top_scorers": ["player", "team", "goals"],
+            "yellow_cards": ["player", "team", "cards"],
+            "red_cards": ["player", "team", "cards"],
+            "motm": ["player", "team", "awards", "weeks"],
+        },
+    }
+
+
+@api_view
+def tournament_players(request, tournament_id):
+    tournament = get_tournament(tournament_id)
+    return paginate(
+        request,
+        Player.objects.filter(tournament=tournament).select_related("team"),
+        ["id"],
+        lambda player: {**player_json(player), "team": team_json(player.team)},
+    )
+
+
+@api_view
+def player_profile(request, player_id):
+    player = get_object_or_404(
+        Player.objects.select_related("team", "person"), id=player_id
+    )
+    # The events of the tournament the player's team plays in, as on the profile page
+    tournament = find_tournament(player.team.tournament_id)
+    timeline = (
+        views.player_timeline(player, tournament)
+        if tournament
+        else {"goals": [], "cards": [], "moms": [], "total_goals": 0}
+    )
+    return {
+        "id": player.id,
+        "name": player.name,
+        "team": team_json(player.team),
+        "tournament": player.tournament_id,
+        "total_goals": timeline["total_goals"],
+        "goals": [
+            {
+                "match": row["match_pk"],
+                "week": row["week"],
+                "opponent": row["opponent"],
+                "goals": row["amount"],
+            }
+            for row in timeline["goals"]
+        ],
+        "cards": [
+            {
+                "match": row["match_pk"],
+                "week": row["week"],
+                "opponent": row["opponent"],
+                "card": row["card"],
+            }
+            for row in timeline["cards"]
+        ],
+        "mom": [
+            {"match": row["match_pk"], "week": row["week"]} for row in timeline["moms"]
+        ],
+        "career": career_json(player.person),
+    }
+
+
+@api_view
+def records(request):
+    tournament_id = int_param(request, "tournament")
+    limit = min(
+        max(int_param(request, "limit", settings.RECORDS_TOP_N), 1), MAX_PAGE_SIZE
+    )
+    tournament = None if tournament_id is None else get_tournament(tournament_id)
+    boards = {}
+    for field, _ in views.RECORD_BOARDS:
+        seasons = views.best_seasons(field, limit, tournament)
+        boards[field] = {
+            "best_seasons": [
+                {
+                    "player": row["person__name"],
+                    "tournament": row["tournament_id"],
+                    "total": row["total"],
+                }
+                for row in seasons
+            ]
+        }
+        if tournament is None:
+            boards[field]["all_time"] = [
+                {
+                    "player": row["name"],
+                    "player_id": row["current_player_id"],
+                    "team": row["current_player__team__name"],
+                    "tournaments": row["tournaments"],
+                    "total": row["total"],
+                }
+                for row in views.all_time_leaders(field, limit)
+            ]
+    return {"tournament": tournament_id, "results": boards}
+
+
+@api_view
+def search(request):
+    query = request.GET.get("q", "")
+    return {"query": query, **search_names(query)}
+
+
+@api_view
+def ratings(request):
+    return {
+        "results": [
+            {
+                "position": position,
+                "team": {"id": row["id"], "name": row["name"]},
+                "rating": round(row["rating"], 1),
+                "matches": row["matches_rated"],
+            }
+            for position, row in enumerate(rating_table(), 1)
+        ]
+    }
+
+
+@api_view
+def team_ratings(request, team_id):
+    team = get_object_or_404(Team, id=team_id)
+    history = rating_history(team.id)
+    return {
+        "team": team_json(team),
+        "rating": round(history[-1]["rating"], 1) if history else None,
+        "results": [
+            {
+                "match": row["match_id"],
+                "date": row["match_date"].isoformat(),
+                "tournament": row["tournament_id"],
+                "week": row["week_number"],
+                "opponent": row["opponent__name"],
+                "change": round(row["change"], 1),
+                "rating": round(row["rating"], 1),
+            }
+            for row in history
+        ],
+    }
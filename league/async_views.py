@@ -0,0 +1,257 @@
+"""
+Async versions of the read-only public views, served when ASYNC_VIEWS is on (the
+ASGI entry point turns it on).
+
+The query logic is shared with views.py; what changes is that the independent
+queries of a page (week labels and birthdays, the stats leaderboards, this week's
+and last week's standings, ...) are awaited together instead of one after the
+other. Every queryset is evaluated before rendering, so templates never touch the
+database from the event loop, and every query goes through run_query, which hands
+its connection back to the pool as soon as it is done: a view never holds one
+connection while it waits for others.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.shortcuts import render
+
+from . import views
+from .cache import aleague_cache_key, asingle_flight, league_stale_key
+from .models import VENUE, Sponsor
+from .tournaments import resolve_tournament
+
+
+def _run_and_release(query):
+    try:
+        return query()
+    finally:
+        # Worker threads outlive the request: hand the connection back to the
+        # pool (or close it once it is too old).
+        close_old_connections()
+
+
+async def run_query(query):
+    """
+    Runs a blocking ORM callable off the event loop. With ASYNC_PARALLEL_QUERIES
+    each call gets a worker thread (and pooled connection) of its own, so calls
+    awaited together hit the database in parallel.
+    """
+    if settings.ASYNC_PARALLEL_QUERIES:
+        return await sync_to_async(_run_and_release, thread_sensitive=False)(query)
+    return await sync_to_async(query)()
+
+
+async def run_concurrently(*queries):
+    return await asyncio.gather(*(run_query(query) for query in queries))
+
+
+async def get_tournament_details(request):
+    # TournamentMiddleware has normally resolved it already.
+    if not hasattr(request, "tournament"):
+        await run_query(lambda: resolve_tournament(request))
+    return request.tournament, request.tournaments
+
+
+async def get_base_context(active_tab, request):
+    """Async counterpart of views.get_base_context."""
+    selected_tournament, tournaments = await get_tournament_details(request)
+    week_labels, birthday_players = await run_concurrently(
+        lambda: views.get_week_labels(selected_tournament),
+        views.get_birthday_players,
+    )
+    return {
+        "selected_tournament": selected_tournament,
+        "tournaments": tournaments,
+        "venue": VENUE,
+        "active_tab": active_tab,
+        "week_labels": week_labels,
+        "birthday_players": birthday_players,
+    }
+
+
+async def fixture_view(request):
+    context = await get_base_context("Fixture", request)
+    tournament = context["selected_tournament"]
+
+    if tournament:
+        selected_week_number = request.GET.get("week_number")
+        if selected_week_number is None:
+            selected_week_number, max_week_number = await run_concurrently(
+                lambda: views.get_default_fixture_week(tournament),
+                lambda: views.get_max_week_number(tournament),
+            )
+        else:
+            max_week_number = await run_query(
+                lambda: views.get_max_week_number(tournament)
+            )
+        selected_week_number = int(selected_week_number)
+
+        fixtures_for_week = await run_query(
+            lambda: list(views.fixtures_queryset(tournament, selected_week_number))
+        )
+        context.update(
+            {
+                "week_date_str": views.format_week_date(fixtures_for_week),
+                "selected_week_number": selected_week_number,
+                "fixtures_for_week": fixtures_for_week,
+                "max_week_number": max_week_number,
+            }
+        )
+    else:
+        context.update(
+            {
+                "fixtures_for_week": [],
+                "week_date_str": "N/A",
+                "selected_week_number": 1,
+                "max_week_number": 0,
+            }
+        )
+
+    return render(request, "league/fixture.html", context)
+
+
+async def result_view(request):
+    context = await get_base_context("Result", request)
+    tournament = context["selected_tournament"]
+
+    if tournament:
+        selected_week_number = request.GET.get("week_number")
+        if selected_week_number is None:
+            selected_week_number, max_week_number = await run_concurrently(
+                lambda: views.get_default_result_week(tournament),
+                lambda: views.get_max_week_number(tournament),
+            )
+        else:
+            max_week_number = await run_query(
+                lambda: views.get_max_week_number(tournament)
+            )
+        selected_week_number = int(selected_week_number)
+
+        results_for_week = await run_query(
+            lambda: list(views.results_queryset(tournament, selected_week_number))
+        )
+        context.update(
+            {
+                "week_date_str": views.format_week_date(results_for_week),
+                "selected_week_number": selected_week_number,
+                "results_for_week": results_for_week,
+                "max_week_number": max_week_number,
+            }
+        )
+    else:
+        context.update(
+            {
+                "results_for_week": [],
+                "week_date_str": "N/A",
+                "selected_week_number": 1,
+                "max_week_number": 0,
+            }
+        )
+
+    return render(request, "league/result.html", context)
+
+
+async def table_data(tournament, requested_week=None):
+    """Async counterpart of views.table_data."""
+    match_weeks = await run_query(lambda: list(views.get_standing_weeks(tournament)))
+    selected_week = views.selected_match_week(match_weeks, requested_week)
+
+    # This week's and last week's standings are independent: fetch both at once.
+    standings, previous_standings = await run_concurrently(
+        lambda: views.ranked_standings(tournament, selected_week),
+        lambda: views.ranked_standings(tournament, selected_week - 1),
+    )
+    if not match_weeks or selected_week <= min(match_weeks):
+        previous_standings = None
+
+    return {
+        "points_table_html": views.render_points_table(standings, previous_standings),
+        "match_weeks": match_weeks,
+        "selected_week": selected_week,
+    }
+
+
+async def table_view(request):
+    context = await get_base_context("Table", request)
+    tournament = context["selected_tournament"]
+
+    if not tournament:
+        context["points_table_html"] = "<p>Please select a tournament.</p>"
+        context["match_weeks"] = []
+        context["selected_week"] = 1
+        return render(request, "league/table.html", context)
+
+    requested_week = request.GET.get("match_week")
+    table, context["projections"] = await asyncio.gather(
+        asingle_flight(
+            await aleague_cache_key(
+                tournament, "table", views.table_week(requested_week)
+            ),
+            lambda: table_data(tournament, requested_week),
+            stale_key=league_stale_key(
+                tournament, "table", views.table_week(requested_week)
+            ),
+        ),
+        asingle_flight(
+            await run_query(lambda: views.projections_cache_key(tournament)),
+            lambda: run_query(lambda: views.project_season(tournament)),
+            settings.PROJECTION_CACHE_SECONDS,
+            stale_key=league_stale_key(tournament, "projections"),
+        ),
+    )
+    context.update(table)
+    return render(request, "league/table.html", context)
+
+
+async def stats_data(tournament):
+    """Async counterpart of views.stats_data."""
+    # Four leaderboards plus one TOTW query per position, all in parallel.
+    leaderboards = views.stats_querysets(tournament)
+    results = await run_concurrently(
+        *(lambda qs=qs: list(qs) for qs in leaderboards.values()),
+        *(
+            lambda field=field: list(views.totw_position_queryset(tournament, field))
+            for field in views.TOTW_POSITIONS
+        ),
+    )
+    split = len(leaderboards)
+    data = dict(zip(leaderboards, results[:split]))
+    data["team_of_the_week"] = views.build_totw_leaderboard(results[split:])
+    return data
+
+
+async def stats_view(request):
+    context = await get_base_context("Stats", request)
+    tournament = context["selected_tournament"]
+
+    if tournament:
+        context.update(
+            await asingle_flight(
+                await aleague_cache_key(tournament, "stats"),
+                lambda: stats_data(tournament),
+                stale_key=league_stale_key(tournament, "stats"),
+            )
+        )
+    else:
+        context["top_scorers"] = []
+        context["yellow_cards"] = []
+        context["red_cards"] = []
+        context["motm_list"] = []
+        context["team_of_the_week"] = []
+
+    return render(request, "league/stats.html", context)
+
+
+async def sponsors_view(request):
+    context = await get_base_context("Sponsors", request)
+    context["sponsors"] = await run_query(
+        lambda: list(
+            Sponsor.objects.filter(tournament=context["selected_tournament"]).order_by(
+                "id"
+            )
+        )
+    )
+    return render(request, "league/sponsors.html", context)
@@ -0,0 +1,265 @@
+"""
+Single-flight caching of expensive page data (league table, stats leaderboards).
+
+When a matchday's last result is saved, every fan reloads the table at once. On a
+cache miss only one process computes the value: it takes a lock file next to the
+cache, the others serve the previous (stale) value if there is one, or wait up to
+SINGLE_FLIGHT_WAIT_SECONDS for the fill. Lock files work across gunicorn workers
+on the same host, so no external service is needed.
+
+Keys include a per-tournament generation which is replaced whenever league data
+of that tournament is saved (see signals.py), so a new result is never hidden
+behind a cached table; while the first fill after a change runs, the other
+processes serve the previous value, kept under a key without the generation.
+Data spanning every tournament is keyed on one shared generation, replaced along
+with any of theirs.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import SINGLE_FLIGHT
+
+POLL_SECONDS = 0.05
+
+
+# Generation of the data spanning every tournament (head-to-head records),
+# replaced along with any tournament's.
+ALL_TOURNAMENTS = "all"
+
+
+def _generation_key(scope):
+    return f"league:{scope}:generation"
+
+
+def _generation(scope):
+    generation_key = _generation_key(scope)
+    generation = cache.get(generation_key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        cache.add(generation_key, generation, None)
+        generation = cache.get(generation_key, generation)
+    return generation
+
+
+def league_cache_key(tournament, *parts):
+    """Cache key for data of ``tournament``, invalidated by bump_league_cache."""
+    return ":".join(
+        ["league", str(tournament.pk), _generation(tournament.pk), *map(str, parts)]
+    )
+
+
+def all_tournaments_cache_key(*parts):
+    """
+    Cache key for data of every tournament, invalidated by bump_league_cache of
+    any of them; a single cache read however many tournaments there are.
+    """
+    return ":".join(
+        ["league", ALL_TOURNAMENTS, _generation(ALL_TOURNAMENTS), *map(str, parts)]
+    )
+
+
+def league_stale_key(tournament, *parts):
+    """
+    Key without the generation under which single_flight keeps the last value
+    filled, so the first fill after bump_league_cache has a copy to serve stale.
+    """
+    return ":".join(["league", str(tournament.pk), "last", *map(str, parts)])
+
+
+async def aleague_cache_key(tournament, *parts):
+    """league_cache_key for async views, without blocking the event loop."""
+    generation_key = _generation_key(tournament.pk)
+    generation = await cache.aget(generation_key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        await cache.aadd(generation_key, generation, None)
+        generation = await cache.aget(generation_key, generation)
+    return ":".join(["league", str(tournament.pk), generation, *map(str, parts)])
+
+
+def bump_league_cache(tournament_id):
+    """Invalidates every cached value of the tournament, and those of all of them."""
+    cache.set_many(
+        {
+            _generation_key(tournament_id): uuid.uuid4().hex,
+            _generation_key(ALL_TOURNAMENTS): uuid.uuid4().hex,
+        },
+        None,
+    )
+
+
+# -------------------------------
+# Fill locks
+# -------------------------------
+
+
+def _lock_path(key):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return os.path.join(settings.CACHE_DIR, "locks", f"{digest}.lock")
+
+
+def acquire_fill_lock(key):
+    """
+    Atomically creates the lock file of ``key`` holding a token unique to this
+    fill, and returns the token; None if another process holds the lock. A lock
+    older than SINGLE_FLIGHT_LOCK_SECONDS belongs to a process that died
+    mid-fill and is taken over.
+    """
+    path = _lock_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    token = f"{os.getpid()}:{uuid.uuid4().hex}"
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                age = time.time() - os.path.getmtime(path)
+                if age < settings.SINGLE_FLIGHT_LOCK_SECONDS:
+                    return None
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # released meanwhile: try again
+        else:
+            with os.fdopen(fd, "w") as lock:
+                lock.write(token)
+            return token
+    return None
+
+
+def release_fill_lock(key, token):
+    """
+    Removes the lock file of ``key`` if it still holds ``token``: a fill that
+    outlived SINGLE_FLIGHT_LOCK_SECONDS leaves alone the lock of the process
+    that took it over.
+    """
+    path = _lock_path(key)
+    try:
+        with open(path) as lock:
+            if lock.read() != token:
+                return
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# -------------------------------
+# Single-flight get-or-compute
+# -------------------------------
+
+
+def _is_fresh(entry):
+    return entry is not None and entry[0] > time.time()
+
+
+def _entries(key, value, timeout, stale_key):
+    entry = (time.time() + timeout, value)
+    return {key: entry, stale_key: entry} if stale_key else {key: entry}
+
+
+def _store(key, value, timeout, stale_key=None):
+    # Entries outlive their freshness so they can be served stale during a refill.
+    cache.set_many(
+        _entries(key, value, timeout, stale_key),
+        timeout + settings.PAGE_CACHE_STALE_SECONDS,
+    )
+    return value
+
+
+async def _astore(key, value, timeout, stale_key=None):
+    await cache.aset_many(
+        _entries(key, value, timeout, stale_key),
+        timeout + settings.PAGE_CACHE_STALE_SECONDS,
+    )
+    return value
+
+
+def single_flight(key, compute, timeout=None, stale_key=None):
+    """
+    Returns the cached value of ``key``, calling ``compute()`` in at most one
+    process at a time when it is missing or older than ``timeout`` seconds
+    (PAGE_CACHE_SECONDS by default). Each value is also kept under ``stale_key``
+    (see league_stale_key), served while another process fills a missing ``key``.
+    """
+    timeout = settings.PAGE_CACHE_SECONDS if timeout is None else timeout
+    entry = cache.get(key)
+    if _is_fresh(entry):
+        SINGLE_FLIGHT.inc(result="hit")
+        return entry[1]
+
+    token = acquire_fill_lock(key)
+    if token:
+        try:
+            # Another process may have finished filling since our first look.
+            latest = cache.get(key)
+            if _is_fresh(latest):
+                SINGLE_FLIGHT.inc(result="hit")
+                return latest[1]
+            SINGLE_FLIGHT.inc(result="fill")
+            return _store(key, compute(), timeout, stale_key)
+        finally:
+            release_fill_lock(key, token)
+
+    if entry is None and stale_key:
+        entry = cache.get(stale_key)
+    if entry is not None:
+        SINGLE_FLIGHT.inc(result="stale")
+        return entry[1]
+
+    deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(POLL_SECONDS)
+        entry = cache.get(key)
+        if entry is not None:
+            SINGLE_FLIGHT.inc(result="wait")
+            return entry[1]
+    # The fill is taking too long: compute rather than fail the request.
+    SINGLE_FLIGHT.inc(result="timeout")
+    return compute()
+
+
+async def asingle_flight(key, compute, timeout=None, stale_key=None):
+    """
+    single_flight for async views: ``compute`` is a coroutine function. The lock
+    files are handled in a worker thread, off the event loop.
+    """
+    timeout = settings.PAGE_CACHE_SECONDS if timeout is None else timeout
+    entry = await cache.aget(key)
+    if _is_fresh(entry):
+        SINGLE_FLIGHT.inc(result="hit")
+        return entry[1]
+
+    token = await sync_to_async(acquire_fill_lock, thread_sensitive=False)(key)
+    if token:
+        try:
+            latest = await cache.aget(key)
+            if _is_fresh(latest):
+                SINGLE_FLIGHT.inc(result="hit")
+                return latest[1]
+            SINGLE_FLIGHT.inc(result="fill")
+            return await _astore(key, await compute(), timeout, stale_key)
+        finally:
+            await sync_to_async(release_fill_lock, thread_sensitive=False)(key, token)
+
+    if entry is None and stale_key:
+        entry = await cache.aget(stale_key)
+    if entry is not None:
+        SINGLE_FLIGHT.inc(result="stale")
+        return entry[1]
+
+    deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(POLL_SECONDS)
+        entry = await cache.aget(key)
+        if entry is not None:
+            SINGLE_FLIGHT.inc(result="wait")
+            return entry[1]
+    SINGLE_FLIGHT.inc(result="timeout")
+    return await compute()
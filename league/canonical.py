@@ -0,0 +1,200 @@
+"""
+Canonical, path-based URLs for the tournament pages.
+
+Every public page of a tournament has exactly one URL, e.g.
+``/t/4/results/week/7/``, so browsers, proxies and CDNs can cache it. The legacy
+query-string forms (``/results/?tournament=4&week_number=7``) redirect there.
+
+How long a page may be cached follows the tournament: an archived tournament
+(every match decided, the last one more than TOURNAMENT_ARCHIVE_AFTER_DAYS ago)
+never changes again, the live one changes every matchday. Either way a page
+is not cached past local midnight, when the birthday banner of every page
+changes.
+"""
+
+from datetime import datetime, time, timedelta
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.http import Http404, HttpResponsePermanentRedirect, HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+
+from .cache import league_cache_key
+from .models import Match, Player
+from .tournaments import get_tournament, path_tournament, request_tournament
+
+# Legacy page name -> (canonical page name, query parameter that becomes the
+# path's trailing number, canonical page name with that number)
+LEGACY_PAGES = {
+    "home": ("tournament_home", None, None),
+    "sponsors": ("tournament_sponsors", None, None),
+    "fixtures": ("tournament_fixtures", "week_number", "tournament_fixtures_week"),
+    "results": ("tournament_results", "week_number", "tournament_results_week"),
+    "table": ("tournament_table", "match_week", "tournament_table_week"),
+    "stats": ("tournament_stats", None, None),
+    "records": ("tournament_records", None, None),
+    "team_of_the_week": (
+        "tournament_team_of_the_week",
+        "week_number",
+        "tournament_team_of_the_week_week",
+    ),
+    "players": ("tournament_players", "team_id", "tournament_players_team"),
+}
+
+
+def tournament_is_archived(tournament):
+    """True once every match is decided and the last one is long past."""
+
+    def compute():
+        matches = Match.objects.filter(tournament=tournament).aggregate(
+            last_date=Max("match_date"),
+            undecided=Count("id", filter=Q(is_played=False, is_walkover=False)),
+        )
+        cutoff = timezone.now().date() - timedelta(
+            days=settings.TOURNAMENT_ARCHIVE_AFTER_DAYS
+        )
+        return bool(
+            matches["last_date"]
+            and matches["last_date"] < cutoff
+            and not matches["undecided"]
+        )
+
+    return cache.get_or_set(
+        league_cache_key(tournament, "archived"), compute, settings.PAGE_CACHE_SECONDS
+    )
+
+
+def seconds_until_midnight():
+    """Seconds left of the local day, after which the birthday banner changes."""
+    now = timezone.localtime()
+    midnight = timezone.make_aware(
+        datetime.combine(now.date() + timedelta(days=1), time())
+    )
+    return max(int((midnight - now).total_seconds()), 0)
+
+
+def patch_tournament_cache_control(response, tournament, spans_tournaments=False):
+    """
+    Public caching: long for archived tournaments, short for the live one and
+    for pages that also show other tournaments' results, and never past midnight.
+    """
+    if response.status_code != 200 or response.cookies:
+        return response
+    max_age = (
+        settings.TOURNAMENT_ARCHIVED_MAX_AGE
+        if not spans_tournaments and tournament_is_archived(tournament)
+        else settings.TOURNAMENT_LIVE_MAX_AGE
+    )
+    patch_cache_control(
+        response, public=True, max_age=min(max_age, seconds_until_midnight())
+    )
+    return response
+
+
+def with_path_params(request, tournament, number_param=None, number=None):
+    """
+    Hands the path's tournament (and week or team) to the views, which read them
+    from the query string.
+    """
+    params = request.GET.copy()
+    params["tournament"] = str(tournament.pk)
+    if number_param is not None:
+        params[number_param] = str(number)
+    request.GET = params
+
+
+def tournament_page(view, number_param=None, spans_tournaments=False):
+    """
+    Serves ``view`` at a canonical ``/t/<tournament>/...`` URL. With
+    ``number_param`` the URL's trailing ``<int:number>`` is passed on as that
+    query parameter (the week, or the team on the players page). Pages that
+    ``spans_tournaments`` are never cached as long as an archived tournament.
+    """
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_page(request, tournament, number=None, **kwargs):
+            tournament = await sync_to_async(path_tournament)(request, tournament)
+            with_path_params(request, tournament, number_param, number)
+            response = await view(request, **kwargs)
+            return await sync_to_async(patch_tournament_cache_control)(
+                response, tournament, spans_tournaments
+            )
+
+        return async_page
+
+    @wraps(view)
+    def page(request, tournament, number=None, **kwargs):
+        tournament = path_tournament(request, tournament)
+        with_path_params(request, tournament, number_param, number)
+        return patch_tournament_cache_control(
+            view(request, **kwargs), tournament, spans_tournaments
+        )
+
+    return page
+
+
+def redirect_to_canonical(request, legacy_name):
+    """
+    Redirects a legacy ``/page/?tournament=&week_number=`` URL to its canonical
+    path, keeping any other query parameters. Permanent when the tournament was
+    given; temporary when it defaulted to the visitor's last tournament (cookie)
+    or the first one.
+    """
+    page, number_param, numbered_page = LEGACY_PAGES[legacy_name]
+    params = request.GET.copy()
+    tournament_id = params.pop("tournament", [""])[-1]
+    tournament = get_tournament(tournament_id)
+    permanent = tournament is not None
+    if tournament is None:
+        tournament, _ = request_tournament(request)
+        if tournament is None:
+            return None
+
+    number = params.pop(number_param, [""])[-1] if number_param else ""
+    if number.isdigit():
+        url = reverse(numbered_page, args=[tournament.pk, int(number)])
+    else:
+        url = reverse(page, args=[tournament.pk])
+    if params:
+        url = f"{url}?{params.urlencode()}"
+    redirect = HttpResponsePermanentRedirect if permanent else HttpResponseRedirect
+    return redirect(url)
+
+
+def legacy_page(view, legacy_name):
+    """
+    The legacy URL of a page: redirects to the canonical URL, or serves ``view``
+    itself while there is no tournament to redirect to.
+    """
+    if iscoroutinefunction(view):
+
+        async def async_legacy(request, **kwargs):
+            response = await sync_to_async(redirect_to_canonical)(request, legacy_name)
+            return response or await view(request, **kwargs)
+
+        return async_legacy
+
+    def legacy(request, **kwargs):
+        return redirect_to_canonical(request, legacy_name) or view(request, **kwargs)
+
+    return legacy
+
+
+def legacy_player_profile(request, player_id):
+    """``/player/<id>/`` -> the profile in the player's own tournament."""
+    player = get_object_or_404(Player.objects.select_related("team"), pk=player_id)
+    tournament_id = request.GET.get("tournament", "")
+    if not tournament_id.isdigit():
+        tournament_id = player.tournament_id or player.team.tournament_id
+    if tournament_id is None:
+        raise Http404("Player is not in a tournament")
+    return HttpResponsePermanentRedirect(
+        reverse("tournament_player", args=[tournament_id, player.pk])
+    )
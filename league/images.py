@@ -0,0 +1,102 @@
+"""
+Sized image URLs for player photos, team logos and sponsor images.
+
+Templates ask for an image at a named size, ``{{ player.image|image_url:"avatar" }}``,
+instead of the full-size ``.url``. The URL of an image (public id, format and
+version) at a size never changes, so each process builds it once and memoises it.
+
+IMAGE_BACKEND picks who serves the derivatives: Cloudinary, which resizes on its
+CDN, or a local directory (IMAGE_LOCAL_ROOT) where Pillow writes them on first
+use, for tests and offline development.
+"""
+
+import os
+from functools import lru_cache
+
+from cloudinary import CloudinaryResource
+from django.conf import settings
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps
+
+# Named sizes, twice the CSS size they are shown at for high-density screens.
+IMAGE_SIZES = {
+    # Round player photos on the players, profile and results pages (w-24).
+    "avatar": {"width": 192, "height": 192, "crop": "fill", "gravity": "face"},
+    # Player photos on the team of the week pitch.
+    "pitch_card": {"width": 256, "height": 256, "crop": "fill", "gravity": "face"},
+    # Team logos on the fixture and result posts (h-14), never cropped.
+    "team_logo": {"width": 112, "height": 112, "crop": "limit"},
+    # Sponsor logos (h-40), never cropped.
+    "sponsor_logo": {"width": 640, "height": 320, "crop": "limit"},
+}
+
+
+class CloudinaryImageBackend:
+    """Cloudinary delivery URLs with the size as an on-the-fly transformation."""
+
+    def url(self, public_id, format, version, size):
+        resource = CloudinaryResource(public_id, format=format, version=version)
+        return resource.build_url(
+            secure=True, fetch_format="auto", quality="auto", **IMAGE_SIZES[size]
+        )
+
+
+class LocalImageBackend:
+    """
+    Images stored as ``IMAGE_LOCAL_ROOT/<public id>.<format>``, resized into
+    ``IMAGE_LOCAL_ROOT/derivatives/<size>/`` and served from IMAGE_LOCAL_URL.
+    """
+
+    def url(self, public_id, format, version, size):
+        name = f"{public_id}.{format}" if format else public_id
+        source = os.path.join(settings.IMAGE_LOCAL_ROOT, name)
+        derivative = os.path.join("derivatives", size, name)
+        target = os.path.join(settings.IMAGE_LOCAL_ROOT, derivative)
+        if not os.path.exists(source):
+            return settings.IMAGE_LOCAL_URL + name
+        if not os.path.exists(target):
+            self.resize(source, target, IMAGE_SIZES[size])
+        return settings.IMAGE_LOCAL_URL + derivative.replace(os.sep, "/")
+
+    def resize(self, source, target, options):
+        box = (options["width"], options["height"])
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with Image.open(source) as image:
+            if options["crop"] == "fill":
+                image = ImageOps.fit(image, box)
+            else:
+                image.thumbnail(box)
+            image.save(target)
+
+
+@lru_cache(maxsize=1)
+def get_image_backend(path):
+    return import_string(path)()
+
+
+@lru_cache(maxsize=4096)
+def _image_url(backend_path, public_id, format, version, size):
+    return get_image_backend(backend_path).url(public_id, format, version, size)
+
+
+def image_url(image, size):
+    """
+    URL of ``image`` (a CloudinaryField value or a public id) at one of the
+    IMAGE_SIZES; an empty string when there is no image.
+    """
+    if not image:
+        return ""
+    if size not in IMAGE_SIZES:
+        raise ValueError(f"Unknown image size {size!r}")
+    if isinstance(image, str):
+        public_id, format, version = image, None, None
+    else:
+        public_id, format, version = image.public_id, image.format, image.version
+    if not public_id:
+        return ""
+    return _image_url(settings.IMAGE_BACKEND, public_id, format, version, size)
+
+
+def clear_image_url_cache():
+    _image_url.cache_clear()
+    get_image_backend.cache_clear()
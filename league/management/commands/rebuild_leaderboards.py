@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from league.models import Person
+from league.people import refresh_careers
+from league.routers import primary_reads
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts the per-tournament rollups and career totals behind the records "
+        "page from every goal, card, award and team of the week. Saved results keep "
+        "them up to date; run this after bulk imports or fixes made outside Django."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="People recounted per batch.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        with primary_reads():
+            person_ids = list(
+                Person.objects.order_by("pk").values_list("pk", flat=True)
+            )
+            for start in range(0, len(person_ids), chunk_size):
+                end = start + chunk_size
+                refresh_careers(person_ids[start:end])
+        self.stdout.write(f"Recounted the records of {len(person_ids)} people.")
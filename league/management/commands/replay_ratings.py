@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from league.ratings import replay
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds every team's Elo rating history by replaying all results in "
+        "date order, across every tournament. Saved results keep the ratings up "
+        "to date; run this after changing the ELO_ settings or importing matches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Matches read and ratings written per batch (default ELO_REPLAY_CHUNK).",
+        )
+
+    def handle(self, *args, **options):
+        rated = replay(chunk_size=options["chunk_size"])
+        self.stdout.write(f"Rated {rated} matches.")
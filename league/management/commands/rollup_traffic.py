@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from league.models import TrafficRollup
+from league.routers import primary_reads
+from league.traffic import prune_raw_rows, rollup_period
+
+
+class Command(BaseCommand):
+    help = (
+        "Rolls the tracking app's raw page views up into hourly and daily "
+        "TrafficRollup rows, then prunes raw rows past their retention. Run it "
+        "hourly, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-prune",
+            action="store_true",
+            help="Only roll up; keep every raw row.",
+        )
+
+    def handle(self, *args, **options):
+        with primary_reads():
+            for period in (TrafficRollup.HOUR, TrafficRollup.DAY):
+                done = rollup_period(period)
+                self.stdout.write(f"Rolled up {done} {period}(s) with page views.")
+            if not options["no_prune"]:
+                pageviews, visitors, hourly = prune_raw_rows()
+                self.stdout.write(
+                    f"Pruned {pageviews} page views, {visitors} visitors and "
+                    f"{hourly} hourly rollups."
+                )
@@ -0,0 +1,379 @@
+"""
+Request metrics in the Prometheus text format, served at /metrics to staff.
+
+Each worker process keeps its counters and histograms in memory (a dict update
+under a lock per observation) and shares a snapshot of them through
+CACHE_DIR/metrics/ at most every METRICS_SHARE_SECONDS, so one scrape sees the
+whole container. The samples of a worker that has exited are folded into a
+retired snapshot, so the totals only ever go up:
+
+- iccl_view_duration_seconds, by URL name, method and status class
+- iccl_view_db_queries / iccl_view_db_seconds, database work per request
+- iccl_view_response_bytes, response sizes
+- iccl_template_render_seconds, by template
+- iccl_cache_requests_total, cache gets by cache and hit/miss, and
+  iccl_single_flight_total, how table and stats fills were served
+
+Queries slower than SLOW_QUERY_SECONDS also go to the slow-query log
+(league/slow_queries.py).
+"""
+
+import contextvars
+import fcntl
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache.backends.filebased import FileBasedCache
+from django.template.backends.django import DjangoTemplates
+
+from .slow_queries import log_slow_query
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1e3, 5e3, 1e4, 5e4, 1e5, 5e5, 1e6)
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        # (sample name, labels) -> value
+        self.samples = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def add(self, name, labels, amount):
+        key = (name, labels)
+        with self.lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+
+    def snapshot(self):
+        with self.lock:
+            samples = [
+                [name, list(labels), value]
+                for (name, labels), value in self.samples.items()
+            ]
+        return {"pid": os.getpid(), "samples": samples}
+
+
+registry = Registry()
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, help):
+        self.name, self.help = name, help
+        registry.register(self)
+
+    def inc(self, amount=1, **labels):
+        registry.add(f"{self.name}_total", tuple(sorted(labels.items())), amount)
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, help, buckets=DURATION_BUCKETS):
+        self.name, self.help, self.buckets = name, help, buckets
+        registry.register(self)
+
+    def observe(self, value, **labels):
+        labels = tuple(sorted(labels.items()))
+        # Only the first bucket holding the value; the exposition makes them
+        # cumulative.
+        index = bisect_left(self.buckets, value)
+        bound = self.buckets[index] if index < len(self.buckets) else "+Inf"
+        registry.add(f"{self.name}_bucket", labels + (("le", str(bound)),), 1)
+        registry.add(f"{self.name}_sum", labels, value)
+        registry.add(f"{self.name}_count", labels, 1)
+
+
+VIEW_DURATION = Histogram(
+    "iccl_view_duration_seconds", "Time to answer a request, by URL name."
+)
+VIEW_QUERIES = Histogram(
+    "iccl_view_db_queries", "Database queries per request.", COUNT_BUCKETS
+)
+VIEW_DB_TIME = Histogram(
+    "iccl_view_db_seconds", "Time spent in database queries per request."
+)
+VIEW_RESPONSE_SIZE = Histogram(
+    "iccl_view_response_bytes", "Response body size.", SIZE_BUCKETS
+)
+TEMPLATE_RENDER = Histogram(
+    "iccl_template_render_seconds", "Time to render a template."
+)
+CACHE_REQUESTS = Counter(
+    "iccl_cache_requests", "Cache gets, by cache and result (hit or miss)."
+)
+SINGLE_FLIGHT = Counter(
+    "iccl_single_flight",
+    "Single-flight lookups: fresh hit, stale served, filled, waited or computed after waiting.",
+)
+
+
+# -------------------------------
+# Per-request database work
+# -------------------------------
+
+
+class RequestStats:
+    __slots__ = ("request", "queries", "query_seconds", "template_seconds", "rendering")
+
+    def __init__(self, request=None):
+        self.request = request
+        self.queries = 0
+        self.query_seconds = 0.0
+        # Outermost renders only; a template rendered inside another is counted
+        # by its parent.
+        self.template_seconds = 0.0
+        self.rendering = False
+
+
+# Copied into the threads of sync_to_async, so async views' queries count too.
+request_stats = contextvars.ContextVar("request_stats", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - start
+        stats = request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += seconds
+        if seconds >= settings.SLOW_QUERY_SECONDS:
+            log_slow_query(sql, params, many, seconds, stats and stats.request)
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """connection_created receiver: times every query of the connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# -------------------------------
+# Templates and caches
+# -------------------------------
+
+
+class TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        stats = request_stats.get()
+        outermost = stats is not None and not stats.rendering
+        if outermost:
+            stats.rendering = True
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            elapsed = time.perf_counter() - start
+            TEMPLATE_RENDER.observe(
+                elapsed, template=self.template.origin.template_name
+            )
+            if outermost:
+                stats.rendering = False
+                stats.template_seconds += elapsed
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing every render of a loaded template."""
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+MISSING = object()
+
+
+class MeteredFileBasedCache(FileBasedCache):
+    """FileBasedCache counting hits and misses; OPTIONS["METRICS_NAME"] labels them."""
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self.metrics_name = params.get("OPTIONS", {}).get("METRICS_NAME", "default")
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, MISSING, version)
+        CACHE_REQUESTS.inc(
+            cache=self.metrics_name, result="miss" if value is MISSING else "hit"
+        )
+        return default if value is MISSING else value
+
+
+# -------------------------------
+# Sharing between worker processes
+# -------------------------------
+
+_last_shared = 0.0
+
+# Summed samples of the workers that have exited
+RETIRED_SNAPSHOT = "retired.json"
+
+
+def metrics_dir():
+    return os.path.join(settings.CACHE_DIR, "metrics")
+
+
+def snapshot_due():
+    """
+    True at most once per METRICS_SHARE_SECONDS: the caller is to write the
+    snapshot, with write_snapshot (in a worker thread from async code).
+    """
+    global _last_shared
+    now = time.monotonic()
+    if now - _last_shared < settings.METRICS_SHARE_SECONDS:
+        return False
+    _last_shared = now
+    return True
+
+
+def share_snapshot(force=False):
+    """Writes this process's samples for the other workers' /metrics."""
+    if force or snapshot_due():
+        write_snapshot()
+
+
+def write_snapshot():
+    os.makedirs(metrics_dir(), exist_ok=True)
+    path = os.path.join(metrics_dir(), f"{os.getpid()}.json")
+    with open(f"{path}.tmp", "w") as file:
+        json.dump(registry.snapshot(), file)
+    os.replace(f"{path}.tmp", path)
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def read_samples(path):
+    """{(sample name, labels): value} of a snapshot file, or None if unreadable."""
+    try:
+        with open(path) as file:
+            snapshot = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return {
+        (sample, tuple(tuple(label) for label in labels)): value
+        for sample, labels, value in snapshot["samples"]
+    }
+
+
+def add_samples(totals, samples):
+    for key, value in samples.items():
+        totals[key] = totals.get(key, 0) + value
+
+
+def retire(path):
+    """
+    Folds the snapshot of a worker that has exited into RETIRED_SNAPSHOT, so the
+    summed counters never go down when a worker restarts (Prometheus would read
+    that as a counter reset).
+    """
+    retired_path = os.path.join(metrics_dir(), RETIRED_SNAPSHOT)
+    retired = read_samples(retired_path) or {}
+    add_samples(retired, read_samples(path) or {})
+    with open(f"{retired_path}.tmp", "w") as file:
+        json.dump(
+            {
+                "samples": [
+                    [sample, list(labels), value]
+                    for (sample, labels), value in retired.items()
+                ]
+            },
+            file,
+        )
+    os.replace(f"{retired_path}.tmp", retired_path)
+    os.remove(path)
+
+
+def collect():
+    """Samples of every worker on this host, live or retired, summed."""
+    share_snapshot(force=True)
+    totals = {}
+    # One scrape at a time, so a worker is never both counted and retired.
+    with open(os.path.join(metrics_dir(), "collect.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        for name in os.listdir(metrics_dir()):
+            pid = name.removesuffix(".json")
+            if not name.endswith(".json") or not pid.isdigit():
+                continue
+            path = os.path.join(metrics_dir(), name)
+            if not is_alive(int(pid)):
+                retire(path)
+                continue
+            add_samples(totals, read_samples(path) or {})
+        add_samples(
+            totals, read_samples(os.path.join(metrics_dir(), RETIRED_SNAPSHOT)) or {}
+        )
+    return totals
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def exposition():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    samples = collect()
+    lines = []
+    for metric in registry.metrics.values():
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        if metric.type == "counter":
+            for (name, labels), value in sorted(samples.items()):
+                if name == f"{metric.name}_total":
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+            continue
+
+        series = sorted(
+            {labels for name, labels in samples if name == f"{metric.name}_count"}
+        )
+        for labels in series:
+            counts = {
+                dict(bucket_labels)["le"]: value
+                for (name, bucket_labels), value in samples.items()
+                if name == f"{metric.name}_bucket" and bucket_labels[:-1] == labels
+            }
+            cumulative = 0
+            for bound in [*map(str, metric.buckets), "+Inf"]:
+                cumulative += counts.get(bound, 0)
+                lines.append(
+                    f"{metric.name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}"
+                )
+            lines.append(
+                f"{metric.name}_sum{format_labels(labels)} {samples[(f'{metric.name}_sum', labels)]}"
+            )
+            lines.append(
+                f"{metric.name}_count{format_labels(labels)} {samples[(f'{metric.name}_count', labels)]}"
+            )
+    return "\n".join(lines) + "\n"
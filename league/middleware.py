@@ -0,0 +1,330 @@
+import hashlib
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from . import metrics
+from .profiling import Profiling, wants_profile
+from .routers import primary_reads, wrote_replicated_data
+from .tournaments import resolve_tournament
+from .visits import track
+
+# Cookie set on a browser that has just written league data; while it is
+# present every read of that browser goes to the primary.
+PRIMARY_PIN_COOKIE = "iccl_primary"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class PrimaryPinningMiddleware:
+    """
+    Decides per request whether league reads may use the read replica.
+
+    Admin pages, non-GET requests and browsers holding the pin cookie read from
+    the primary. A request that writes league data sets the pin cookie for
+    ``DATABASE_REPLICA_PIN_SECONDS`` so the next pages show the new result
+    even while the replica is catching up.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._admin_prefix = None
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @property
+    def admin_prefix(self):
+        if self._admin_prefix is None:
+            self._admin_prefix = reverse("admin:index")
+        return self._admin_prefix
+
+    def needs_primary(self, request):
+        return (
+            request.method not in SAFE_METHODS
+            or request.path.startswith(self.admin_prefix)
+            or PRIMARY_PIN_COOKIE in request.COOKIES
+        )
+
+    def pin_after_write(self, response):
+        response.set_cookie(
+            PRIMARY_PIN_COOKIE,
+            "1",
+            max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with primary_reads(self.needs_primary(request)):
+            response = self.get_response(request)
+            wrote = wrote_replicated_data()
+
+        if wrote:
+            self.pin_after_write(response)
+        return response
+
+    async def __acall__(self, request):
+        with primary_reads(self.needs_primary(request)):
+            response = await self.get_response(request)
+            wrote = wrote_replicated_data()
+
+        if wrote:
+            self.pin_after_write(response)
+        return response
+
+
+# Cache alias (a bounded file cache) holding the last good copy of each page.
+STALE_PAGE_CACHE = "stale_pages"
+
+BODY_TAG = re.compile(rb"<body[^>]*>", re.IGNORECASE)
+
+
+class StalePageMiddleware:
+    """
+    Keeps the last successful render of every public HTML page and serves it,
+    with a banner saying how old it is, when the page fails because the database
+    is unreachable (see signals.note_database_unavailable).
+
+    Copies live in the ``stale_pages`` cache, a file cache bounded by
+    STALE_PAGE_MAX_ENTRIES; each page is rewritten at most once per
+    STALE_PAGE_REFRESH_SECONDS.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._admin_prefix = None
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @property
+    def admin_prefix(self):
+        if self._admin_prefix is None:
+            self._admin_prefix = reverse("admin:index")
+        return self._admin_prefix
+
+    def page_key(self, request):
+        digest = hashlib.sha256(request.get_full_path().encode()).hexdigest()
+        return f"page:{digest}"
+
+    def is_public_page(self, request):
+        return request.method == "GET" and not request.path.startswith(
+            self.admin_prefix
+        )
+
+    def keep_copy(self, request, response):
+        if (
+            response.status_code != 200
+            or response.streaming
+            or response.cookies
+            or not response.get("Content-Type", "").startswith("text/html")
+        ):
+            return
+        pages = caches[STALE_PAGE_CACHE]
+        key = self.page_key(request)
+        if pages.add(f"{key}:recent", True, settings.STALE_PAGE_REFRESH_SECONDS):
+            pages.set(key, (timezone.now(), response.content), None)
+
+    def stale_response(self, request):
+        copy = caches[STALE_PAGE_CACHE].get(self.page_key(request))
+        if copy is None:
+            return None
+        saved_at, content = copy
+        banner = render_to_string(
+            "league/partials/stale_banner.html", {"saved_at": saved_at}
+        ).encode()
+        content, found = BODY_TAG.subn(
+            lambda body: body.group(0) + banner, content, count=1
+        )
+        response = HttpResponse(
+            content if found else banner + content,
+            content_type="text/html; charset=utf-8",
+        )
+        # Don't let browsers or proxies keep the stale copy.
+        response["Cache-Control"] = "no-store"
+        response["Age"] = int((timezone.now() - saved_at).total_seconds())
+        return response
+
+    def process_response(self, request, response):
+        if not self.is_public_page(request):
+            return response
+        if getattr(request, "database_unavailable", False):
+            return self.stale_response(request) or response
+        self.keep_copy(request, response)
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+
+class TournamentMiddleware:
+    """
+    Resolves the tournament a request is about once, before the view runs, and
+    exposes it as ``request.tournament`` (``request.tournaments`` lists them all)
+    from a per-process copy of the tournaments table; see league/tournaments.py.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Django runs this in a thread under ASGI, so it may query the database.
+        resolve_tournament(request, view_kwargs.get("tournament"))
+
+
+class BufferedTrackingMiddleware:
+    """
+    Records a visitor tracking hit per request into an in-process buffer that a
+    background thread writes in bulk; replaces django-tracking2's middleware,
+    which wrote to the database during every request. See league/visits.py.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        track(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        track(request, response)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Records latency, database work and response size of every request by URL
+    name for the /metrics endpoint (league/metrics.py). First in MIDDLEWARE so
+    it times the whole stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def observe(self, request, response, stats, start):
+        match = getattr(request, "resolver_match", None)
+        view = (match.url_name or match.view_name) if match else "unmatched"
+        metrics.VIEW_DURATION.observe(
+            time.perf_counter() - start,
+            view=view,
+            method=request.method,
+            status=f"{response.status_code // 100}xx",
+        )
+        metrics.VIEW_QUERIES.observe(stats.queries, view=view)
+        metrics.VIEW_DB_TIME.observe(stats.query_seconds, view=view)
+        if not response.streaming:
+            metrics.VIEW_RESPONSE_SIZE.observe(len(response.content), view=view)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start, stats = time.perf_counter(), metrics.RequestStats(request)
+        token = metrics.request_stats.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.request_stats.reset(token)
+        self.observe(request, response, stats, start)
+        metrics.share_snapshot()
+        return response
+
+    async def __acall__(self, request):
+        start, stats = time.perf_counter(), metrics.RequestStats(request)
+        token = metrics.request_stats.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.request_stats.reset(token)
+        self.observe(request, response, stats, start)
+        # The snapshot file is written off the event loop.
+        if metrics.snapshot_due():
+            await sync_to_async(metrics.write_snapshot, thread_sensitive=False)()
+        return response
+
+
+class ProfilerMiddleware:
+    """
+    Profiles the requests of staff users who ask for it with ``?profile=1`` or an
+    ``X-Profile`` header and saves the profile for the admin; see
+    league/profiling.py. After AuthenticationMiddleware, which it needs.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not wants_profile(request):
+            return self.get_response(request)
+        profiling = Profiling()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiling.stop()
+        profiling.save(request, response)
+        return response
+
+    async def __acall__(self, request):
+        # request.user is a lazy object that may query the session and user.
+        if not await sync_to_async(wants_profile)(request):
+            return await self.get_response(request)
+        profiling = Profiling()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiling.stop()
+        await sync_to_async(profiling.save)(request, response)
+        return response
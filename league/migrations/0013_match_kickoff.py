@@ -0,0 +1,122 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:00
+
+import logging
+import re
+from datetime import time
+
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+# Frozen copy of the kick-off slots (league.models.MATCH_TIMES) as they were
+# entered in the old match_time text column.
+LEGACY_MATCH_TIMES = {
+    "6:00 PM": time(18, 0),
+    "6:45 PM": time(18, 45),
+    "7:30 PM": time(19, 30),
+    "8:15 PM": time(20, 15),
+    "9:00 PM": time(21, 0),
+    "9:45 PM": time(21, 45),
+}
+
+TIME_PATTERN = re.compile(
+    r"^(?P<hour>\d{1,2})[:.](?P<minute>\d{2})(?::\d{2})?\s*(?P<meridiem>[AaPp]\.?[Mm]\.?)?$"
+)
+
+
+def parse_match_time(value):
+    """Converts a legacy "6:00 PM" / "18:00" string to a time, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.upper() in LEGACY_MATCH_TIMES:
+        return LEGACY_MATCH_TIMES[value.upper()]
+
+    m = TIME_PATTERN.match(value)
+    if not m:
+        return None
+    hour, minute = int(m.group("hour")), int(m.group("minute"))
+    meridiem = (m.group("meridiem") or "").replace(".", "").upper()
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "PM" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return time(hour, minute)
+
+
+def format_match_time(value):
+    """Formats a time back to the legacy "6:00 PM" string."""
+    if value is None:
+        return None
+    hour = value.hour % 12 or 12
+    meridiem = "AM" if value.hour < 12 else "PM"
+    return f"{hour}:{value.minute:02d} {meridiem}"
+
+
+def copy_match_time_to_kickoff(apps, schema_editor):
+    Match = apps.get_model("league", "Match")
+    db_alias = schema_editor.connection.alias
+    matches = (
+        Match.objects.using(db_alias)
+        .exclude(match_time__isnull=True)
+        .exclude(match_time="")
+    )
+    for match in matches.only("id", "match_time").iterator():
+        kickoff = parse_match_time(match.match_time)
+        if kickoff is None:
+            logger.warning(
+                "Match %s: could not parse match_time %r", match.id, match.match_time
+            )
+            continue
+        Match.objects.using(db_alias).filter(pk=match.pk).update(kickoff=kickoff)
+
+
+def copy_kickoff_to_match_time(apps, schema_editor):
+    Match = apps.get_model("league", "Match")
+    db_alias = schema_editor.connection.alias
+    matches = Match.objects.using(db_alias).exclude(kickoff__isnull=True)
+    for match in matches.only("id", "kickoff"):
+        Match.objects.using(db_alias).filter(pk=match.pk).update(
+            match_time=format_match_time(match.kickoff)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("league", "0012_player_dob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="match",
+            name="kickoff",
+            field=models.TimeField(
+                blank=True,
+                help_text="Kick-off time, e.g. 18:00 for 6:00 PM.",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(copy_match_time_to_kickoff, copy_kickoff_to_match_time),
+        migrations.AlterModelOptions(
+            name="match",
+            options={
+                "managed": True,
+                "ordering": ["week_number", "match_date", "kickoff"],
+                "verbose_name_plural": "Matches",
+            },
+        ),
+        migrations.RemoveField(
+            model_name="match",
+            name="match_time",
+        ),
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                fields=["tournament", "week_number", "kickoff"],
+                name="league_match_t_w_kickoff_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("league", "0013_match_kickoff"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="card",
+            index=models.Index(
+                fields=["match", "card_type"], name="league_card_match_type_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="goal",
+            index=models.Index(
+                fields=["match", "player"], name="league_goal_match_player_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_played", True), ("is_walkover", True), _connector="OR"
+                ),
+                fields=["tournament", "week_number"],
+                name="league_match_result_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="team_standing",
+            index=models.Index(
+                fields=["tournament", "matches_played"], name="league_standing_t_mp_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="team_standing",
+            index=models.Index(
+                fields=["name", "matches_played"], name="league_standing_name_mp_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teamoftheweek",
+            index=models.Index(
+                fields=["tournament", "week_number"], name="league_totw_t_week_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("league", "0014_tournament_week_indexes"),
+        ("tracking", "0002_auto_20180918_2014"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrafficRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("hour", "Hour"), ("day", "Day")], max_length=4
+                    ),
+                ),
+                ("period_start", models.DateTimeField()),
+                ("page", models.CharField(max_length=40)),
+                ("week_number", models.IntegerField(blank=True, null=True)),
+                ("views", models.PositiveIntegerField(default=0)),
+                ("visitors", models.PositiveIntegerField(default=0)),
+                (
+                    "tournament",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="traffic",
+                        to="league.tournament",
+                    ),
+                ),
+            ],
+            options={
+                "managed": True,
+                "indexes": [
+                    models.Index(
+                        fields=["period", "period_start"],
+                        name="league_traffic_period_idx",
+                    )
+                ],
+            },
+        ),
+        # rollup_traffic reads the raw page views an hour at a time.
+        migrations.RunSQL(
+            "CREATE INDEX league_pageview_time_idx ON tracking_pageview (view_time)",
+            "DROP INDEX league_pageview_time_idx",
+        ),
+    ]
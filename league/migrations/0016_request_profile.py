@@ -0,0 +1,54 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("league", "0015_traffic_rollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("method", models.CharField(max_length=10)),
+                ("path", models.CharField(max_length=255)),
+                ("view", models.CharField(max_length=100)),
+                ("status_code", models.PositiveSmallIntegerField()),
+                ("total_seconds", models.FloatField()),
+                ("sql_queries", models.PositiveIntegerField(default=0)),
+                ("sql_seconds", models.FloatField(default=0)),
+                ("template_seconds", models.FloatField(default=0)),
+                ("breakdown", models.JSONField(default=dict)),
+                ("report", models.TextField()),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created"],
+                "managed": True,
+            },
+        ),
+    ]
@@ -0,0 +1,160 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+CHUNK_SIZE = 2000
+
+# Frozen copy of the Elo formula of league/ratings.py and its default settings
+# (ELO_INITIAL_RATING, ELO_K, ELO_HOME_ADVANTAGE) as they were when ratings
+# were introduced; ``manage.py replay_ratings`` re-rates with the current ones.
+INITIAL_RATING = 1500.0
+K = 30.0
+HOME_ADVANTAGE = 0.0
+
+
+def margin_multiplier(margin):
+    margin = abs(margin)
+    if margin <= 1:
+        return 1.0
+    if margin == 2:
+        return 1.5
+    return (11 + margin) / 8
+
+
+def rating_change(home_rating, away_rating, home_score, away_score):
+    """Rating the home side gains (the away side loses the same)."""
+    expected = 1 / (1 + 10 ** ((away_rating - home_rating - HOME_ADVANTAGE) / 400))
+    result = 1.0 if home_score > away_score else 0.0 if home_score < away_score else 0.5
+    return K * margin_multiplier(home_score - away_score) * (result - expected)
+
+
+def rate_existing_matches(apps, schema_editor):
+    """
+    Rates the results entered so far, so the next saved result is rated from
+    the teams' history.
+    """
+    Match = apps.get_model("league", "Match")
+    TeamRating = apps.get_model("league", "TeamRating")
+    db_alias = schema_editor.connection.alias
+    matches = (
+        Match.objects.using(db_alias)
+        .filter(is_played=True, home_score__isnull=False, away_score__isnull=False)
+        .order_by("match_date", "id")
+        .values_list(
+            "id",
+            "match_date",
+            "week_number",
+            "tournament_id",
+            "home_team_id",
+            "away_team_id",
+            "home_score",
+            "away_score",
+        )
+    )
+    current, batch = {}, []
+    for row in matches.iterator(chunk_size=CHUNK_SIZE):
+        match_id, date, week, tournament_id, home_id, away_id, home, away = row
+        home_rating = current.get(home_id, INITIAL_RATING)
+        away_rating = current.get(away_id, INITIAL_RATING)
+        change = rating_change(home_rating, away_rating, home, away)
+        current[home_id] = home_rating + change
+        current[away_id] = away_rating - change
+        for team_id, opponent_id, sign in (
+            (home_id, away_id, 1),
+            (away_id, home_id, -1),
+        ):
+            batch.append(
+                TeamRating(
+                    team_id=team_id,
+                    opponent_id=opponent_id,
+                    match_id=match_id,
+                    tournament_id=tournament_id,
+                    match_date=date,
+                    week_number=week,
+                    rating=current[team_id],
+                    change=sign * change,
+                )
+            )
+        if len(batch) >= CHUNK_SIZE:
+            TeamRating.objects.using(db_alias).bulk_create(batch)
+            batch = []
+    TeamRating.objects.using(db_alias).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("league", "0016_request_profile"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeamRating",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("match_date", models.DateField()),
+                ("week_number", models.IntegerField()),
+                ("rating", models.FloatField()),
+                ("change", models.FloatField()),
+                (
+                    "match",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ratings",
+                        to="league.match",
+                    ),
+                ),
+                (
+                    "opponent",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="league.team",
+                    ),
+                ),
+                (
+                    "team",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ratings",
+                        to="league.team",
+                    ),
+                ),
+                (
+                    "tournament",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ratings",
+                        to="league.tournament",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["match_date", "match_id"],
+                "managed": True,
+                "indexes": [
+                    models.Index(
+                        fields=["team", "match_date", "match"],
+                        name="league_rating_team_date_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("team", "match"), name="league_rating_team_match_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(rate_existing_matches, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,156 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:10
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def merge_players(apps, schema_editor):
+    """
+    One Person per name (ignoring case and spacing) and date of birth. Rows
+    without a date of birth join the only dated person of that name, if any.
+    """
+    Player = apps.get_model("league", "Player")
+    Person = apps.get_model("league", "Person")
+    Goal = apps.get_model("league", "Goal")
+    Card = apps.get_model("league", "Card")
+    Match = apps.get_model("league", "Match")
+
+    players = list(Player.objects.order_by("id").values_list("id", "name", "dob"))
+    dobs = defaultdict(set)
+    for _, name, dob in players:
+        if dob:
+            dobs[" ".join(name.split()).casefold()].add(dob)
+    groups = defaultdict(list)
+    for player_id, name, dob in players:
+        key = " ".join(name.split()).casefold()
+        if dob is None and len(dobs[key]) == 1:
+            dob = next(iter(dobs[key]))
+        groups[key, dob].append((player_id, name))
+
+    for (key, dob), rows in groups.items():
+        person = Person.objects.create(
+            name=" ".join(rows[-1][1].split()),
+            key=key,
+            dob=dob,
+            birthday=dob.month * 100 + dob.day if dob else None,
+            current_player_id=rows[-1][0],
+        )
+        Player.objects.filter(id__in=[player_id for player_id, _ in rows]).update(
+            person=person
+        )
+
+    totals = defaultdict(dict)
+    for field, rows in (
+        (
+            "tournaments",
+            Player.objects.filter(tournament__isnull=False)
+            .values("person")
+            .annotate(total=Count("tournament", distinct=True)),
+        ),
+        ("goals", Goal.objects.values("player__person").annotate(total=Sum("goals"))),
+        (
+            "yellow_cards",
+            Card.objects.filter(card_type="YELLOW")
+            .values("player__person")
+            .annotate(total=Count("id")),
+        ),
+        (
+            "red_cards",
+            Card.objects.filter(card_type="RED")
+            .values("player__person")
+            .annotate(total=Count("id")),
+        ),
+        (
+            "motm_awards",
+            Match.objects.filter(Q(is_played=True) | Q(is_walkover=True))
+            .exclude(mom=None)
+            .values("mom__person")
+            .annotate(total=Count("id")),
+        ),
+    ):
+        for row in rows.order_by():
+            person_id = next(value for name, value in row.items() if name != "total")
+            totals[person_id][field] = row["total"] or 0
+    for person_id, fields in totals.items():
+        Person.objects.filter(id=person_id).update(**fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("league", "0017_team_rating"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Person",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("key", models.CharField(db_index=True, max_length=100)),
+                ("dob", models.DateField(blank=True, null=True)),
+                (
+                    "birthday",
+                    models.PositiveSmallIntegerField(
+                        blank=True, db_index=True, null=True
+                    ),
+                ),
+                ("tournaments", models.PositiveIntegerField(default=0)),
+                ("goals", models.PositiveIntegerField(default=0)),
+                ("yellow_cards", models.PositiveIntegerField(default=0)),
+                ("red_cards", models.PositiveIntegerField(default=0)),
+                ("motm_awards", models.PositiveIntegerField(default=0)),
+                (
+                    "current_player",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="league.player",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "People",
+                "ordering": ["name"],
+                "managed": True,
+            },
+        ),
+        migrations.AddField(
+            model_name="player",
+            name="person",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The person this player row is. Set from name and date of birth when left empty.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="players",
+                to="league.person",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="person",
+            index=models.Index(
+                fields=["-goals", "name"], name="league_person_goals_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="person",
+            index=models.Index(
+                fields=["-motm_awards", "name"], name="league_person_motm_idx"
+            ),
+        ),
+        migrations.RunPython(merge_players, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,194 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+TOTW_POSITIONS = [
+    "striker",
+    "left_mid",
+    "right_mid",
+    "left_defence",
+    "right_defence",
+    "goal_keeper",
+]
+
+
+def fill_rollups(apps, schema_editor):
+    """A SeasonRollup per person and tournament, and career TOTW appearances."""
+    Person = apps.get_model("league", "Person")
+    SeasonRollup = apps.get_model("league", "SeasonRollup")
+    Goal = apps.get_model("league", "Goal")
+    Card = apps.get_model("league", "Card")
+    Match = apps.get_model("league", "Match")
+    TeamOfTheWeek = apps.get_model("league", "TeamOfTheWeek")
+
+    sources = [
+        (
+            "goals",
+            Goal.objects.all(),
+            "player__person",
+            "match__tournament",
+            Sum("goals"),
+        ),
+        (
+            "yellow_cards",
+            Card.objects.filter(card_type="YELLOW"),
+            "player__person",
+            "match__tournament",
+            Count("id"),
+        ),
+        (
+            "red_cards",
+            Card.objects.filter(card_type="RED"),
+            "player__person",
+            "match__tournament",
+            Count("id"),
+        ),
+        (
+            "motm_awards",
+            Match.objects.filter(Q(is_played=True) | Q(is_walkover=True)),
+            "mom__person",
+            "tournament",
+            Count("id"),
+        ),
+    ] + [
+        (
+            "totw_appearances",
+            TeamOfTheWeek.objects.all(),
+            f"{position}__person",
+            "tournament",
+            Count("id"),
+        )
+        for position in TOTW_POSITIONS
+    ]
+    totals = {}
+    for field, rows, person, tournament, aggregate in sources:
+        for person_id, tournament_id, total in (
+            rows.filter(**{f"{person}__isnull": False})
+            .order_by()
+            .values(person, tournament)
+            .annotate(total=aggregate)
+            .values_list(person, tournament, "total")
+        ):
+            row = totals.setdefault((person_id, tournament_id), {})
+            row[field] = row.get(field, 0) + (total or 0)
+    SeasonRollup.objects.bulk_create(
+        [
+            SeasonRollup(person_id=person_id, tournament_id=tournament_id, **values)
+            for (person_id, tournament_id), values in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+    appearances = {}
+    for (person_id, _), values in totals.items():
+        appearances[person_id] = appearances.get(person_id, 0) + values.get(
+            "totw_appearances", 0
+        )
+    for person_id, total in appearances.items():
+        if total:
+            Person.objects.filter(id=person_id).update(totw_appearances=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("league", "0018_person"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeasonRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("goals", models.PositiveIntegerField(default=0)),
+                ("yellow_cards", models.PositiveIntegerField(default=0)),
+                ("red_cards", models.PositiveIntegerField(default=0)),
+                ("motm_awards", models.PositiveIntegerField(default=0)),
+                ("totw_appearances", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "managed": True,
+            },
+        ),
+        migrations.AddField(
+            model_name="person",
+            name="totw_appearances",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="person",
+            index=models.Index(
+                fields=["-totw_appearances", "name"], name="league_person_totw_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="seasonrollup",
+            name="person",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="seasons",
+                to="league.person",
+            ),
+        ),
+        migrations.AddField(
+            model_name="seasonrollup",
+            name="tournament",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="season_rollups",
+                to="league.tournament",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seasonrollup",
+            index=models.Index(fields=["-goals"], name="league_season_goals_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="seasonrollup",
+            index=models.Index(fields=["-motm_awards"], name="league_season_motm_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="seasonrollup",
+            index=models.Index(
+                fields=["-totw_appearances"], name="league_season_totw_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seasonrollup",
+            index=models.Index(
+                fields=["tournament", "-goals"], name="league_season_t_goals_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seasonrollup",
+            index=models.Index(
+                fields=["tournament", "-motm_awards"], name="league_season_t_motm_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seasonrollup",
+            index=models.Index(
+                fields=["tournament", "-totw_appearances"],
+                name="league_season_t_totw_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="seasonrollup",
+            constraint=models.UniqueConstraint(
+                fields=("person", "tournament"), name="league_season_person_t_uniq"
+            ),
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
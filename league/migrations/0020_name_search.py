@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:18
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+# GIN trigram indexes answering the ``name__icontains`` lookups of search and
+# the admin, which compile to UPPER(name) LIKE UPPER('%term%'). Only on
+# PostgreSQL servers that ship pg_trgm; search falls back to the LOWER(name)
+# prefix indexes everywhere else.
+TRIGRAM_INDEXES = [
+    ("league_player_name_trgm_idx", "league_player"),
+    ("league_team_name_trgm_idx", "league_team"),
+    ("league_person_name_trgm_idx", "league_person"),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            "USING gin (UPPER(name) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("league", "0019_season_rollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+        migrations.AddIndex(
+            model_name="player",
+            index=models.Index(
+                django.db.models.functions.text.Lower("name"),
+                name="league_player_lower_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="team",
+            index=models.Index(
+                django.db.models.functions.text.Lower("name"),
+                name="league_team_lower_name_idx",
+            ),
+        ),
+    ]
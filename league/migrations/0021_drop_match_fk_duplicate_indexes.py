@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:39
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("league", "0020_name_search"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="card",
+            name="league_card_match_type_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="goal",
+            name="league_goal_match_player_idx",
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("league", "0021_drop_match_fk_duplicate_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="match",
+            name="league_match_t_w_kickoff_idx",
+        ),
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                fields=["tournament", "week_number", "match_date", "kickoff"],
+                name="league_match_t_w_date_ko_idx",
+            ),
+        ),
+    ]
@@ -1,16 +1,27 @@
 from django.db import models
-from datetime import date
+from django.db.models.functions import Lower
+from datetime import date, time
+import logging
 import re
 from pathlib import Path
 from cloudinary.models import CloudinaryField
 from PyPDF2 import PdfFileReader
 
+logger = logging.getLogger(__name__)
+
 # ========================
 # League Config (These could be in settings.py or a config file, but for simplicity,
 # we'll keep them here for now, similar to the original app)
 # ========================
 LEAGUE_START = date(2025, 6, 29)  # First Sunday
-MATCH_TIMES = ["6:00 PM", "6:45 PM", "7:30 PM", "8:15 PM", "9:00 PM", "9:45 PM"]
+MATCH_TIMES = [
+    time(18, 0),
+    time(18, 45),
+    time(19, 30),
+    time(20, 15),
+    time(21, 0),
+    time(21, 45),
+]  # Kick-off slots: 6:00 PM to 9:45 PM
 VENUE = "Dugout Turf, Robot Square, Indore"
 PDF_PATH = Path(
     "/mnt/data/Fixtures - ICCL 4.0.pdf"
@@ -25,9 +36,8 @@ def extract_text_from_pdf(path: Path):
     try:
         reader = PdfFileReader(str(path))
         return "\n".join(page.extract_text() or "" for page in reader.pages)
-    except Exception as e:
-        # Log the error, or handle it more gracefully
-        print(f"Error reading PDF: {e}")
+    except Exception:
+        logger.exception("Could not read PDF %s", path)
         return ""
 
 
@@ -122,12 +132,67 @@ class Team(models.Model):
     class Meta:
         managed = True
         db_table = "league_team"
+        indexes = [
+            # Prefix search where there are no trigram indexes (league/search.py)
+            models.Index(Lower("name"), name="league_team_lower_name_idx"),
+        ]
+
+
+class Person(models.Model):
+    """
+    One real person behind the Player rows of each tournament and team they
+    played for, matched by name and date of birth (league/people.py). Holds
+    their career totals over every tournament, kept up to date by signals.py.
+    """
+
+    name = models.CharField(max_length=100)
+    # Name with case and spacing normalised, for matching new Player rows
+    key = models.CharField(max_length=100, db_index=True)
+    dob = models.DateField(null=True, blank=True)
+    # month * 100 + day of the date of birth, for the birthday banner
+    birthday = models.PositiveSmallIntegerField(null=True, blank=True, db_index=True)
+    # The newest Player row: the person's current team
+    current_player = models.ForeignKey(
+        "Player", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    tournaments = models.PositiveIntegerField(default=0)
+    goals = models.PositiveIntegerField(default=0)
+    yellow_cards = models.PositiveIntegerField(default=0)
+    red_cards = models.PositiveIntegerField(default=0)
+    motm_awards = models.PositiveIntegerField(default=0)
+    totw_appearances = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} ({self.dob})" if self.dob else self.name
+
+    class Meta:
+        managed = True
+        verbose_name_plural = "People"
+        ordering = ["name"]
+        indexes = [
+            # Career leaderboards
+            models.Index(fields=["-goals", "name"], name="league_person_goals_idx"),
+            models.Index(
+                fields=["-motm_awards", "name"], name="league_person_motm_idx"
+            ),
+            models.Index(
+                fields=["-totw_appearances", "name"], name="league_person_totw_idx"
+            ),
+        ]
 
 
 class Player(models.Model):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=100)
     dob = models.DateField(null=True, blank=True)
+    person = models.ForeignKey(
+        Person,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="players",
+        help_text="The person this player row is. Set from name and date of birth when left empty.",
+    )
     team = models.ForeignKey(Team, related_name="players", on_delete=models.CASCADE)
     tournament = models.ForeignKey(
         Tournament,
@@ -141,6 +206,10 @@ class Player(models.Model):
     class Meta:
         managed = True
         db_table = "league_player"
+        indexes = [
+            # Prefix search where there are no trigram indexes (league/search.py)
+            models.Index(Lower("name"), name="league_player_lower_name_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.team.name})"
@@ -155,9 +224,9 @@ class Match(models.Model):
     away_team = models.ForeignKey(
         Team, related_name="away_matches", on_delete=models.CASCADE
     )
-    match_time = models.CharField(
-        max_length=10, blank=True, null=True
-    )  # e.g., "6:00 PM"
+    kickoff = models.TimeField(
+        blank=True, null=True, help_text="Kick-off time, e.g. 18:00 for 6:00 PM."
+    )
     home_score = models.IntegerField(blank=True, null=True)
     away_score = models.IntegerField(blank=True, null=True)
     is_played = models.BooleanField(default=False)
@@ -193,7 +262,20 @@ class Match(models.Model):
         verbose_name_plural = "Matches"
         managed = True
         db_table = "league_match"
-        ordering = ["week_number", "match_date", "match_time"]
+        ordering = ["week_number", "match_date", "kickoff"]
+        indexes = [
+            # A week's fixtures, in the order the fixtures page lists them.
+            models.Index(
+                fields=["tournament", "week_number", "match_date", "kickoff"],
+                name="league_match_t_w_date_ko_idx",
+            ),
+            # Results, stats and posts only read matches that have a result.
+            models.Index(
+                fields=["tournament", "week_number"],
+                name="league_match_result_idx",
+                condition=models.Q(is_played=True) | models.Q(is_walkover=True),
+            ),
+        ]
 
 
 class Team_Standing(models.Model):
@@ -222,6 +304,18 @@ class Team_Standing(models.Model):
         managed = True
         db_table = "league_team_standing"
         ordering = ["-points", "name"]  # Order by points descending, then by name
+        indexes = [
+            # Table page: one tournament, one matchweek.
+            models.Index(
+                fields=["tournament", "matches_played"],
+                name="league_standing_t_mp_idx",
+            ),
+            # Admin cascade: previous standing of a team by name.
+            models.Index(
+                fields=["name", "matches_played"],
+                name="league_standing_name_mp_idx",
+            ),
+        ]
 
 
 class Card(models.Model):
@@ -310,6 +404,11 @@ class TeamOfTheWeek(models.Model):
 
     class Meta:
         managed = True
+        indexes = [
+            models.Index(
+                fields=["tournament", "week_number"], name="league_totw_t_week_idx"
+            ),
+        ]
 
 
 class Sponsor(models.Model):
@@ -342,3 +441,164 @@ class Sponsor(models.Model):
     class Meta:
         managed = True
         db_table = "league_sponsor"
+
+
+class TrafficRollup(models.Model):
+    """
+    Page views and distinct visitors per hour or day, by page, tournament and
+    week, rolled up from the tracking app's raw rows by ``manage.py
+    rollup_traffic``. Rows with page ``all`` hold the period's totals.
+    """
+
+    HOUR = "hour"
+    DAY = "day"
+    PERIODS = [(HOUR, "Hour"), (DAY, "Day")]
+    ALL_PAGES = "all"
+
+    period = models.CharField(max_length=4, choices=PERIODS)
+    period_start = models.DateTimeField()
+    page = models.CharField(max_length=40)
+    tournament = models.ForeignKey(
+        Tournament,
+        on_delete=models.CASCADE,
+        related_name="traffic",
+        null=True,
+        blank=True,
+    )
+    week_number = models.IntegerField(null=True, blank=True)
+    views = models.PositiveIntegerField(default=0)
+    visitors = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.page} ({self.get_period_display()} of {self.period_start})"
+
+    class Meta:
+        managed = True
+        indexes = [
+            models.Index(
+                fields=["period", "period_start"], name="league_traffic_period_idx"
+            ),
+        ]
+
+
+class RequestProfile(models.Model):
+    """
+    A cProfile run of one request, asked for by a staff user with ``?profile=1``
+    or an ``X-Profile`` header (league/profiling.py). Only the newest
+    PROFILE_KEEP profiles are kept.
+    """
+
+    created = models.DateTimeField(auto_now_add=True)
+    user = models.ForeignKey(
+        "auth.User", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    view = models.CharField(max_length=100)
+    status_code = models.PositiveSmallIntegerField()
+    total_seconds = models.FloatField()
+    sql_queries = models.PositiveIntegerField(default=0)
+    sql_seconds = models.FloatField(default=0)
+    template_seconds = models.FloatField(default=0)
+    # Seconds spent in the code of each part (view code, ORM, templates, pandas...)
+    breakdown = models.JSONField(default=dict)
+    report = models.TextField()
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.total_seconds * 1000:.0f} ms)"
+
+    class Meta:
+        managed = True
+        ordering = ["-created"]
+
+
+class TeamRating(models.Model):
+    """
+    A team's Elo rating after one of its matches (league/ratings.py). A team's
+    newest row holds its current rating and its rows in order are its history,
+    across every tournament.
+    """
+
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="ratings")
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name="ratings")
+    opponent = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="+")
+    tournament = models.ForeignKey(
+        Tournament,
+        on_delete=models.CASCADE,
+        related_name="ratings",
+        null=True,
+        blank=True,
+    )
+    match_date = models.DateField()
+    week_number = models.IntegerField()
+    rating = models.FloatField()
+    change = models.FloatField()
+
+    def __str__(self):
+        return f"{self.team} {self.rating:.0f} after {self.match}"
+
+    class Meta:
+        managed = True
+        ordering = ["match_date", "match_id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["team", "match"], name="league_rating_team_match_uniq"
+            ),
+        ]
+        indexes = [
+            # A team's ratings in match order: its history and latest rating.
+            models.Index(
+                fields=["team", "match_date", "match"],
+                name="league_rating_team_date_idx",
+            ),
+        ]
+
+
+class SeasonRollup(models.Model):
+    """
+    A person's totals in one tournament, kept up to date with their career
+    totals (league/people.py). The all-time records page ranks these rows for
+    the best single seasons and sums them into Person for careers, so neither
+    scans the goals, cards, matches and teams of the week.
+    """
+
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name="seasons")
+    tournament = models.ForeignKey(
+        Tournament,
+        on_delete=models.CASCADE,
+        related_name="season_rollups",
+        null=True,
+        blank=True,
+    )
+    goals = models.PositiveIntegerField(default=0)
+    yellow_cards = models.PositiveIntegerField(default=0)
+    red_cards = models.PositiveIntegerField(default=0)
+    motm_awards = models.PositiveIntegerField(default=0)
+    totw_appearances = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.person} in {self.tournament}"
+
+    class Meta:
+        managed = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=["person", "tournament"], name="league_season_person_t_uniq"
+            ),
+        ]
+        indexes = [
+            # Best single seasons, over all tournaments or within one.
+            models.Index(fields=["-goals"], name="league_season_goals_idx"),
+            models.Index(fields=["-motm_awards"], name="league_season_motm_idx"),
+            models.Index(fields=["-totw_appearances"], name="league_season_totw_idx"),
+            models.Index(
+                fields=["tournament", "-goals"], name="league_season_t_goals_idx"
+            ),
+            models.Index(
+                fields=["tournament", "-motm_awards"], name="league_season_t_motm_idx"
+            ),
+            models.Index(
+                fields=["tournament", "-totw_appearances"],
+                name="league_season_t_totw_idx",
+            ),
+        ]
@@ -0,0 +1,268 @@
+"""
+Canonical people behind the per-tournament Player rows.
+
+Each tournament (and each team within one) gets its own Player row, so one
+person has several. Every Player links to a Person, found by name (ignoring
+case and spacing) and date of birth when the row is saved without one. A row
+without a date of birth joins the only person of that name, if there is just
+one. Staff can relink rows in the admin.
+
+A Person stores its newest Player row (the current team) and its career totals,
+summed from a SeasonRollup row per tournament it played in. Whenever a goal,
+card, man of the match award, team of the week or player row changes,
+signals.py recounts just the totals it can move for the people it concerns, so
+all-time and best-season leaderboards read a few rows off a top-N index instead
+of scanning the source tables. ``manage.py rebuild_leaderboards`` recounts
+everything.
+"""
+
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Card, Goal, Match, Person, Player, SeasonRollup, TeamOfTheWeek
+
+TOTW_POSITIONS = [
+    "striker",
+    "left_mid",
+    "right_mid",
+    "left_defence",
+    "right_defence",
+    "goal_keeper",
+]
+
+
+def person_key(name):
+    return " ".join(name.split()).casefold()
+
+
+def birthday_of(dob):
+    return dob.month * 100 + dob.day if dob else None
+
+
+def find_person(name, dob):
+    """The Person a player row named ``name`` born on ``dob`` is, or a new one."""
+    key = person_key(name)
+    people = list(Person.objects.filter(key=key))
+    if dob is None:
+        if len(people) == 1:
+            return people[0]
+        match = next((person for person in people if person.dob is None), None)
+    else:
+        match = next((person for person in people if person.dob == dob), None)
+        if match is None:
+            # Someone entered before their date of birth was known.
+            undated = [person for person in people if person.dob is None]
+            if len(undated) == 1:
+                match = undated[0]
+                match.dob, match.birthday = dob, birthday_of(dob)
+                match.save(update_fields=["dob", "birthday"])
+    if match is None:
+        match = Person.objects.create(
+            name=" ".join(name.split()), key=key, dob=dob, birthday=birthday_of(dob)
+        )
+    return match
+
+
+def assign_person(player):
+    """Links an unlinked ``player`` row to its Person before it is saved."""
+    if player.person_id is None and player.name:
+        player.person = find_person(player.name, player.dob)
+
+
+# Where each season total comes from: (rows, path to the person, path to the
+# tournament, aggregate) per source; a TOTW counts once per position held.
+SEASON_SOURCES = {
+    "goals": [
+        (Goal.objects.all(), "player__person", "match__tournament", Sum("goals"))
+    ],
+    "yellow_cards": [
+        (
+            Card.objects.filter(card_type="YELLOW"),
+            "player__person",
+            "match__tournament",
+            Count("id"),
+        )
+    ],
+    "red_cards": [
+        (
+            Card.objects.filter(card_type="RED"),
+            "player__person",
+            "match__tournament",
+            Count("id"),
+        )
+    ],
+    "motm_awards": [
+        (
+            Match.objects.filter(Q(is_played=True) | Q(is_walkover=True)),
+            "mom__person",
+            "tournament",
+            Count("id"),
+        )
+    ],
+    "totw_appearances": [
+        (TeamOfTheWeek.objects.all(), f"{position}__person", "tournament", Count("id"))
+        for position in TOTW_POSITIONS
+    ],
+}
+SEASON_FIELDS = list(SEASON_SOURCES)
+
+# The season totals a change to a row of each model can move.
+CHANGED_FIELDS = {
+    Goal: ["goals"],
+    Card: ["yellow_cards", "red_cards"],
+    Match: ["motm_awards"],
+    TeamOfTheWeek: ["totw_appearances"],
+    Player: SEASON_FIELDS,
+}
+
+
+def season_totals(fields, person_ids=None):
+    """{(person id, tournament id): {field: total}} of ``fields``, from the source rows."""
+    totals = {}
+    for field in fields:
+        for rows, person, tournament, aggregate in SEASON_SOURCES[field]:
+            rows = rows.filter(**{f"{person}__isnull": False})
+            if person_ids is not None:
+                rows = rows.filter(**{f"{person}__in": person_ids})
+            for person_id, tournament_id, total in (
+                rows.order_by()
+                .values(person, tournament)
+                .annotate(total=aggregate)
+                .values_list(person, tournament, "total")
+            ):
+                row = totals.setdefault(
+                    (person_id, tournament_id), dict.fromkeys(fields, 0)
+                )
+                row[field] += total or 0
+    return totals
+
+
+def refresh_rollups(fields, person_ids=None):
+    """Rewrites ``fields`` of the SeasonRollup rows of ``person_ids`` (or everyone)."""
+    totals = season_totals(fields, person_ids)
+    rollups = SeasonRollup.objects.all()
+    if person_ids is not None:
+        rollups = rollups.filter(person_id__in=person_ids)
+    rollups = list(rollups)
+    for rollup in rollups:
+        values = totals.pop((rollup.person_id, rollup.tournament_id), {})
+        for field in fields:
+            setattr(rollup, field, values.get(field, 0))
+    SeasonRollup.objects.bulk_update(rollups, fields)
+    SeasonRollup.objects.bulk_create(
+        [
+            SeasonRollup(person_id=person_id, tournament_id=tournament_id, **values)
+            for (person_id, tournament_id), values in totals.items()
+        ]
+    )
+    # Seasons with nothing left to count
+    SeasonRollup.objects.filter(
+        pk__in=[rollup.pk for rollup in rollups], **dict.fromkeys(SEASON_FIELDS, 0)
+    ).delete()
+
+
+def _total(queryset, expression):
+    return Coalesce(
+        Subquery(
+            queryset.filter(person=OuterRef("pk"))
+            .order_by()
+            .values("person")
+            .annotate(total=expression)
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def career_totals(fields):
+    """Annotations recomputing the current player and career ``fields`` of people."""
+    return {
+        "new_current_player": Subquery(
+            Player.objects.filter(person=OuterRef("pk"))
+            .order_by("-id")
+            .values("id")[:1]
+        ),
+        "new_tournaments": _total(
+            Player.objects.filter(tournament__isnull=False),
+            Count("tournament", distinct=True),
+        ),
+        **{
+            f"new_{field}": _total(SeasonRollup.objects.all(), Sum(field))
+            for field in fields
+        },
+    }
+
+
+def refresh_careers(person_ids=None, fields=None):
+    """
+    Brings the SeasonRollup rows and career totals of the people ``person_ids``
+    (or everyone) up to date, recounting only ``fields`` (all by default) from
+    the source rows. Removes people left without player rows.
+    """
+    fields = fields or SEASON_FIELDS
+    people = Person.objects.all()
+    if person_ids is not None:
+        person_ids = {person_id for person_id in person_ids if person_id}
+        if not person_ids:
+            return
+        people = people.filter(pk__in=person_ids)
+
+    refresh_rollups(fields, person_ids)
+    changed, orphans = [], []
+    for person in people.annotate(**career_totals(fields)):
+        if person.new_current_player is None:
+            orphans.append(person.pk)
+            continue
+        person.current_player_id = person.new_current_player
+        for field in ["tournaments", *fields]:
+            setattr(person, field, getattr(person, f"new_{field}"))
+        changed.append(person)
+    Person.objects.bulk_update(changed, ["current_player", "tournaments", *fields])
+    if orphans:
+        Person.objects.filter(pk__in=orphans).delete()
+
+
+def _person_paths(sender):
+    if sender is Player:
+        return ["person"]
+    if sender is Match:
+        return ["mom__person"]
+    if sender is TeamOfTheWeek:
+        return [f"{position}__person" for position in TOTW_POSITIONS]
+    return ["player__person"]
+
+
+def people_of(sender, instance):
+    """Ids of the people whose career totals ``instance`` counts towards."""
+    if sender is Player:
+        return {instance.person_id}
+    if sender is TeamOfTheWeek:
+        player_ids = [
+            getattr(instance, f"{position}_id") for position in TOTW_POSITIONS
+        ]
+    else:
+        player_ids = [instance.mom_id if sender is Match else instance.player_id]
+    player_ids = [player_id for player_id in player_ids if player_id]
+    if not player_ids:
+        return set()
+    return set(
+        Player.objects.filter(pk__in=player_ids).values_list("person_id", flat=True)
+    )
+
+
+def stored_people_of(sender, instance):
+    """people_of the saved copy of ``instance``, before the pending save changes it."""
+    if instance.pk is None:
+        return set()
+    rows = sender.objects.filter(pk=instance.pk).values_list(*_person_paths(sender))
+    return {person_id for row in rows for person_id in row}
+
+
+def birthday_players(today):
+    """(name, current team name) of the people born on ``today``'s day and month."""
+    return list(
+        Person.objects.filter(birthday=birthday_of(today), current_player__isnull=False)
+        .order_by("name")
+        .values_list("current_player__name", "current_player__team__name")
+    )
@@ -0,0 +1,139 @@
+"""
+On-demand request profiles for staff.
+
+A staff user adds ``?profile=1`` to any URL, or sends an ``X-Profile`` header,
+and that one request runs under cProfile. The run is saved as a RequestProfile
+(admin: *Request profiles*) with:
+
+- wall time, SQL queries and time, and template render time, from the
+  per-request counters of league/metrics.py
+- the time spent inside the code of each part (view code, ORM, templates,
+  pandas, the rest of Django), summed from the profile
+- the functions with the highest cumulative time
+
+The response carries an ``X-Profile`` header with the profile's admin URL. Other
+requests only pay for a dict lookup. One request per process is profiled at a
+time; under ASGI the profile covers the event loop thread, and work handed to
+threads shows up as SQL and template time only.
+"""
+
+import cProfile
+import io
+import pstats
+import threading
+import time
+
+from django.conf import settings
+from django.urls import reverse
+
+from .metrics import RequestStats, request_stats
+from .models import RequestProfile
+from .routers import primary_reads
+
+PROFILE_PARAM = "profile"
+PROFILE_HEADER = "HTTP_X_PROFILE"
+
+# First match wins: (part, fragments of the function's file or name).
+PARTS = (
+    ("pandas", ("/pandas/", "/numpy/")),
+    ("templates", ("/django/template/", "/templatetags/", "/templates/")),
+    ("orm", ("/django/db/", "psycopg", "sqlite3")),
+    ("view code", ("/league/",)),
+    ("django", ("/django/",)),
+)
+
+_profiling = threading.Lock()
+
+
+def wants_profile(request):
+    """Cheap check first: only requests that ask are looked at any further."""
+    return (
+        PROFILE_PARAM in request.GET or PROFILE_HEADER in request.META
+    ) and request.user.is_staff
+
+
+def part_of(function):
+    filename, _, name = function
+    location = f"{filename} {name}"
+    for part, fragments in PARTS:
+        if any(fragment in location for fragment in fragments):
+            return part
+    return "other"
+
+
+def breakdown(stats):
+    """Own time of the profiled functions, summed by part, in seconds."""
+    parts = {}
+    for function, (_, _, own_time, _, _) in stats.stats.items():
+        part = part_of(function)
+        parts[part] = parts.get(part, 0) + own_time
+    return {
+        part: round(seconds, 6)
+        for part, seconds in sorted(parts.items(), key=lambda item: -item[1])
+    }
+
+
+def save_profile(profiler, request, response, stats, seconds):
+    """Stores the profile and points the response at it."""
+    report = io.StringIO()
+    profile_stats = pstats.Stats(profiler, stream=report)
+    profile_stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+        settings.PROFILE_TOP_FUNCTIONS
+    )
+    match = request.resolver_match
+    # A profile is not league data: don't pin the browser to the primary for it.
+    with primary_reads():
+        profile = RequestProfile.objects.create(
+            user=request.user,
+            method=request.method,
+            path=request.get_full_path()[:255],
+            view=((match.url_name or match.view_name) if match else "unmatched")[:100],
+            status_code=response.status_code,
+            total_seconds=seconds,
+            sql_queries=stats.queries,
+            sql_seconds=stats.query_seconds,
+            template_seconds=stats.template_seconds,
+            breakdown=breakdown(profile_stats),
+            report=report.getvalue(),
+        )
+        RequestProfile.objects.filter(
+            pk__lte=profile.pk - settings.PROFILE_KEEP
+        ).delete()
+    response["X-Profile"] = reverse(
+        "admin:league_requestprofile_change", args=[profile.pk]
+    )
+
+
+class Profiling:
+    """
+    One profiled request: ``stop`` once the response is ready (also when the
+    view raised), then ``save``.
+    """
+
+    def __init__(self):
+        self.stats = request_stats.get()
+        self.token = None
+        if self.stats is None:
+            # MetricsMiddleware is not installed: count this request's work here.
+            self.stats = RequestStats()
+            self.token = request_stats.set(self.stats)
+        self.profiler = None
+        if _profiling.acquire(blocking=False):
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.start = time.perf_counter()
+
+    def stop(self):
+        self.seconds = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.profiler.disable()
+            _profiling.release()
+        if self.token is not None:
+            request_stats.reset(self.token)
+
+    def save(self, request, response):
+        if self.profiler is None:
+            # Another request of this process is being profiled.
+            response["X-Profile"] = "busy"
+            return
+        save_profile(self.profiler, request, response, self.stats, self.seconds)
@@ -0,0 +1,262 @@
+"""
+Season projections: each team's chance of finishing in each position.
+
+The unplayed matches of a tournament are simulated PROJECTION_SIMULATIONS times
+at once with NumPy. Goals are Poisson distributed: a team's rate against an
+opponent is its scoring rate times the opponent's conceding rate over the league
+average, both taken from the results so far and pulled towards the league
+average by PROJECTION_PRIOR_MATCHES matches' worth of average play (so a team
+with two results isn't projected from two results alone). Simulated results are
+added to the current standings and ranked like the table: by the standings rules
+of TABLE_TIEBREAKERS, then the teams still level are ordered by its other rules
+(head-to-head so far, fair play, lots) through standings.rank_standings.
+
+With PROJECTION_PROCESSES above 1 the batches of simulations are spread over a
+process pool. Results are cached under a digest of the tournament's matches and
+scores, so they are recomputed once after each new result, not when a goal
+scorer or card is edited.
+"""
+
+import hashlib
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from django.conf import settings
+
+from .models import Match, Team, Team_Standing
+from .standings import STANDING_RULES, rank_standings
+
+# Composite sort key: points dominate goal difference, which dominates goals for.
+GOAL_OFFSET = 1000
+BATCH_SIMULATIONS = 5000
+
+
+@dataclass
+class Season:
+    """What the simulation needs, as arrays indexed like ``teams`` (team names)."""
+
+    teams: list
+    points: np.ndarray
+    goal_difference: np.ndarray
+    goals_for: np.ndarray
+    # Remaining fixtures: home and away team indexes, expected goals of each side
+    home: np.ndarray
+    away: np.ndarray
+    home_rate: np.ndarray
+    away_rate: np.ndarray
+    # Standings rules in table order, then each team's place among teams still
+    # level after them (None: a coin toss)
+    standing_rules: tuple = ("points", "goal_difference", "goals_for")
+    tiebreak: np.ndarray = None
+
+
+def current_standings(tournament):
+    """Latest Team_Standing row of each team of the tournament, by team name."""
+    latest = {}
+    for row in (
+        Team_Standing.objects.filter(tournament=tournament)
+        .order_by("name", "matches_played", "id")
+        .values("name", "points", "goal_difference", "goals_for")
+    ):
+        latest[row["name"]] = row
+    return latest
+
+
+def scoring_rates(played, team_ids):
+    """(scoring rate, conceding rate) per team, shrunk towards the league average."""
+    index = {team_id: i for i, team_id in enumerate(team_ids)}
+    scored = np.zeros(len(team_ids))
+    conceded = np.zeros(len(team_ids))
+    matches = np.zeros(len(team_ids))
+    for home_id, away_id, home_score, away_score in played:
+        for team_id, goals_for, goals_against in (
+            (home_id, home_score, away_score),
+            (away_id, away_score, home_score),
+        ):
+            if team_id in index:
+                i = index[team_id]
+                scored[i] += goals_for
+                conceded[i] += goals_against
+                matches[i] += 1
+
+    average = scored.sum() / matches.sum() if matches.sum() else 1.0
+    average = max(average, 0.1)
+    prior = settings.PROJECTION_PRIOR_MATCHES
+    attack = (scored + prior * average) / (matches + prior)
+    defence = (conceded + prior * average) / (matches + prior)
+    return attack, defence, average
+
+
+def tiebreak_order(tournament, teams):
+    """
+    Place of each of ``teams`` (names) by the table's rules after the standings
+    ones, counted from 0; what decides between teams the simulation leaves level.
+    """
+    rules = [rule for rule in settings.TABLE_TIEBREAKERS if rule not in STANDING_RULES]
+    if not rules:
+        return None
+    ranked = rank_standings(tournament, math.inf, [{"name": n} for n in teams], rules)
+    place = {row["name"]: i for i, row in enumerate(ranked)}
+    return np.array([place[name] for name in teams])
+
+
+def load_season(tournament):
+    """The tournament's current standings and remaining fixtures as a Season."""
+    teams = list(
+        Team.objects.filter(tournament=tournament)
+        .order_by("name")
+        .values_list("id", "name")
+    )
+    team_ids = [team_id for team_id, _ in teams]
+    index = {team_id: i for i, team_id in enumerate(team_ids)}
+
+    matches = Match.objects.filter(tournament=tournament)
+    played = matches.filter(
+        is_played=True, home_score__isnull=False, away_score__isnull=False
+    ).values_list("home_team_id", "away_team_id", "home_score", "away_score")
+    remaining = [
+        (index[home_id], index[away_id])
+        for home_id, away_id in matches.filter(
+            is_played=False, is_walkover=False
+        ).values_list("home_team_id", "away_team_id")
+        if home_id in index and away_id in index
+    ]
+
+    attack, defence, average = scoring_rates(played, team_ids)
+    standings = current_standings(tournament)
+    table = [standings.get(name, {}) for _, name in teams]
+    home = np.array([h for h, _ in remaining], dtype=np.intp)
+    away = np.array([a for _, a in remaining], dtype=np.intp)
+    names = [name for _, name in teams]
+    return Season(
+        teams=names,
+        points=np.array([row.get("points", 0) for row in table]),
+        goal_difference=np.array([row.get("goal_difference", 0) for row in table]),
+        goals_for=np.array([row.get("goals_for", 0) for row in table]),
+        home=home,
+        away=away,
+        home_rate=attack[home] * defence[away] / average,
+        away_rate=attack[away] * defence[home] / average,
+        standing_rules=tuple(
+            rule for rule in settings.TABLE_TIEBREAKERS if rule in STANDING_RULES
+        ),
+        tiebreak=tiebreak_order(tournament, names),
+    )
+
+
+def simulate(season, simulations, seed):
+    """
+    Plays the remaining fixtures ``simulations`` times; returns how often each team
+    finished in each position (teams x positions) and its total simulated points.
+    """
+    rng = np.random.default_rng(seed)
+    team_count = len(season.teams)
+    fixtures = len(season.home)
+
+    home_goals = rng.poisson(season.home_rate, size=(simulations, fixtures))
+    away_goals = rng.poisson(season.away_rate, size=(simulations, fixtures))
+    home_points = np.where(
+        home_goals > away_goals, 3, np.where(home_goals == away_goals, 1, 0)
+    )
+    away_points = np.where(
+        away_goals > home_goals, 3, np.where(home_goals == away_goals, 1, 0)
+    )
+
+    # Fixture -> team incidence matrices turn per-fixture results into team totals.
+    home_of = np.zeros((fixtures, team_count))
+    home_of[np.arange(fixtures), season.home] = 1
+    away_of = np.zeros((fixtures, team_count))
+    away_of[np.arange(fixtures), season.away] = 1
+
+    points = season.points + home_points @ home_of + away_points @ away_of
+    margin = home_goals - away_goals
+    goal_difference = season.goal_difference + margin @ home_of - margin @ away_of
+    goals_for = season.goals_for + home_goals @ home_of + away_goals @ away_of
+
+    values = {
+        "points": points,
+        "goal_difference": goal_difference + GOAL_OFFSET // 2,
+        "goals_for": goals_for,
+    }
+    key = np.zeros((simulations, team_count))
+    for rule in season.standing_rules:
+        key = key * GOAL_OFFSET + values[rule]
+    if season.tiebreak is None:
+        key = key + rng.random((simulations, team_count))
+    else:
+        key = key * team_count + (team_count - 1 - season.tiebreak)
+    # finishers[s, p] is the team finishing p-th in simulation s.
+    finishers = np.argsort(-key, axis=1)
+    finishes = np.stack(
+        [
+            np.bincount(finishers[:, position], minlength=team_count)
+            for position in range(team_count)
+        ],
+        axis=1,
+    )
+    return finishes, points.sum(axis=0)
+
+
+def _simulate_batch(args):
+    return simulate(*args)
+
+
+def run_simulations(season, simulations, seed):
+    """
+    simulate() in batches of at most BATCH_SIMULATIONS, which bounds the memory
+    of the goal arrays, spread over PROJECTION_PROCESSES processes when above 1.
+    """
+    batches = [
+        (season, min(BATCH_SIMULATIONS, simulations - start), seed + i)
+        for i, start in enumerate(range(0, simulations, BATCH_SIMULATIONS))
+    ]
+    processes = min(settings.PROJECTION_PROCESSES, len(batches))
+    if processes <= 1:
+        results = [_simulate_batch(batch) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_simulate_batch, batches))
+    return (
+        sum(finishes for finishes, _ in results),
+        sum(points for _, points in results),
+    )
+
+
+def project_season(tournament, simulations=None, seed=None):
+    """
+    Rows for the table page, most expected points first: team name, expected
+    points and the percentage chance of each finishing position. Empty when
+    there is nothing left to play.
+    """
+    season = load_season(tournament)
+    if not len(season.home) or not season.teams:
+        return []
+    simulations = simulations or settings.PROJECTION_SIMULATIONS
+    seed = tournament.pk if seed is None else seed
+    finishes, total_points = run_simulations(season, simulations, seed)
+
+    rows = [
+        {
+            "name": name,
+            "expected_points": round(float(total_points[i]) / simulations, 1),
+            "positions": np.round(finishes[i] * 100 / simulations, 1).tolist(),
+        }
+        for i, name in enumerate(season.teams)
+    ]
+    return sorted(rows, key=lambda row: -row["expected_points"])
+
+
+def projections_cache_key(tournament):
+    """
+    Cache key of the projections: a digest of every match of the tournament with
+    its state and score, so only a new result or fixture replaces them.
+    """
+    matches = (
+        Match.objects.filter(tournament=tournament)
+        .order_by("id")
+        .values_list("id", "is_played", "is_walkover", "home_score", "away_score")
+    )
+    digest = hashlib.sha256(repr(list(matches)).encode()).hexdigest()
+    return f"league:{tournament.pk}:projections:{digest}"
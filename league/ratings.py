@@ -0,0 +1,277 @@
+"""
+Elo power ratings of teams across every tournament.
+
+Each decided match moves rating from the loser to the winner: ELO_K times the
+margin multiplier (1 for a one-goal game, 1.5 for two goals, (11 + margin) / 8
+beyond) times the difference between the result (1, 0.5 or 0) and the expected
+result given the two ratings and ELO_HOME_ADVANTAGE. Teams start at
+ELO_INITIAL_RATING and keep their rating from one tournament to the next.
+
+Every rated match stores a TeamRating row per team, so a team's current rating
+is its newest row and its history is all of them. Saving a result appends to
+the history (signals.py); editing or deleting a result that later matches of
+its teams were rated after replays the ratings from that match onwards once the
+transaction commits. ``manage.py replay_ratings`` rebuilds them from scratch,
+streaming the matches in date order in ELO_REPLAY_CHUNK sized reads and writes.
+"""
+
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+
+from .models import Match, Team, TeamRating
+from .routers import primary_reads
+
+MATCH_FIELDS = (
+    "id",
+    "match_date",
+    "week_number",
+    "tournament_id",
+    "home_team_id",
+    "away_team_id",
+    "home_score",
+    "away_score",
+)
+
+_pending = threading.local()
+
+
+def expected_result(rating, opponent_rating, advantage=0.0):
+    """Expected result (0 to 1) of a team against an opponent."""
+    return 1 / (1 + 10 ** ((opponent_rating - rating - advantage) / 400))
+
+
+def margin_multiplier(margin):
+    margin = abs(margin)
+    if margin <= 1:
+        return 1.0
+    if margin == 2:
+        return 1.5
+    return (11 + margin) / 8
+
+
+def rating_change(home_rating, away_rating, home_score, away_score):
+    """Rating the home side gains (the away side loses the same)."""
+    expected = expected_result(home_rating, away_rating, settings.ELO_HOME_ADVANTAGE)
+    result = 1.0 if home_score > away_score else 0.0 if home_score < away_score else 0.5
+    return (
+        settings.ELO_K
+        * margin_multiplier(home_score - away_score)
+        * (result - expected)
+    )
+
+
+def rated_matches():
+    """Matches that count towards the ratings: played, with a score."""
+    return Match.objects.filter(
+        is_played=True, home_score__isnull=False, away_score__isnull=False
+    )
+
+
+def from_key(key, date_field="match_date", id_field="id"):
+    """Q for rows at or after the (match date, match id) ``key``."""
+    date, match_id = key
+    return Q(**{f"{date_field}__gt": date}) | Q(
+        **{date_field: date, f"{id_field}__gte": match_id}
+    )
+
+
+def latest_ratings(before=None, team_ids=None):
+    """
+    {team id: rating} of every rated team (or of ``team_ids``), as of just
+    before the (match date, match id) key ``before`` or now.
+    """
+    ratings = TeamRating.objects.filter(team=OuterRef("pk"))
+    if before is not None:
+        ratings = ratings.exclude(from_key(before, id_field="match_id"))
+    teams = (
+        Team.objects.all() if team_ids is None else Team.objects.filter(pk__in=team_ids)
+    )
+    return dict(
+        teams.annotate(
+            rating=Subquery(
+                ratings.order_by("-match_date", "-match_id").values("rating")[:1]
+            )
+        )
+        .filter(rating__isnull=False)
+        .values_list("id", "rating")
+    )
+
+
+def rate(row, current):
+    """
+    The two TeamRating rows of a match (a MATCH_FIELDS tuple), rated from and
+    updating the ``current`` {team id: rating}.
+    """
+    match_id, date, week, tournament_id, home_id, away_id, home_score, away_score = row
+    initial = settings.ELO_INITIAL_RATING
+    home_rating = current.get(home_id, initial)
+    away_rating = current.get(away_id, initial)
+    change = rating_change(home_rating, away_rating, home_score, away_score)
+    current[home_id] = home_rating + change
+    current[away_id] = away_rating - change
+    return [
+        TeamRating(
+            team_id=team_id,
+            opponent_id=opponent_id,
+            match_id=match_id,
+            tournament_id=tournament_id,
+            match_date=date,
+            week_number=week,
+            rating=current[team_id],
+            change=sign * change,
+        )
+        for team_id, opponent_id, sign in (
+            (home_id, away_id, 1),
+            (away_id, home_id, -1),
+        )
+    ]
+
+
+def replay(since=None, chunk_size=None):
+    """
+    Recomputes the ratings of every match from the (match date, match id) key
+    ``since`` onwards, or of all matches. Matches are read and ratings written
+    ``chunk_size`` (ELO_REPLAY_CHUNK) at a time. Returns the number of matches
+    rated.
+    """
+    chunk_size = chunk_size or settings.ELO_REPLAY_CHUNK
+    matches = rated_matches()
+    ratings = TeamRating.objects.all()
+    with primary_reads(), transaction.atomic():
+        if since is None:
+            current = {}
+        else:
+            current = latest_ratings(before=since)
+            matches = matches.filter(from_key(since))
+            ratings = ratings.filter(from_key(since, id_field="match_id"))
+        ratings.delete()
+
+        rated, batch = 0, []
+        for row in (
+            matches.order_by("match_date", "id")
+            .values_list(*MATCH_FIELDS)
+            .iterator(chunk_size=chunk_size)
+        ):
+            batch += rate(row, current)
+            rated += 1
+            if len(batch) >= chunk_size:
+                TeamRating.objects.bulk_create(batch)
+                batch = []
+        TeamRating.objects.bulk_create(batch)
+    return rated
+
+
+def _replay_pending():
+    since = _pending.__dict__.pop("since", None)
+    if since is not None:
+        replay(since)
+
+
+def replay_on_commit(since):
+    """
+    Replays from ``since`` once the current transaction commits; several calls
+    in one transaction (a cascade deleting many matches) make one replay.
+    """
+    pending = getattr(_pending, "since", None)
+    _pending.since = since if pending is None else min(pending, since)
+    transaction.on_commit(_replay_pending)
+
+
+def rate_match(match, deleted=False):
+    """
+    Brings the ratings up to date after ``match`` was saved or deleted. A match
+    newer than every other rated match of its teams is rated on the spot;
+    anything else replays the ratings from the earliest point it changed.
+    """
+    has_result = (
+        match.is_played
+        and match.home_score is not None
+        and match.away_score is not None
+    )
+    if deleted and not has_result:
+        return  # it was never rated
+    is_rated = has_result and not deleted
+    with primary_reads(), transaction.atomic():
+        # Where the match was rated before; a deleted match's rows are gone already.
+        old = list(
+            TeamRating.objects.filter(match=match).values_list("team_id", "match_date")
+        )
+        if not old and not is_rated and not deleted:
+            return
+
+        keys = [(date, match.pk) for _, date in old]
+        team_ids = {team_id for team_id, _ in old}
+        if has_result:
+            keys.append((match.match_date, match.pk))
+            team_ids |= {match.home_team_id, match.away_team_id}
+        since = min(keys)
+        later = (
+            TeamRating.objects.filter(team_id__in=team_ids)
+            .filter(from_key(since, id_field="match_id"))
+            .exclude(match_id=match.pk)
+        )
+        if later.exists():
+            replay_on_commit(since)
+            return
+
+        TeamRating.objects.filter(match=match).delete()
+        if is_rated:
+            current = latest_ratings(before=since, team_ids=team_ids)
+            row = tuple(getattr(match, field) for field in MATCH_FIELDS)
+            TeamRating.objects.bulk_create(rate(row, current))
+
+
+# -------------------------------
+# Pages and API
+# -------------------------------
+
+
+def rating_table():
+    """Every rated team, highest rating first, with its rating and matches rated."""
+    latest = TeamRating.objects.filter(team=OuterRef("pk")).order_by(
+        "-match_date", "-match_id"
+    )
+    return list(
+        Team.objects.annotate(
+            rating=Subquery(latest.values("rating")[:1]),
+            matches_rated=Count("ratings"),
+        )
+        .filter(rating__isnull=False)
+        .order_by("-rating", "name")
+        .values("id", "name", "rating", "matches_rated")
+    )
+
+
+def rating_history(team_id):
+    """A team's rating after each of its matches, oldest first."""
+    return list(
+        TeamRating.objects.filter(team_id=team_id)
+        .order_by("match_date", "match_id")
+        .values(
+            "match_id",
+            "match_date",
+            "week_number",
+            "tournament_id",
+            "tournament__short_description",
+            "opponent__name",
+            "rating",
+            "change",
+        )
+    )
+
+
+def chart_points(values, width=600, height=120, padding=4):
+    """SVG polyline points drawing ``values`` left to right in a width x height box."""
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    step = (width - 2 * padding) / max(len(values) - 1, 1)
+    return " ".join(
+        f"{padding + i * step:.1f},"
+        f"{height - padding - (value - low) * (height - 2 * padding) / span:.1f}"
+        for i, value in enumerate(values)
+    )
@@ -0,0 +1,243 @@
+"""
+Per-tournament results matrix and the team page built from it.
+
+A ResultsMatrix holds every decided match of a tournament as team x team x week
+arrays (who met whom, who was at home, goals), built from one Match query and
+cached until the tournament's next saved result (league/cache.py). The league
+table's head-to-head tiebreakers (league/standings.py) and the team page's form,
+home/away splits, biggest wins and head-to-head history are slices of it, so none
+of them query the database per request. The head-to-head spans every tournament,
+so it is cached under the generation shared by all of them.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+from django.core.cache import cache
+
+from .cache import all_tournaments_cache_key, league_cache_key
+from .models import Match
+from .tournaments import all_tournaments
+
+FORM_MATCHES = 5
+BIGGEST_WINS = 3
+
+
+@dataclass
+class ResultsMatrix:
+    """
+    ``played[w, i, j]``: team i met team j in ``weeks[w]``; ``home[w, i, j]``: i
+    was the home side; ``goals[w, i, j]``: goals i scored against j that week.
+    Teams are indexed like ``team_ids`` and ``names``.
+    """
+
+    team_ids: list
+    names: list
+    weeks: list
+    played: np.ndarray
+    home: np.ndarray
+    goals: np.ndarray
+
+    @cached_property
+    def index(self):
+        return {team_id: i for i, team_id in enumerate(self.team_ids)}
+
+    @cached_property
+    def name_index(self):
+        return {name: i for i, name in enumerate(self.names)}
+
+    @cached_property
+    def conceded(self):
+        """``conceded[w, i, j]``: goals i conceded to j."""
+        return self.goals.transpose(0, 2, 1)
+
+    @cached_property
+    def points(self):
+        """``points[w, i, j]``: points i took from j."""
+        return np.where(
+            self.played,
+            np.where(
+                self.goals > self.conceded, 3, (self.goals == self.conceded).astype(int)
+            ),
+            0,
+        )
+
+    @cached_property
+    def points_to_date(self):
+        return self.points.cumsum(axis=0)
+
+    @cached_property
+    def goals_to_date(self):
+        return self.goals.cumsum(axis=0)
+
+    @cached_property
+    def conceded_to_date(self):
+        return self.conceded.cumsum(axis=0)
+
+    def week_position(self, week):
+        """Row of the arrays holding ``week`` or the last week before it, or None."""
+        position = bisect_right(self.weeks, week) - 1
+        return position if position >= 0 else None
+
+    def matches_of(self, team):
+        """Team index ``team``'s matches as (week positions, opponent indexes), oldest first."""
+        return np.nonzero(self.played[:, team, :])
+
+    def meeting(self, w, team, opponent):
+        scored = int(self.goals[w, team, opponent])
+        conceded = int(self.goals[w, opponent, team])
+        return {
+            "week": self.weeks[w],
+            "opponent": self.names[opponent],
+            "opponent_id": self.team_ids[opponent],
+            "home": bool(self.home[w, team, opponent]),
+            "goals_for": scored,
+            "goals_against": conceded,
+            "result": "W" if scored > conceded else "L" if scored < conceded else "D",
+        }
+
+
+def build_results_matrix(tournament):
+    """The tournament's ResultsMatrix, from one query."""
+    rows = list(
+        Match.objects.filter(
+            tournament=tournament,
+            is_played=True,
+            home_score__isnull=False,
+            away_score__isnull=False,
+        )
+        .order_by()
+        .values_list(
+            "week_number",
+            "home_team_id",
+            "home_team__name",
+            "away_team_id",
+            "away_team__name",
+            "home_score",
+            "away_score",
+        )
+    )
+    teams = sorted(
+        {(row[1], row[2]) for row in rows} | {(row[3], row[4]) for row in rows}
+    )
+    index = {team_id: i for i, (team_id, _) in enumerate(teams)}
+    weeks = sorted({row[0] for row in rows})
+    week_index = {week: w for w, week in enumerate(weeks)}
+
+    shape = (len(weeks), len(teams), len(teams))
+    played = np.zeros(shape, dtype=bool)
+    home = np.zeros(shape, dtype=bool)
+    goals = np.zeros(shape, dtype=np.int16)
+    for week, home_id, _, away_id, _, home_score, away_score in rows:
+        w, h, a = week_index[week], index[home_id], index[away_id]
+        played[w, h, a] = played[w, a, h] = True
+        home[w, h, a] = True
+        goals[w, h, a] += home_score
+        goals[w, a, h] += away_score
+
+    return ResultsMatrix(
+        team_ids=[team_id for team_id, _ in teams],
+        names=[name for _, name in teams],
+        weeks=weeks,
+        played=played,
+        home=home,
+        goals=goals,
+    )
+
+
+def results_matrix(tournament):
+    """The tournament's ResultsMatrix, cached until its next saved result."""
+    return cache.get_or_set(
+        league_cache_key(tournament, "results_matrix"),
+        lambda: build_results_matrix(tournament),
+        None,
+    )
+
+
+# -------------------------------
+# Team page
+# -------------------------------
+
+
+def record(meetings):
+    """Played, won, drawn, lost, goals for and against of a list of meetings."""
+    results = [meeting["result"] for meeting in meetings]
+    return {
+        "played": len(meetings),
+        "wins": results.count("W"),
+        "draws": results.count("D"),
+        "losses": results.count("L"),
+        "goals_for": sum(meeting["goals_for"] for meeting in meetings),
+        "goals_against": sum(meeting["goals_against"] for meeting in meetings),
+    }
+
+
+def team_season(matrix, team_id):
+    """Form, home/away splits and biggest wins of a team in one tournament."""
+    team = matrix.index.get(team_id)
+    if team is None:
+        return {"form": [], "home": record([]), "away": record([]), "biggest_wins": []}
+    weeks, opponents = matrix.matches_of(team)
+    meetings = [matrix.meeting(w, team, j) for w, j in zip(weeks, opponents)]
+
+    margins = (
+        matrix.goals[weeks, team, opponents] - matrix.goals[weeks, opponents, team]
+    )
+    # Biggest margin first; the more goals scored, then the later week, on a tie.
+    order = np.lexsort((weeks, matrix.goals[weeks, team, opponents], margins))
+    wins = [i for i in order[::-1] if margins[i] > 0]
+    return {
+        "form": meetings[-FORM_MATCHES:][::-1],
+        "home": record([meeting for meeting in meetings if meeting["home"]]),
+        "away": record([meeting for meeting in meetings if not meeting["home"]]),
+        "biggest_wins": [meetings[i] for i in wins[:BIGGEST_WINS]],
+    }
+
+
+def head_to_head(team_id):
+    """
+    The team's record against each opponent it has met, over every tournament,
+    with the meetings (newest first); most played first. Cached until a result of
+    any tournament is saved.
+    """
+    return cache.get_or_set(
+        all_tournaments_cache_key("head_to_head", team_id),
+        lambda: _head_to_head(team_id),
+        None,
+    )
+
+
+def _head_to_head(team_id):
+    opponents = {}
+    for tournament in all_tournaments():
+        matrix = results_matrix(tournament)
+        team = matrix.index.get(team_id)
+        if team is None:
+            continue
+        weeks, rivals = matrix.matches_of(team)
+        for w, j in zip(weeks, rivals):
+            meeting = matrix.meeting(w, team, j)
+            meeting["tournament"] = tournament.short_description
+            opponents.setdefault(matrix.names[j], []).append(meeting)
+
+    rows = [
+        {"opponent": name, **record(meetings), "meetings": meetings[::-1]}
+        for name, meetings in opponents.items()
+    ]
+    return sorted(rows, key=lambda row: (-row["played"], row["opponent"]))
+
+
+def team_page_data(tournament, team):
+    """
+    Everything the team page shows: the season, cached per tournament
+    generation, and the head-to-head over every tournament, cached until any
+    tournament's data changes.
+    """
+    season = cache.get_or_set(
+        league_cache_key(tournament, "team", team.pk),
+        lambda: team_season(results_matrix(tournament), team.pk),
+        None,
+    )
+    return {**season, "head_to_head": head_to_head(team.pk)}
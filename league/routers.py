@@ -0,0 +1,89 @@
+"""
+Database routing between the Postgres primary and an optional read replica.
+
+League data read by the public pages goes to the ``replica`` alias when one is
+configured. Everything else (sessions, auth, admin log, tracking) and every write
+goes to the primary. A request is pinned to the primary for all of its reads when:
+
+- it is an admin page or a non-GET request (see ``PrimaryPinningMiddleware``),
+- it has already written league data (``db_for_write`` pins it), or
+- the same browser wrote league data in the last few seconds (pin cookie), so an
+  admin who saves a result sees it immediately despite replication lag.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_DB = "default"
+REPLICA_DB = "replica"
+
+# Apps whose tables are replicated and safe to serve from the replica.
+REPLICATED_APPS = {"league"}
+
+_use_primary = ContextVar("use_primary", default=False)
+_wrote_replicated_data = ContextVar("wrote_replicated_data", default=False)
+
+
+def replica_configured():
+    return REPLICA_DB in settings.DATABASES
+
+
+def reads_pinned_to_primary():
+    return _use_primary.get()
+
+
+def wrote_replicated_data():
+    return _wrote_replicated_data.get()
+
+
+@contextmanager
+def primary_reads(pinned=True):
+    """
+    Routes every read in the block to the primary (or, with ``pinned=False``,
+    lets league reads go back to the replica). Used per request by the
+    middleware; also handy in management commands and tests.
+    """
+    use_primary = _use_primary.set(pinned)
+    wrote = _wrote_replicated_data.set(False)
+    try:
+        yield
+    finally:
+        _wrote_replicated_data.reset(wrote)
+        _use_primary.reset(use_primary)
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends league reads to the replica and everything else to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            model._meta.app_label not in REPLICATED_APPS
+            or _use_primary.get()
+            or not replica_configured()
+        ):
+            return PRIMARY_DB
+
+        # Related lookups stay on the database the instance came from.
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return REPLICA_DB
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in REPLICATED_APPS:
+            # Read-your-writes: the rest of this request reads from the primary.
+            _use_primary.set(True)
+            _wrote_replicated_data.set(True)
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return {obj1._state.db, obj2._state.db} <= {PRIMARY_DB, REPLICA_DB}
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives schema changes through replication.
+        return db == PRIMARY_DB
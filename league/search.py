@@ -0,0 +1,147 @@
+"""
+Player and team search for the autocomplete endpoint and the admin pickers.
+
+On PostgreSQL with pg_trgm names are matched anywhere (``icontains``), which
+the GIN trigram indexes on ``UPPER(name)`` of people, players and teams answer
+without a scan (migration 0020). Other databases fall back to a prefix match on
+the ``LOWER(name)`` indexes (or Person.key), a range scan of a B-tree index. The
+term is lowered by the database there too, like the names, so both sides follow
+the same case rules whatever the characters.
+
+Players are searched as people (league/people.py), one result per person with
+their current team, so someone who played in several tournaments shows once.
+Results are cached per query, whatever its case, for SEARCH_CACHE_SECONDS.
+"""
+
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.functions import Lower
+from django.urls import reverse
+
+from .models import Person, Team
+from .people import person_key
+
+# Sorts after any character in a name, closing a prefix range.
+PREFIX_END = "\U0010ffff"
+
+
+def normalize(term):
+    return " ".join(term.split())[:50]
+
+
+@functools.cache
+def _has_trigrams(alias):
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def uses_trigrams(queryset):
+    """Whether the database of ``queryset`` has the trigram indexes of migration 0020."""
+    return _has_trigrams(queryset.db)
+
+
+def name_search(queryset, term, field="name", key=None):
+    """
+    ``queryset`` narrowed to names matching ``term``, names starting with it
+    first. ``key``, if given, is an indexed field holding the name as normalised
+    by people.person_key.
+    """
+    if uses_trigrams(queryset):
+        queryset = queryset.filter(**{f"{field}__icontains": term})
+    elif key:
+        prefix = person_key(term)
+        queryset = queryset.filter(
+            **{f"{key}__gte": prefix, f"{key}__lt": prefix + PREFIX_END}
+        )
+    else:
+        queryset = queryset.alias(lower_name=Lower(field)).filter(
+            lower_name__gte=Lower(Value(term)),
+            lower_name__lt=Lower(Value(term + PREFIX_END)),
+        )
+    return queryset.alias(
+        starts=Case(
+            When(**{f"{field}__istartswith": term}, then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    ).order_by("starts", field)
+
+
+def search_people(term, limit):
+    people = name_search(
+        Person.objects.filter(current_player__isnull=False), term, key="key"
+    )
+    return [
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "player": row["current_player_id"],
+            "team": row["current_player__team__name"],
+            "tournament": row["current_player__tournament_id"],
+            "url": (
+                reverse(
+                    "tournament_player",
+                    args=[
+                        row["current_player__tournament_id"],
+                        row["current_player_id"],
+                    ],
+                )
+                if row["current_player__tournament_id"]
+                else None
+            ),
+        }
+        for row in people.values(
+            "id",
+            "name",
+            "current_player_id",
+            "current_player__team__name",
+            "current_player__tournament_id",
+        )[:limit]
+    ]
+
+
+def search_teams(term, limit):
+    return [
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "tournament": row["tournament_id"],
+            "url": (
+                reverse("tournament_team", args=[row["tournament_id"], row["id"]])
+                if row["tournament_id"]
+                else None
+            ),
+        }
+        for row in name_search(Team.objects.all(), term).values(
+            "id", "name", "tournament_id"
+        )[:limit]
+    ]
+
+
+def search(term):
+    """
+    People and teams whose names match ``term``, at most SEARCH_LIMIT of each.
+    Nothing for terms shorter than SEARCH_MIN_LENGTH.
+    """
+    term = normalize(term)
+    if len(term) < settings.SEARCH_MIN_LENGTH:
+        return {"players": [], "teams": []}
+
+    def compute():
+        limit = settings.SEARCH_LIMIT
+        return {
+            "players": search_people(term, limit),
+            "teams": search_teams(term, limit),
+        }
+
+    digest = hashlib.sha256(term.casefold().encode()).hexdigest()[:32]
+    return cache.get_or_set(f"search:{digest}", compute, settings.SEARCH_CACHE_SECONDS)
@@ -1,8 +1,20 @@
 # your_app_name/signals.py
 
-from django.db.models.signals import pre_save
+import sys
+
+from django.core.signals import got_request_exception
+from django.db.backends.signals import connection_created
+from django.db import InterfaceError, OperationalError
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import Match
+from .cache import bump_league_cache
+from .metrics import instrument_connection
+from .models import Match, Team_Standing, Goal, Card, TeamOfTheWeek, Player, Team
+from .models import Tournament
+from .people import CHANGED_FIELDS, assign_person, people_of, refresh_careers
+from .people import stored_people_of
+from .ratings import rate_match
+from .tournaments import clear_tournament_cache
 
 
 @receiver(pre_save, sender=Match)
@@ -19,3 +31,124 @@ def set_walkover_scores(sender, instance, **kwargs):
         elif instance.walkover_winner == instance.away_team:
             instance.home_score = 0
             instance.away_score = 3
+
+
+# Models whose changes show up in the cached table and stats pages.
+LEAGUE_CACHE_MODELS = (Match, Team_Standing, Goal, Card, TeamOfTheWeek, Player, Team)
+
+
+def roster_tournament_ids(player):
+    """
+    Tournaments whose rosters list ``player``: its own and its team's, as the
+    rosters list players through their team and a player's tournament may be
+    unset.
+    """
+    team_tournament_id = (
+        Team.objects.filter(pk=player.team_id)
+        .values_list("tournament_id", flat=True)
+        .first()
+    )
+    return {player.tournament_id, team_tournament_id}
+
+
+def tournament_ids_of(sender, instance):
+    if sender is Player:
+        # A moved player also leaves the roster of its old team's tournament.
+        return roster_tournament_ids(instance) | getattr(
+            instance, "_roster_tournaments", set()
+        )
+    if instance.tournament_id:
+        return {instance.tournament_id}
+    # Goals and cards entered without a tournament belong to their match's.
+    match_id = getattr(instance, "match_id", None)
+    if match_id:
+        return {
+            Match.objects.filter(pk=match_id)
+            .values_list("tournament_id", flat=True)
+            .first()
+        }
+    return set()
+
+
+@receiver(pre_save, sender=Player)
+def remember_roster_tournaments(sender, instance, raw=False, **kwargs):
+    """Notes the tournaments whose rosters list the player before this save."""
+    instance._roster_tournaments = set()
+    if instance.pk is not None and not raw:
+        for row in Player.objects.filter(pk=instance.pk).values_list(
+            "tournament_id", "team__tournament_id"
+        ):
+            instance._roster_tournaments.update(row)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_league_cache(sender, instance, **kwargs):
+    """Drops the cached table and stats of a tournament when its data changes."""
+    if sender in LEAGUE_CACHE_MODELS:
+        for tournament_id in tournament_ids_of(sender, instance):
+            if tournament_id:
+                bump_league_cache(tournament_id)
+
+
+@receiver(post_save, sender=Match)
+def update_ratings(sender, instance, raw=False, **kwargs):
+    """Rates a saved result, or replays the ratings it changed (league/ratings.py)."""
+    if not raw:
+        rate_match(instance)
+
+
+@receiver(post_delete, sender=Match)
+def replay_ratings_after_delete(sender, instance, **kwargs):
+    rate_match(instance, deleted=True)
+
+
+# Models counted in a person's career totals (league/people.py).
+CAREER_MODELS = (Player, Goal, Card, Match, TeamOfTheWeek)
+
+
+@receiver(pre_save)
+def remember_career_people(sender, instance, raw=False, **kwargs):
+    """Notes whose totals the row counted towards before this save; links new players."""
+    if sender in CAREER_MODELS and not raw:
+        instance._career_people = stored_people_of(sender, instance)
+        if sender is Player:
+            assign_person(instance)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def refresh_career_totals(sender, instance, raw=False, **kwargs):
+    """Recomputes the career totals of the people a row counts (or counted) towards."""
+    if sender in CAREER_MODELS and not raw:
+        refresh_careers(
+            people_of(sender, instance) | getattr(instance, "_career_people", set()),
+            CHANGED_FIELDS[sender],
+        )
+
+
+@receiver(post_save, sender=Tournament)
+@receiver(post_delete, sender=Tournament)
+def invalidate_tournament_cache(sender, instance, **kwargs):
+    """
+    Reloads this process's copy of the tournaments table on its next lookup, and
+    drops the cached data listing the tournaments.
+    """
+    clear_tournament_cache()
+    bump_league_cache(instance.pk)
+
+
+@receiver(got_request_exception)
+def note_database_unavailable(sender, request=None, **kwargs):
+    """
+    Marks requests that failed because the database could not be reached, so
+    StalePageMiddleware can answer with the last good copy of the page.
+    """
+    if request is not None and isinstance(
+        sys.exc_info()[1], (OperationalError, InterfaceError)
+    ):
+        request.database_unavailable = True
+
+
+# Time every query for the per-request database metrics.
+connection_created.connect(instrument_connection)
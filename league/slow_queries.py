@@ -0,0 +1,87 @@
+"""
+Slow-query log.
+
+Every statement that takes SLOW_QUERY_SECONDS or longer is logged as a warning on
+the ``league.slow_queries`` logger, which settings.LOGGING writes as JSON lines
+to a rotating LOG_DIR/slow_queries.log. Each record says where the query came
+from: the view, tournament and week of the request, the template line being
+rendered, if any, and the project's own frames of the stack. Timing is done by
+metrics.record_query, which every database connection runs its queries through.
+"""
+
+import logging
+import sys
+
+from django.conf import settings
+from django.template.base import Node
+
+logger = logging.getLogger(__name__)
+
+SQL_CHARS = 2000
+PARAMS_CHARS = 500
+STACK_FRAMES = 8
+
+RENDER_ANNOTATED = Node.render_annotated.__code__
+
+
+def project_frames(frame):
+    """The innermost project frames, outside site-packages, as "file:line in function"."""
+    root = str(settings.BASE_DIR)
+    frames = []
+    while frame is not None and len(frames) < STACK_FRAMES:
+        filename = frame.f_code.co_filename
+        if filename.startswith(root) and "site-packages" not in filename:
+            frames.append(
+                f"{filename[len(root) + 1:]}:{frame.f_lineno} in {frame.f_code.co_name}"
+            )
+        frame = frame.f_back
+    return frames
+
+
+def template_line(frame):
+    """ "template:line" of the innermost template node being rendered, if any."""
+    while frame is not None:
+        if frame.f_code is RENDER_ANNOTATED:
+            node = frame.f_locals.get("self")
+            origin = getattr(node, "origin", None)
+            token = getattr(node, "token", None)
+            if origin is not None and token is not None:
+                return f"{origin.template_name}:{token.lineno}"
+        frame = frame.f_back
+    return None
+
+
+def request_context(request):
+    """View name, path, tournament and week of the request issuing the query."""
+    if request is None:
+        return {"view": None, "path": None, "tournament": None, "week": None}
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return {"view": None, "path": request.path, "tournament": None, "week": None}
+    tournament = getattr(request, "tournament", None)
+    return {
+        "view": match.url_name or match.view_name,
+        "path": request.path,
+        "tournament": tournament.id if tournament else match.kwargs.get("tournament"),
+        "week": match.kwargs.get("number") if "week/" in match.route else None,
+    }
+
+
+def log_slow_query(sql, params, many, seconds, request):
+    # Skip metrics.record_query, which called this.
+    frame = sys._getframe(2)
+    context = request_context(request)
+    logger.warning(
+        "Slow query: %.0f ms in %s",
+        seconds * 1000,
+        context["view"] or "a command",
+        extra={
+            "duration_ms": round(seconds * 1000, 1),
+            "sql": sql[:SQL_CHARS],
+            "params": repr(params)[:PARAMS_CHARS],
+            "many": many,
+            **context,
+            "template": template_line(frame),
+            "stack": project_frames(frame),
+        },
+    )
@@ -0,0 +1,157 @@
+"""
+League table ranking with tiebreakers.
+
+Teams are ordered by the rules in TABLE_TIEBREAKERS, in order:
+
+- ``points``, ``goal_difference``, ``goals_for``: from the standings rows
+- ``head_to_head_points``, ``head_to_head_goal_difference``,
+  ``head_to_head_goals_for``: from the matches between the tied teams only (a
+  mini-league). When a head-to-head rule splits the tied teams but some are still
+  level, the head-to-head rules start again among those teams alone.
+- ``fair_play``: fewer card points (yellow 1, red 3)
+- ``lots``: a drawing of lots, fixed per tournament and team so it doesn't change
+  between page loads
+
+Head-to-head numbers are slices of the tournament's cached results matrix
+(league/results.py) and card points come from one cached query, so resolving any
+tie is a few array lookups.
+"""
+
+import hashlib
+from functools import cached_property
+from itertools import groupby
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .cache import league_cache_key
+from .models import Card
+from .results import results_matrix
+
+RED_CARD_POINTS = 3
+
+HEAD_TO_HEAD_RULES = {
+    "head_to_head_points",
+    "head_to_head_goal_difference",
+    "head_to_head_goals_for",
+}
+STANDING_RULES = {"points", "goal_difference", "goals_for"}
+RULES = STANDING_RULES | HEAD_TO_HEAD_RULES | {"fair_play", "lots"}
+
+
+def card_points(tournament):
+    """{team name: [(week, card points that week)]}, cached until the next saved result."""
+
+    def compute():
+        points = {}
+        for week, name, yellows, reds in (
+            Card.objects.filter(tournament=tournament)
+            .values("match__week_number", "player__team__name")
+            .annotate(
+                yellows=Count("id", filter=Q(card_type="YELLOW")),
+                reds=Count("id", filter=Q(card_type="RED")),
+            )
+            .values_list("match__week_number", "player__team__name", "yellows", "reds")
+        ):
+            points.setdefault(name, []).append((week, yellows + RED_CARD_POINTS * reds))
+        return points
+
+    return cache.get_or_set(league_cache_key(tournament, "card_points"), compute, None)
+
+
+def lots(tournament_id, name):
+    digest = hashlib.sha256(f"{tournament_id}:{name}".encode()).hexdigest()
+    return int(digest[:12], 16)
+
+
+class Ranking:
+    """
+    Orders the standings rows of one matchweek. The results matrix and card
+    points are only loaded when a tie gets as far as the rules that need them.
+    """
+
+    def __init__(self, tournament, week, rules=None):
+        self.tournament = tournament
+        self.matchweek = week
+        self.rules = list(rules or settings.TABLE_TIEBREAKERS)
+        unknown = set(self.rules) - RULES
+        if unknown:
+            raise ValueError(f"Unknown tiebreak rules: {', '.join(sorted(unknown))}")
+
+    @cached_property
+    def matrix(self):
+        return results_matrix(self.tournament)
+
+    @cached_property
+    def card_points(self):
+        return card_points(self.tournament)
+
+    @cached_property
+    def week(self):
+        return self.matrix.week_position(self.matchweek)
+
+    def head_to_head(self, array, row, group):
+        """Sum of ``array`` for ``row``'s team against the other teams of ``group``."""
+        index = self.matrix.name_index
+        team = index.get(row["name"])
+        if self.week is None or team is None:
+            return 0
+        opponents = [index[other["name"]] for other in group if other["name"] in index]
+        return int(array[self.week, team, opponents].sum())
+
+    def key(self, rule, row, group):
+        """Value of ``rule`` for ``row`` among the tied ``group``; higher ranks first."""
+        if rule in STANDING_RULES:
+            return row[rule]
+        if rule == "head_to_head_points":
+            return self.head_to_head(self.matrix.points_to_date, row, group)
+        if rule == "head_to_head_goals_for":
+            return self.head_to_head(self.matrix.goals_to_date, row, group)
+        if rule == "head_to_head_goal_difference":
+            return self.head_to_head(
+                self.matrix.goals_to_date, row, group
+            ) - self.head_to_head(self.matrix.conceded_to_date, row, group)
+        if rule == "fair_play":
+            return -sum(
+                points
+                for week, points in self.card_points.get(row["name"], [])
+                if week <= self.matchweek
+            )
+        return -lots(self.tournament.pk, row["name"])
+
+    def head_to_head_start(self, position):
+        """First rule of the run of head-to-head rules that ``position`` is in."""
+        while position > 0 and self.rules[position - 1] in HEAD_TO_HEAD_RULES:
+            position -= 1
+        return position
+
+    def order(self, group, position=0):
+        if len(group) <= 1 or position >= len(self.rules):
+            return list(group)
+        rule = self.rules[position]
+        keys = [self.key(rule, row, group) for row in group]
+        ranked = sorted(zip(keys, range(len(group))), key=lambda item: -item[0])
+        tiers = [
+            [group[i] for _, i in tier]
+            for _, tier in groupby(ranked, key=lambda item: item[0])
+        ]
+        if len(tiers) == 1:
+            return self.order(group, position + 1)
+
+        ordered = []
+        for tier in tiers:
+            if rule in HEAD_TO_HEAD_RULES:
+                # A smaller mini-league: its own head-to-head results decide.
+                ordered += self.order(tier, self.head_to_head_start(position))
+            else:
+                ordered += self.order(tier, position + 1)
+        return ordered
+
+
+def rank_standings(tournament, week, rows, rules=None):
+    """``rows`` (dicts with name, points, goal_difference and goals_for) in table order."""
+    rows = list(rows)
+    if len(rows) <= 1:
+        return rows
+    return Ranking(tournament, week, rules).order(rows)
@@ -1,7 +1,10 @@
 from django import template
+from django.urls import reverse
+from ..canonical import LEGACY_PAGES
+from .. import images
 from ..models import Team
 from django.utils.safestring import mark_safe
-from datetime import timedelta, datetime
+from datetime import date, datetime, time, timedelta
 
 register = template.Library()
 
@@ -11,8 +14,6 @@ def get_team_name(teams, team_id):
     """
     Returns the team name from a queryset of teams based on the team_id.
     """
-    print(teams)
-    print(team_id)
     try:
         team_id = int(team_id)
         return teams.get(id=team_id).name
@@ -38,6 +39,15 @@ def get_opponent(match, team_name):
     return match.home_team.name
 
 
+@register.filter
+def image_url(image, size):
+    """
+    Returns the URL of an image at a named size, e.g.
+    {{ player.image|image_url:"avatar" }}; see league/images.py for the sizes.
+    """
+    return images.image_url(image, size)
+
+
 @register.filter
 def convert_newlines(text):
     """
@@ -51,44 +61,22 @@ def convert_newlines(text):
 
 
 @register.filter
-def add_minutes(match_time_input, minutes):
+def add_minutes(kickoff, minutes):
     """
-    Adds minutes to a time value, robustly handling string input like 'HH:MM AM/PM'.
+    Adds minutes to a kick-off time and returns the resulting time.
     """
-    if not match_time_input:
+    if not isinstance(kickoff, time):
         return ""
 
-    match_time_str = str(match_time_input).strip()  # Use strip to handle any whitespace
-
-    # 12-hour format with AM/PM: I = 12-hour clock, p = AM/PM
-    TIME_FORMAT = "%I:%M %p"
-
-    start_datetime = None
-
     try:
-        # 1. Parse the string into a full datetime object (using 1900-01-01 as the date)
-        start_datetime = datetime.strptime(match_time_str, TIME_FORMAT)
-
-        # 2. Add the minutes using timedelta
-        end_datetime = start_datetime + timedelta(minutes=int(minutes))
-
-        # 3. Return the resulting time object
-        return end_datetime.time()
-
-    except ValueError:
-        # If parsing fails due to incorrect format, try common 24-hour formats as fallback
-        try:
-            start_datetime = datetime.strptime(match_time_str.split(".")[0], "%H:%M:%S")
-            end_datetime = start_datetime + timedelta(minutes=int(minutes))
-            return end_datetime.time()
-        except Exception:
-            # If both parsing methods fail, return empty string
-            return ""
-
-    except Exception:
-        # Failure in arithmetic or other error
+        end_datetime = datetime.combine(date.min, kickoff) + timedelta(
+            minutes=int(minutes)
+        )
+    except (ValueError, TypeError, OverflowError):
         return ""
 
+    return end_datetime.time()
+
 
 @register.filter
 def first_word_or_full(value, arg=None):
@@ -127,3 +115,18 @@ def first_word(value):
 
     # Split by spaces and return the first element
     return value.split()[0] if value.split() else value
+
+
+@register.simple_tag
+def tournament_url(page, tournament, number=None):
+    """
+    Returns the canonical URL of a tournament page, e.g.
+    {% tournament_url 'results' selected_tournament week %} -> /t/4/results/week/7/.
+    Falls back to the plain page URL when there is no tournament.
+    """
+    if not tournament:
+        return reverse(page)
+    canonical_page, _, numbered_page = LEGACY_PAGES[page]
+    if number is not None:
+        return reverse(numbered_page, args=[tournament.pk, number])
+    return reverse(canonical_page, args=[tournament.pk])
@@ -0,0 +1,115 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from league.api import encode_cursor
+from league.models import Match, Player
+
+from .test_views import LOCAL_CACHE, BaseViewTest
+
+
+class ApiTest(BaseViewTest):
+    """
+    Tests the read-only JSON API against the same data as the view tests.
+    """
+
+    def test_tournaments(self):
+        response = self.client.get(reverse("api_tournaments"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": self.tournament.id, "name": "ICCL Test", "start_date": None}],
+        )
+
+    def test_results_include_scorers_and_cards(self):
+        response = self.client.get(
+            reverse("api_results", args=[self.tournament.id]), {"week": 1}
+        )
+        self.assertEqual(response.status_code, 200)
+        (result,) = response.json()["results"]
+        self.assertEqual(result["score"], [2, 1])
+        self.assertEqual(result["mom"]["name"], "Test Player A")
+        self.assertEqual(result["goals"][0]["goals"], 2)
+        self.assertEqual(result["cards"][0]["card"], "YELLOW")
+
+    def test_standings_default_to_latest_week(self):
+        response = self.client.get(reverse("api_standings", args=[self.tournament.id]))
+        data = response.json()
+        self.assertEqual(data["week"], 1)
+        self.assertEqual(data["results"][0]["name"], "Test Team A")
+        self.assertEqual(data["results"][0]["position"], 1)
+
+    def test_player_profile(self):
+        response = self.client.get(reverse("api_player", args=[self.player1.id]))
+        data = response.json()
+        self.assertEqual(data["total_goals"], 2)
+        self.assertEqual(data["mom"], [{"match": self.match.id, "week": 1}])
+        self.assertEqual(data["goals"][0]["opponent"], "Test Team B")
+        self.assertEqual(data["cards"][0]["card"], "YELLOW")
+
+    def test_unknown_tournament_and_bad_week(self):
+        response = self.client.get(reverse("api_fixtures", args=[999]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"error": "Not found"})
+        response = self.client.get(
+            reverse("api_fixtures", args=[self.tournament.id]), {"week": "x"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_responses_carry_etag(self):
+        url = reverse("api_fixtures", args=[self.tournament.id])
+        response = self.client.get(url, {"week": 1})
+        self.assertTrue(response.has_header("ETag"))
+        response = self.client.get(
+            url, {"week": 1}, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(CACHES=LOCAL_CACHE, API_CACHE_SECONDS=60)
+    def test_cached_responses_follow_saved_results(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        url = reverse("api_results", args=[self.tournament.id])
+        self.assertEqual(self.client.get(url).json()["results"][0]["score"], [2, 1])
+        self.match.home_score = 3
+        self.match.save()
+        self.assertEqual(self.client.get(url).json()["results"][0]["score"], [3, 1])
+        response = self.client.get(reverse("api_tournaments"))
+        self.assertIn("max-age=60", response["Cache-Control"])
+        self.tournament.short_description = "ICCL Renamed"
+        self.tournament.save()
+        response = self.client.get(reverse("api_tournaments"))
+        self.assertEqual(response.json()["results"][0]["name"], "ICCL Renamed")
+
+    def test_cursor_pagination_walks_every_match(self):
+        for week in range(2, 6):
+            Match.objects.create(
+                week_number=week,
+                match_date=self.match.match_date,
+                home_team=self.team1,
+                away_team=self.team2,
+                tournament=self.tournament,
+            )
+        url = reverse("api_fixtures", args=[self.tournament.id])
+        response = self.client.get(url, {"limit": 2})
+        weeks = []
+        while True:
+            data = response.json()
+            weeks += [match["week"] for match in data["results"]]
+            if not data["next"]:
+                break
+            response = self.client.get(data["next"])
+        self.assertEqual(weeks, [1, 2, 3, 4, 5])
+
+    def test_players_pagination_rejects_bad_cursor(self):
+        Player.objects.create(
+            name="Test Player B", team=self.team2, tournament=self.tournament
+        )
+        url = reverse("api_players", args=[self.tournament.id])
+        self.assertEqual(len(self.client.get(url).json()["results"]), 2)
+        self.assertEqual(self.client.get(url, {"cursor": "nope"}).status_code, 400)
+        # Well-formed cursors holding values of the wrong type
+        for values in ([{"a": 1}], ["abc"]):
+            response = self.client.get(url, {"cursor": encode_cursor(values)})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {"error": "Invalid cursor"})
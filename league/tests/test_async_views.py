@@ -0,0 +1,82 @@
+import threading
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, override_settings
+
+from league import async_views, views
+from league.cache import acquire_fill_lock, aleague_cache_key
+from league.models import Team_Standing, Tournament
+
+from .test_views import LOCAL_CACHE, BaseViewTest
+
+
+class AsyncViewTest(BaseViewTest):
+    """
+    Tests the async public views served under ASGI against the same data as
+    the sync view tests.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.factory = AsyncRequestFactory()
+
+    def get(self, path, **params):
+        return self.factory.get(path, {"tournament": self.tournament.id, **params})
+
+    async def test_base_context_defaults_to_first_tournament(self):
+        other = await Tournament.objects.acreate(short_description="ICCL Other")
+        context = await async_views.get_base_context(
+            "Fixture", self.factory.get("/fixtures/", {"tournament": "999"})
+        )
+        self.assertEqual(context["selected_tournament"], self.tournament)
+        self.assertEqual(context["tournaments"], [self.tournament, other])
+        self.assertEqual(list(context["week_labels"]), [1])
+
+    async def test_fixture_view_defaults_to_first_week(self):
+        response = await async_views.fixture_view(self.get("/fixtures/"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.team1.name)
+
+    async def test_result_view_shows_scorers(self):
+        response = await async_views.result_view(self.get("/results/", week_number=1))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.player1.name)
+
+    async def test_table_view_shows_selected_week(self):
+        await Team_Standing.objects.acreate(
+            name=self.team2.name,
+            matches_played=1,
+            losses=1,
+            tournament=self.tournament,
+        )
+        response = await async_views.table_view(self.get("/table/", match_week=1))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.team1.name)
+        self.assertContains(response, self.team2.name)
+
+    async def test_sponsors_view(self):
+        response = await async_views.sponsors_view(self.get("/sponsors/"))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(CACHES=LOCAL_CACHE)
+    async def test_cache_files_are_handled_off_the_event_loop(self):
+        await sync_to_async(cache.clear)()
+        self.addCleanup(cache.clear)
+        self.assertEqual(
+            await aleague_cache_key(self.tournament, "table", "latest"),
+            await sync_to_async(views.table_cache_key)(self.tournament, None),
+        )
+
+        threads = []
+
+        def acquire(key):
+            threads.append(threading.get_ident())
+            return acquire_fill_lock(key)
+
+        with mock.patch("league.cache.acquire_fill_lock", acquire):
+            response = await async_views.table_view(self.get("/table/"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(threads)
+        self.assertNotIn(threading.get_ident(), threads)
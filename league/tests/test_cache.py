@@ -0,0 +1,115 @@
+import multiprocessing
+import os
+import tempfile
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from league.cache import acquire_fill_lock, release_fill_lock, single_flight
+
+CACHE_DIR = tempfile.mkdtemp(prefix="iccl-single-flight-")
+FILE_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(CACHE_DIR, "default"),
+    }
+}
+
+
+def fill_table(calls_path):
+    """A slow computation that records each call in ``calls_path``."""
+    with open(calls_path, "a") as calls:
+        calls.write("computed\n")
+    time.sleep(0.3)
+    return "<table>week 5</table>"
+
+
+def load_page(start, calls_path, results):
+    start.wait()
+    results.put(single_flight("league:1:g:table:5", lambda: fill_table(calls_path)))
+
+
+@override_settings(
+    CACHES=FILE_CACHE,
+    CACHE_DIR=CACHE_DIR,
+    PAGE_CACHE_SECONDS=60,
+    PAGE_CACHE_STALE_SECONDS=60,
+    SINGLE_FLIGHT_WAIT_SECONDS=5,
+    SINGLE_FLIGHT_LOCK_SECONDS=30,
+)
+class SingleFlightTest(SimpleTestCase):
+    """
+    Tests that concurrent cache misses across processes compute a value once.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.calls_path = os.path.join(CACHE_DIR, "calls.log")
+        open(self.calls_path, "w").close()
+
+    def computations(self):
+        with open(self.calls_path) as calls:
+            return len(calls.readlines())
+
+    def test_concurrent_misses_compute_once(self):
+        context = multiprocessing.get_context("fork")
+        start = context.Event()
+        results = context.Queue()
+        workers = [
+            context.Process(target=load_page, args=(start, self.calls_path, results))
+            for _ in range(8)
+        ]
+        for worker in workers:
+            worker.start()
+        start.set()
+        pages = [results.get(timeout=10) for _ in workers]
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(pages, ["<table>week 5</table>"] * 8)
+        self.assertEqual(self.computations(), 1)
+
+    def test_stale_value_served_while_another_process_refills(self):
+        single_flight("key", lambda: "old", timeout=0)
+        token = acquire_fill_lock("key")
+        self.assertTrue(token)
+        try:
+            self.assertEqual(single_flight("key", lambda: "new"), "old")
+        finally:
+            release_fill_lock("key", token)
+        self.assertEqual(single_flight("key", lambda: "new"), "new")
+
+    def test_previous_generation_served_while_another_process_refills(self):
+        single_flight("league:1:old:table", lambda: "old", stale_key="league:1:last")
+        token = acquire_fill_lock("league:1:new:table")
+        try:
+            self.assertEqual(
+                single_flight(
+                    "league:1:new:table", lambda: "new", stale_key="league:1:last"
+                ),
+                "old",
+            )
+        finally:
+            release_fill_lock("league:1:new:table", token)
+        self.assertEqual(
+            single_flight(
+                "league:1:new:table", lambda: "new", stale_key="league:1:last"
+            ),
+            "new",
+        )
+
+    @override_settings(SINGLE_FLIGHT_LOCK_SECONDS=0)
+    def test_abandoned_lock_is_taken_over(self):
+        abandoned = acquire_fill_lock("key")
+        self.assertTrue(abandoned)
+        token = acquire_fill_lock("key")
+        self.assertTrue(token)
+        # The late holder leaves the new lock alone
+        release_fill_lock("key", abandoned)
+        with override_settings(SINGLE_FLIGHT_LOCK_SECONDS=30):
+            self.assertIsNone(acquire_fill_lock("key"))
+        release_fill_lock("key", token)
+        token = acquire_fill_lock("key")
+        self.assertTrue(token)
+        release_fill_lock("key", token)
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from league.models import Match, Tournament
+from league.templatetags.custom_filters import tournament_url
+
+from .test_views import BaseViewTest
+
+
+def local_time(hour):
+    """Patches the clock to ``hour`` o'clock local time."""
+    moment = timezone.make_aware(datetime(2026, 10, 19, hour, 0))
+    return mock.patch("django.utils.timezone.now", return_value=moment)
+
+
+@override_settings(TOURNAMENT_LIVE_MAX_AGE=60, TOURNAMENT_ARCHIVED_MAX_AGE=86400)
+class CanonicalUrlTest(BaseViewTest):
+    """
+    Tests the /t/<tournament>/ URLs, the legacy redirects and their caching.
+    """
+
+    def test_legacy_url_redirects_permanently(self):
+        response = self.client.get(
+            reverse("results"), {"tournament": self.tournament.id, "week_number": 1}
+        )
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(
+            response["Location"], f"/t/{self.tournament.id}/results/week/1/"
+        )
+
+    def test_legacy_url_without_tournament_redirects_temporarily(self):
+        response = self.client.get(reverse("table"))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], f"/t/{self.tournament.id}/table/")
+
+    def test_legacy_player_profile_redirects(self):
+        response = self.client.get(reverse("player_profile", args=[self.player1.id]))
+        self.assertRedirects(
+            response,
+            reverse("tournament_player", args=[self.tournament.id, self.player1.id]),
+            status_code=301,
+        )
+
+    def test_unknown_tournament_is_404(self):
+        response = self.client.get(reverse("tournament_fixtures", args=[999]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_live_tournament_is_cached_briefly(self):
+        with local_time(12):
+            response = self.client.get(
+                reverse("tournament_results_week", args=[self.tournament.id, 1])
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["selected_week_number"], 1)
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+
+    def test_archived_tournament_is_cached_long(self):
+        Match.objects.filter(pk=self.match.pk).update(
+            match_date=self.match.match_date - timedelta(days=400)
+        )
+        with local_time(0):
+            response = self.client.get(
+                reverse("tournament_table", args=[self.tournament.id])
+            )
+        self.assertEqual(response["Cache-Control"], "public, max-age=86400")
+
+    def test_archived_pages_expire_at_midnight(self):
+        """The birthday banner of the next day is never hidden behind a cache."""
+        Match.objects.filter(pk=self.match.pk).update(
+            match_date=self.match.match_date - timedelta(days=400)
+        )
+        with local_time(23):
+            response = self.client.get(
+                reverse("tournament_table", args=[self.tournament.id])
+            )
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+
+    def test_tournament_url_tag(self):
+        self.assertEqual(
+            tournament_url("fixtures", self.tournament, 3),
+            f"/t/{self.tournament.id}/fixtures/week/3/",
+        )
+        self.assertEqual(tournament_url("stats", None), reverse("stats"))
+        other = Tournament.objects.create(short_description="ICCL Other")
+        self.assertEqual(tournament_url("stats", other), f"/t/{other.id}/stats/")
@@ -0,0 +1,24 @@
+import copy
+
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+from psycopg_pool import ConnectionPool
+
+from iccl_league_app import settings as production
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    """
+    Tests that pooled production connections are checked before use.
+    """
+
+    def test_pool_checks_connections(self):
+        database = copy.deepcopy(production.DATABASES["default"])
+        database["OPTIONS"]["pool"] = production.database_pool_options()
+        database["CONN_MAX_AGE"] = 0
+        connections = ConnectionHandler({"default": database, "pool_check": database})
+        connection = connections["pool_check"]
+        self.addCleanup(connection._connection_pools.pop, "pool_check", None)
+
+        # Django hands the check to the pool when CONN_HEALTH_CHECKS is on.
+        self.assertIs(connection.pool._check, ConnectionPool.check_connection)
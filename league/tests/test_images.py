@@ -0,0 +1,92 @@
+import os
+from unittest import mock
+
+import cloudinary
+from cloudinary import CloudinaryResource
+from django.conf import settings
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from league import images
+from league.models import Team
+
+from .test_views import BaseViewTest
+
+
+class ImageUrlTest(SimpleTestCase):
+    """
+    Tests the memoised sized image URLs and the local derivative backend.
+    """
+
+    def setUp(self):
+        images.clear_image_url_cache()
+        self.addCleanup(images.clear_image_url_cache)
+        os.makedirs(os.path.join(settings.IMAGE_LOCAL_ROOT, "players"), exist_ok=True)
+        Image.new("RGB", (800, 600), "red").save(
+            os.path.join(settings.IMAGE_LOCAL_ROOT, "players", "a.png")
+        )
+
+    def test_local_backend_writes_the_derivative_once(self):
+        image = CloudinaryResource("players/a", format="png")
+        url = images.image_url(image, "avatar")
+        self.assertEqual(url, "/media/derivatives/avatar/players/a.png")
+        path = os.path.join(
+            settings.IMAGE_LOCAL_ROOT, "derivatives", "avatar", "players", "a.png"
+        )
+        with Image.open(path) as derivative:
+            self.assertEqual(derivative.size, (192, 192))
+
+        with mock.patch.object(images.LocalImageBackend, "resize") as resize:
+            os.remove(path)
+            self.assertEqual(images.image_url(image, "avatar"), url)
+        resize.assert_not_called()
+
+    def test_logo_is_not_cropped(self):
+        images.image_url("players/a.png", "sponsor_logo")
+        path = os.path.join(
+            settings.IMAGE_LOCAL_ROOT, "derivatives", "sponsor_logo", "players", "a.png"
+        )
+        with Image.open(path) as derivative:
+            self.assertEqual(derivative.size, (427, 320))
+
+    @override_settings(IMAGE_BACKEND="league.images.CloudinaryImageBackend")
+    def test_cloudinary_transformation(self):
+        with mock.patch.object(cloudinary.config(), "cloud_name", "demo"):
+            url = images.image_url(
+                CloudinaryResource("players/a", format="jpg", version="7"), "pitch_card"
+            )
+        self.assertEqual(
+            url,
+            "https://res.cloudinary.com/demo/image/upload/c_fill,f_auto,g_face,h_256,q_auto,w_256/v7/players/a.jpg",
+        )
+
+    def test_filter(self):
+        template = Template('{% load custom_filters %}{{ image|image_url:"avatar" }}')
+        self.assertEqual(template.render(Context({"image": None})), "")
+        with self.assertRaises(ValueError):
+            images.image_url("players/a", "huge")
+
+
+class PostLogoTest(BaseViewTest):
+    """
+    Tests that the fixture and result posts show team logos at the post size.
+    """
+
+    def test_posts_use_sized_logos(self):
+        images.clear_image_url_cache()
+        self.addCleanup(images.clear_image_url_cache)
+        os.makedirs(os.path.join(settings.IMAGE_LOCAL_ROOT, "teams"), exist_ok=True)
+        Image.new("RGB", (600, 400), "blue").save(
+            os.path.join(settings.IMAGE_LOCAL_ROOT, "teams", "a.png")
+        )
+        Team.objects.filter(pk=self.team1.pk).update(logo="teams/a.png")
+
+        response = self.client.get(
+            reverse("posts"),
+            {"tournament": self.tournament.id, "type": "results", "week_number": 1},
+        )
+        self.assertContains(response, "/media/derivatives/team_logo/teams/a.png")
+        match = response.context["fixtures_for_week"][0]
+        self.assertTrue(match._state.fields_cache.keys() >= {"home_team", "away_team"})
@@ -0,0 +1,146 @@
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from league import metrics
+from league.middleware import MetricsMiddleware
+
+from .test_views import BaseViewTest
+
+
+def sample(text, name, **labels):
+    """Value of the first sample of ``name`` carrying ``labels``."""
+    for line in text.splitlines():
+        match = re.match(rf"{name}(?:{{(.*)}})? (\S+)$", line)
+        if match and all(
+            f'{k}="{v}"' in (match.group(1) or "") for k, v in labels.items()
+        ):
+            return float(match.group(2))
+    return None
+
+
+class MetricsEndpointTest(BaseViewTest):
+    """
+    Tests the /metrics endpoint and what the middleware records.
+    """
+
+    def metrics(self):
+        staff, _ = User.objects.get_or_create(username="staff", is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            response["Content-Type"].startswith("text/plain; version=0.0.4")
+        )
+        return response.content.decode()
+
+    def test_staff_only(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_scraper_token(self):
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer s3cret"
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong"
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_view_latency_queries_and_templates(self):
+        before = self.metrics()
+        count = (
+            sample(before, "iccl_view_duration_seconds_count", view="tournament_table")
+            or 0
+        )
+        self.client.get(reverse("tournament_table", args=[self.tournament.id]))
+
+        text = self.metrics()
+        self.assertEqual(
+            sample(
+                text,
+                "iccl_view_duration_seconds_count",
+                view="tournament_table",
+                status="2xx",
+            ),
+            count + 1,
+        )
+        self.assertEqual(
+            sample(
+                text,
+                "iccl_view_duration_seconds_bucket",
+                view="tournament_table",
+                le="+Inf",
+            ),
+            count + 1,
+        )
+        self.assertGreater(
+            sample(text, "iccl_view_db_queries_sum", view="tournament_table"), 0
+        )
+        self.assertGreater(
+            sample(text, "iccl_view_response_bytes_sum", view="tournament_table"), 0
+        )
+        self.assertIsNotNone(
+            sample(
+                text, "iccl_template_render_seconds_count", template="league/table.html"
+            )
+        )
+
+
+class RetiredWorkerTest(SimpleTestCase):
+    """
+    Tests that the counters of a worker that has exited stay in the totals.
+    """
+
+    def test_dead_worker_is_folded_into_retired_samples(self):
+        with override_settings(CACHE_DIR=tempfile.mkdtemp(prefix="iccl-metrics-")):
+            os.makedirs(metrics.metrics_dir())
+            worker = subprocess.Popen(["true"])
+            worker.wait()
+            path = os.path.join(metrics.metrics_dir(), f"{worker.pid}.json")
+            with open(path, "w") as file:
+                json.dump(
+                    {
+                        "pid": worker.pid,
+                        "samples": [["iccl_single_flight_total", [["result", "x"]], 3]],
+                    },
+                    file,
+                )
+
+            key = ("iccl_single_flight_total", (("result", "x"),))
+            self.assertEqual(metrics.collect()[key], 3)
+            self.assertFalse(os.path.exists(path))
+            # Still counted on the next scrape
+            self.assertEqual(metrics.collect()[key], 3)
+
+
+class AsyncSnapshotTest(SimpleTestCase):
+    """
+    Tests that the async middleware shares its samples off the event loop, at
+    most once per METRICS_SHARE_SECONDS.
+    """
+
+    @override_settings(METRICS_SHARE_SECONDS=60)
+    async def test_snapshot_written_in_a_worker_thread(self):
+        async def view(request):
+            return HttpResponse("ok")
+
+        threads = []
+        middleware = MetricsMiddleware(view)
+        with mock.patch.object(metrics, "_last_shared", 0.0), mock.patch.object(
+            metrics, "write_snapshot", lambda: threads.append(threading.get_ident())
+        ):
+            for _ in range(3):
+                await middleware(AsyncRequestFactory().get("/"))
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
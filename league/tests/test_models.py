@@ -1,3 +1,6 @@
+from datetime import time
+from importlib import import_module
+
 from django.test import TestCase
 from league.models import (
     Tournament,
@@ -94,3 +97,44 @@ class ModelTest(TestCase):
         self.assertEqual(
             self.card.__str__(), "YELLOW - Player A (Team A) (Week 1: Team A vs Team B)"
         )
+
+
+class MatchKickoffTest(TestCase):
+    """
+    Tests for the typed kick-off column on Match.
+    """
+
+    def setUp(self):
+        self.tournament = Tournament.objects.create(short_description="T_kickoff")
+        self.team1 = Team.objects.create(name="Team K1", tournament=self.tournament)
+        self.team2 = Team.objects.create(name="Team K2", tournament=self.tournament)
+
+    def test_kickoff_orders_chronologically(self):
+        """A 10:00 PM kick-off sorts after a 6:00 PM one on the same day."""
+        match_date = timezone.now().date()
+        late = Match.objects.create(
+            week_number=1,
+            match_date=match_date,
+            kickoff=time(22, 0),
+            home_team=self.team1,
+            away_team=self.team2,
+            tournament=self.tournament,
+        )
+        early = Match.objects.create(
+            week_number=1,
+            match_date=match_date,
+            kickoff=time(18, 0),
+            home_team=self.team2,
+            away_team=self.team1,
+            tournament=self.tournament,
+        )
+        self.assertEqual(list(Match.objects.all()), [early, late])
+
+    def test_legacy_match_time_strings_are_parsed(self):
+        """The data migration maps the old text values onto kick-off times."""
+        migration = import_module("league.migrations.0013_match_kickoff")
+        self.assertEqual(migration.parse_match_time("6:00 PM"), time(18, 0))
+        self.assertEqual(migration.parse_match_time(" 10:15 pm "), time(22, 15))
+        self.assertEqual(migration.parse_match_time("21:45"), time(21, 45))
+        self.assertIsNone(migration.parse_match_time("TBD"))
+        self.assertEqual(migration.format_match_time(time(21, 45)), "9:45 PM")
@@ -0,0 +1,104 @@
+from datetime import date
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from league.models import Card, Goal, Match, Person, Player, Team, Tournament
+from league.views import get_birthday_players
+
+merge_players = import_module("league.migrations.0018_person").merge_players
+
+
+class PeopleTest(TestCase):
+    """
+    Tests the Person behind each tournament's Player rows and its career totals.
+    """
+
+    def setUp(self):
+        self.first = Tournament.objects.create(short_description="ICCL 2024")
+        self.second = Tournament.objects.create(short_description="ICCL 2025")
+        self.old_team = Team.objects.create(name="Old Team", tournament=self.first)
+        self.new_team = Team.objects.create(name="New Team", tournament=self.second)
+        self.dob = date(1990, 5, 17)
+        self.then = self.player("Asha Rao", self.old_team, self.first, self.dob)
+        self.now = self.player("asha  rao", self.new_team, self.second, self.dob)
+
+    def player(self, name, team, tournament, dob=None):
+        return Player.objects.create(
+            name=name, team=team, tournament=tournament, dob=dob
+        )
+
+    def match(self, tournament, home, away, mom=None):
+        return Match.objects.create(
+            week_number=1,
+            match_date=timezone.now().date(),
+            home_team=home,
+            away_team=away,
+            home_score=1,
+            away_score=0,
+            is_played=True,
+            mom=mom,
+            tournament=tournament,
+        )
+
+    def test_rows_are_matched_by_name_and_date_of_birth(self):
+        self.assertEqual(self.then.person_id, self.now.person_id)
+        undated = self.player("Asha Rao", self.new_team, self.second)
+        namesake = self.player("Asha Rao", self.old_team, self.first, date(2001, 1, 2))
+        self.assertEqual(undated.person_id, self.then.person_id)
+        self.assertNotEqual(namesake.person_id, self.then.person_id)
+        person = Person.objects.get(pk=self.then.person_id)
+        self.assertEqual(
+            (person.current_player_id, person.tournaments), (undated.pk, 2)
+        )
+
+    def test_career_totals_follow_goals_cards_and_awards(self):
+        rival = Team.objects.create(name="Rival", tournament=self.second)
+        first = self.match(self.first, self.old_team, rival, mom=self.then)
+        second = self.match(self.second, self.new_team, rival, mom=self.now)
+        Goal.objects.create(match=first, player=self.then, goals=2)
+        goal = Goal.objects.create(match=second, player=self.now, goals=1)
+        Card.objects.create(match=second, player=self.now, card_type="YELLOW")
+
+        person = Person.objects.get(pk=self.now.person_id)
+        self.assertEqual(
+            (person.goals, person.motm_awards, person.yellow_cards, person.red_cards),
+            (3, 2, 1, 0),
+        )
+
+        # Moving a goal or an award to someone else takes it off this career.
+        other = self.player("Ben Iyer", self.new_team, self.second)
+        goal.player = other
+        goal.save()
+        second.mom = other
+        second.save()
+        person.refresh_from_db()
+        self.assertEqual((person.goals, person.motm_awards), (2, 1))
+        self.assertEqual(Person.objects.get(pk=other.person_id).goals, 1)
+
+        other.delete()
+        self.assertFalse(Person.objects.filter(name="Ben Iyer").exists())
+
+    def test_birthday_banner_shows_current_team(self):
+        today = timezone.now().date()
+        self.player("Chen Li", self.old_team, self.first, today.replace(year=1996))
+        self.player("Chen Li", self.new_team, self.second, today.replace(year=1996))
+        self.assertEqual(get_birthday_players(), ["Chen Li (New Team)"])
+
+    def test_migration_merges_existing_rows(self):
+        self.player("Asha Rao", self.new_team, self.second)
+        Player.objects.update(person=None)
+        Person.objects.all().delete()
+
+        merge_players(apps, None)
+        self.assertEqual(Person.objects.count(), 1)
+        self.assertEqual(Person.objects.get().players.count(), Player.objects.count())
+        self.assertEqual(Person.objects.get().tournaments, 2)
+
+    def test_player_api_has_career(self):
+        data = self.client.get(reverse("api_player", args=[self.then.pk])).json()
+        self.assertEqual(data["career"]["players"], [self.then.pk, self.now.pk])
+        self.assertEqual(data["career"]["tournaments"], 2)
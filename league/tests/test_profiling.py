@@ -0,0 +1,52 @@
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from league.models import RequestProfile
+
+from .test_views import BaseViewTest
+
+
+class RequestProfilerTest(BaseViewTest):
+    """
+    Tests on-demand profiles of staff requests.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("tournament_table", args=[self.tournament.id])
+        self.staff = User.objects.create_user("staff", is_staff=True)
+
+    def test_staff_profile_is_saved(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, {"profile": 1})
+        self.assertEqual(response.status_code, 200)
+
+        profile = RequestProfile.objects.get()
+        self.assertEqual(
+            response["X-Profile"],
+            reverse("admin:league_requestprofile_change", args=[profile.pk]),
+        )
+        self.assertEqual(
+            (profile.view, profile.user, profile.status_code),
+            ("tournament_table", self.staff, 200),
+        )
+        self.assertGreater(profile.sql_queries, 0)
+        self.assertGreater(profile.template_seconds, 0)
+        self.assertIn("templates", profile.breakdown)
+        self.assertIn("cumulative", profile.report)
+
+        User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.login(username="admin", password="password")
+        self.assertEqual(self.client.get(response["X-Profile"]).status_code, 200)
+
+    def test_header_asks_for_a_profile(self):
+        self.client.force_login(self.staff)
+        self.client.get(self.url, HTTP_X_PROFILE="1")
+        self.assertEqual(RequestProfile.objects.count(), 1)
+
+    def test_only_staff_who_ask_are_profiled(self):
+        response = self.client.get(self.url, {"profile": 1})
+        self.assertNotIn("X-Profile", response)
+        self.client.force_login(self.staff)
+        self.client.get(self.url)
+        self.assertFalse(RequestProfile.objects.exists())
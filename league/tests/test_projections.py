@@ -0,0 +1,114 @@
+import numpy as np
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from league.models import Card, Match, Team
+from league.projections import (
+    Season,
+    project_season,
+    projections_cache_key,
+    simulate,
+)
+
+from .test_views import BaseViewTest
+
+
+@override_settings(PROJECTION_SIMULATIONS=2000)
+class SeasonProjectionTest(BaseViewTest):
+    """
+    Tests the Monte Carlo season projections and their place on the table page.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.team3 = Team.objects.create(name="Test Team C", tournament=self.tournament)
+        for week, (home, away) in enumerate(
+            [
+                (self.team1, self.team3),
+                (self.team2, self.team3),
+                (self.team2, self.team1),
+            ],
+            start=2,
+        ):
+            Match.objects.create(
+                week_number=week,
+                match_date=timezone.now().date(),
+                home_team=home,
+                away_team=away,
+                tournament=self.tournament,
+            )
+
+    def test_probabilities_add_up(self):
+        rows = project_season(self.tournament)
+        self.assertEqual(len(rows), 3)
+        for row in rows:
+            self.assertAlmostEqual(sum(row["positions"]), 100, delta=0.5)
+        for position in range(3):
+            self.assertAlmostEqual(
+                sum(row["positions"][position] for row in rows), 100, delta=0.5
+            )
+        # The only team with points and the better record is favourite.
+        self.assertEqual(rows[0]["name"], self.team1.name)
+        self.assertEqual(project_season(self.tournament), rows)
+
+    @override_settings(PROJECTION_PROCESSES=2, PROJECTION_SIMULATIONS=6000)
+    def test_process_pool(self):
+        rows = project_season(self.tournament)
+        self.assertAlmostEqual(sum(rows[0]["positions"]), 100, delta=0.5)
+
+    def test_finished_season_has_no_projection(self):
+        Match.objects.filter(is_played=False).update(
+            is_played=True, home_score=0, away_score=0
+        )
+        self.assertEqual(project_season(self.tournament), [])
+
+    def test_decided_table(self):
+        season = Season(
+            teams=["Leader", "Chaser"],
+            points=np.array([30, 0]),
+            goal_difference=np.array([20, -20]),
+            goals_for=np.array([25, 5]),
+            home=np.array([1]),
+            away=np.array([0]),
+            home_rate=np.array([1.5]),
+            away_rate=np.array([1.5]),
+        )
+        finishes, points = simulate(season, 500, seed=1)
+        self.assertEqual(finishes.tolist(), [[500, 0], [0, 500]])
+        self.assertGreaterEqual(points[0], 500 * 30)
+
+    def test_level_teams_ordered_by_tiebreakers(self):
+        season = Season(
+            teams=["Drawn Lots", "Fair Play"],
+            points=np.array([10, 10]),
+            goal_difference=np.array([2, 2]),
+            goals_for=np.array([8, 8]),
+            home=np.array([0]),
+            away=np.array([1]),
+            home_rate=np.array([0.0]),
+            away_rate=np.array([0.0]),
+            tiebreak=np.array([1, 0]),
+        )
+        finishes, _ = simulate(season, 100, seed=1)
+        self.assertEqual(finishes.tolist(), [[0, 100], [100, 0]])
+
+    def test_cache_key_follows_results_only(self):
+        key = projections_cache_key(self.tournament)
+        Card.objects.create(
+            player=self.player1,
+            match=self.match,
+            card_type="RED",
+            tournament=self.tournament,
+        )
+        self.assertEqual(projections_cache_key(self.tournament), key)
+        self.match.home_score = 4
+        self.match.save()
+        self.assertNotEqual(projections_cache_key(self.tournament), key)
+
+    def test_table_page_shows_projection(self):
+        response = self.client.get(
+            reverse("tournament_table", args=[self.tournament.id])
+        )
+        self.assertEqual(len(response.context["projections"]), 3)
+        self.assertContains(response, "Season Projection")
@@ -0,0 +1,160 @@
+import re
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import Max, Q
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from benchmarks.seed import seed_league
+from league.models import Card, Goal, Player, Match, TrafficRollup
+from league.views import fixtures_queryset
+
+# Tables that grow with every matchday. A sequential scan on any of these means a
+# public page reads the whole league history to show one tournament or one week.
+HOT_TABLES = (
+    "league_match",
+    "league_team_standing",
+    "league_goal",
+    "league_card",
+    "league_teamoftheweek",
+)
+SEQ_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+@skipUnless(
+    connection.vendor == "postgresql",
+    "Query plans are only meaningful on PostgreSQL; "
+    "run with --settings=iccl_league_app.settings_benchmark.",
+)
+class QueryPlanTest(TestCase):
+    """
+    Runs every public view against a seeded league, EXPLAINs each SELECT the
+    view issued and fails if PostgreSQL falls back to a sequential scan on one
+    of the hot tables.
+
+    A seeded test league is still small enough that the planner would happily
+    scan it, so the plans are taken with ``enable_seqscan`` off: a sequential
+    scan then only shows up when no index can serve the query at all.
+
+        BENCHMARK_DATABASE_URL=postgres://... python manage.py test \\
+            league.tests.test_query_plans --settings=iccl_league_app.settings_benchmark
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tournaments = seed_league()
+        cls.tournament = cls.tournaments[len(cls.tournaments) // 2]
+        cls.player = Player.objects.filter(tournament=cls.tournament).first()
+        # Mid-season: the return fixtures of the tournament are still to play.
+        played = Match.objects.filter(tournament=cls.tournament)
+        last_week = played.aggregate(last=Max("week_number"))["last"]
+        Match.objects.bulk_create(
+            Match(
+                tournament=cls.tournament,
+                week_number=match.week_number + last_week,
+                match_date=match.match_date,
+                home_team_id=match.away_team_id,
+                away_team_id=match.home_team_id,
+            )
+            for match in played
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE league_match")
+
+    def setUp(self):
+        self.client = Client()
+
+    def view_requests(self):
+        tournament = self.tournament.id
+        return [
+            (reverse("tournament_fixtures_week", args=[tournament, 3]), {}),
+            (reverse("tournament_results_week", args=[tournament, 3]), {}),
+            (reverse("tournament_results", args=[tournament]), {}),
+            (reverse("tournament_table_week", args=[tournament, 4]), {}),
+            (reverse("tournament_stats", args=[tournament]), {}),
+            (reverse("tournament_players", args=[tournament]), {}),
+            (reverse("tournament_player", args=[tournament, self.player.id]), {}),
+            (reverse("tournament_team_of_the_week", args=[tournament]), {}),
+            (reverse("posts"), {"tournament": tournament, "type": "results"}),
+            (reverse("tournament_sponsors", args=[tournament]), {}),
+        ]
+
+    def explain(self, sql, params=(), disable=("seqscan",)):
+        """
+        Returns the plan for ``sql`` with sequential scans priced out, so a
+        "Seq Scan" node in the output means no index covers the access path.
+        ``disable`` names further planner methods to price out, e.g. "sort".
+        """
+        with connection.cursor() as cursor:
+            for method in disable:
+                cursor.execute(f"SET enable_{method} = off")
+            try:
+                cursor.execute(f"EXPLAIN {sql}", params)
+                return "\n".join(row[0] for row in cursor.fetchall())
+            finally:
+                for method in disable:
+                    cursor.execute(f"RESET enable_{method}")
+
+    def test_public_views_do_not_seq_scan_hot_tables(self):
+        failures = []
+        for url, params in self.view_requests():
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url, params)
+            self.assertIn(response.status_code, (200, 302), url)
+
+            for query in ctx.captured_queries:
+                sql = query["sql"]
+                if not sql.lstrip().upper().startswith("SELECT"):
+                    continue
+                plan = self.explain(sql)
+                scanned = set(SEQ_SCAN.findall(plan)) & set(HOT_TABLES)
+                if scanned:
+                    failures.append(
+                        f"{url} -> Seq Scan on {', '.join(sorted(scanned))}\n"
+                        f"  {sql}\n{plan}"
+                    )
+
+        self.assertFalse(failures, "\n\n".join(failures))
+
+    def test_result_queries_use_partial_index(self):
+        """The "latest week with a result" lookup walks the partial index."""
+        last_played = Match.objects.filter(
+            Q(tournament=self.tournament) & (Q(is_played=True) | Q(is_walkover=True))
+        ).order_by("-week_number")[:1]
+        plan = self.explain(*last_played.query.sql_with_params())
+        self.assertIn("league_match_result_idx", plan)
+
+    def test_fixture_queries_read_index_in_page_order(self):
+        """
+        A week's fixtures are read from the index in match date and kick-off
+        order; with sorts priced out, any other path shows a Sort node.
+        """
+        plan = self.explain(
+            *fixtures_queryset(self.tournament, 3).query.sql_with_params(),
+            disable=("seqscan", "sort"),
+        )
+        self.assertIn("league_match_t_w_date_ko_idx", plan)
+        self.assertNotIn("Sort", plan)
+
+    def test_traffic_dashboard_uses_period_index(self):
+        """The admin traffic dashboard reads one period's recent rollups (0015)."""
+        recent = TrafficRollup.objects.filter(
+            period=TrafficRollup.DAY, period_start__gte=timezone.now()
+        )
+        plan = self.explain(*recent.query.sql_with_params())
+        self.assertIn("league_traffic_period_idx", plan)
+
+    def test_scorers_and_cards_use_match_foreign_key_index(self):
+        """
+        With their (match, ...) indexes dropped (0021), the goals and cards of a
+        match are read through the foreign key index on match.
+        """
+        match = Match.objects.filter(tournament=self.tournament).first()
+        for model in (Goal, Card):
+            plan = self.explain(
+                *model.objects.filter(match=match).query.sql_with_params()
+            )
+            self.assertRegex(plan, rf"{model._meta.db_table}_match_id_\w+", model)
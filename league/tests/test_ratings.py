@@ -0,0 +1,145 @@
+from datetime import date
+from importlib import import_module
+from io import StringIO
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from league.models import Match, Team, TeamRating, Tournament
+
+rate_existing_matches = import_module(
+    "league.migrations.0017_team_rating"
+).rate_existing_matches
+
+
+@override_settings(ELO_INITIAL_RATING=1500, ELO_K=30, ELO_HOME_ADVANTAGE=0)
+class RatingsTest(TestCase):
+    """
+    Tests the Elo ratings kept up to date by saved results and the replay command.
+    """
+
+    def setUp(self):
+        self.tournament = Tournament.objects.create(short_description="ICCL Test")
+        self.later = Tournament.objects.create(short_description="ICCL Next Season")
+        self.a, self.b, self.c = (
+            Team.objects.create(name=name, tournament=self.tournament)
+            for name in ("Team A", "Team B", "Team C")
+        )
+
+    def play(self, home, away, home_score, away_score, day, tournament=None):
+        return Match.objects.create(
+            week_number=day,
+            match_date=date(2024, 1, day),
+            home_team=home,
+            away_team=away,
+            home_score=home_score,
+            away_score=away_score,
+            is_played=True,
+            tournament=tournament or self.tournament,
+        )
+
+    def ratings(self):
+        return list(
+            TeamRating.objects.order_by(
+                "match_date", "match_id", "team_id"
+            ).values_list("team_id", "match_id", "rating", "change")
+        )
+
+    def current(self, team):
+        return (
+            TeamRating.objects.filter(team=team).latest("match_date", "match_id").rating
+        )
+
+    def test_saved_result_is_rated(self):
+        self.play(self.a, self.b, 2, 1, day=1)
+        self.assertAlmostEqual(self.current(self.a), 1515)
+        self.assertAlmostEqual(self.current(self.b), 1485)
+
+        # Unplayed fixtures and walkovers aren't rated.
+        Match.objects.create(
+            week_number=2,
+            match_date=date(2024, 1, 2),
+            home_team=self.a,
+            away_team=self.c,
+            is_walkover=True,
+            walkover_winner=self.c,
+            tournament=self.tournament,
+        )
+        self.assertEqual(TeamRating.objects.count(), 2)
+
+        # A big win moves more; ratings carry over into the next tournament.
+        self.play(self.b, self.a, 4, 0, day=3, tournament=self.later)
+        rating = TeamRating.objects.get(team=self.b, tournament=self.later)
+        self.assertGreater(rating.change, 1.5 * 15)
+        self.assertAlmostEqual(self.current(self.a) + self.current(self.b), 3000)
+
+    def test_edited_result_replays_later_ratings(self):
+        first = self.play(self.a, self.b, 2, 1, day=1)
+        self.play(self.b, self.c, 1, 1, day=2)
+        self.play(self.c, self.a, 0, 3, day=3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.home_score = 0
+            first.save()
+        edited = self.ratings()
+        self.assertLess(self.current(self.a), 1515)
+
+        call_command("replay_ratings", stdout=StringIO())
+        self.assertEqual(self.ratings(), edited)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertFalse(
+            TeamRating.objects.filter(match_date=date(2024, 1, 1)).exists()
+        )
+        self.assertAlmostEqual(
+            TeamRating.objects.get(team=self.b, match_date=date(2024, 1, 2)).rating,
+            1500,
+        )
+
+    def test_replay_matches_incremental_ratings(self):
+        self.play(self.a, self.b, 2, 1, day=1)
+        self.play(self.b, self.c, 3, 0, day=2, tournament=self.later)
+        self.play(self.c, self.a, 2, 2, day=3)
+        incremental = self.ratings()
+
+        out = StringIO()
+        call_command("replay_ratings", chunk_size=2, stdout=out)
+        self.assertIn("Rated 3 matches", out.getvalue())
+        self.assertEqual(self.ratings(), incremental)
+
+    def test_migration_rates_existing_results(self):
+        self.play(self.a, self.b, 2, 1, day=1)
+        self.play(self.b, self.c, 3, 0, day=2, tournament=self.later)
+        self.play(self.c, self.a, 2, 2, day=3)
+        incremental = self.ratings()
+        TeamRating.objects.all().delete()
+
+        rate_existing_matches(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(self.ratings(), incremental)
+
+    def test_team_page_and_api(self):
+        self.play(self.a, self.b, 2, 1, day=1)
+        self.play(self.c, self.a, 0, 1, day=2)
+
+        response = self.client.get(
+            reverse("tournament_team", args=[self.tournament.id, self.a.id])
+        )
+        self.assertContains(response, "Elo rating")
+        self.assertEqual(len(response.context["ratings"]), 2)
+
+        # C lost to a stronger side than B did, so it dropped less.
+        data = self.client.get(reverse("api_ratings")).json()
+        self.assertEqual(
+            [row["team"]["name"] for row in data["results"]],
+            ["Team A", "Team C", "Team B"],
+        )
+        self.assertEqual(data["results"][0]["matches"], 2)
+
+        data = self.client.get(reverse("api_team_ratings", args=[self.a.id])).json()
+        self.assertEqual([row["week"] for row in data["results"]], [1, 2])
+        self.assertEqual(data["rating"], data["results"][-1]["rating"])
@@ -0,0 +1,127 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from league.models import Goal, Match, Person, Player, SeasonRollup, Team
+from league.models import TeamOfTheWeek, Tournament
+
+
+class RecordsTest(TestCase):
+    """
+    Tests the per-tournament rollups behind the all-time records page.
+    """
+
+    def setUp(self):
+        self.first = Tournament.objects.create(short_description="ICCL 2024")
+        self.second = Tournament.objects.create(short_description="ICCL 2025")
+        self.home = Team.objects.create(name="Home", tournament=self.first)
+        self.away = Team.objects.create(name="Away", tournament=self.first)
+        dob = date(1992, 3, 4)
+        self.then = Player.objects.create(
+            name="Ravi Das", team=self.home, tournament=self.first, dob=dob
+        )
+        self.now = Player.objects.create(
+            name="Ravi Das", team=self.away, tournament=self.second, dob=dob
+        )
+        self.other = Player.objects.create(
+            name="Sam Roy", team=self.away, tournament=self.first
+        )
+        self.match_one = self.match(self.first, mom=self.then)
+        self.match_two = self.match(self.second, mom=self.now)
+        Goal.objects.create(match=self.match_one, player=self.then, goals=3)
+        Goal.objects.create(match=self.match_two, player=self.now, goals=2)
+        Goal.objects.create(match=self.match_one, player=self.other, goals=4)
+        TeamOfTheWeek.objects.create(
+            week_number=1,
+            weekend_date=timezone.now().date(),
+            tournament=self.first,
+            striker=self.then,
+            left_mid=self.other,
+            right_mid=self.other,
+            left_defence=self.other,
+            right_defence=self.other,
+            goal_keeper=self.other,
+        )
+        self.person = Person.objects.get(pk=self.then.person_id)
+
+    def match(self, tournament, mom):
+        return Match.objects.create(
+            week_number=1,
+            match_date=timezone.now().date(),
+            home_team=self.home,
+            away_team=self.away,
+            home_score=1,
+            away_score=0,
+            is_played=True,
+            mom=mom,
+            tournament=tournament,
+        )
+
+    def seasons(self, person):
+        return {
+            rollup.tournament_id: (
+                rollup.goals,
+                rollup.motm_awards,
+                rollup.totw_appearances,
+            )
+            for rollup in SeasonRollup.objects.filter(person=person)
+        }
+
+    def test_rollups_follow_saved_rows(self):
+        self.assertEqual(
+            self.seasons(self.person),
+            {self.first.id: (3, 1, 1), self.second.id: (2, 1, 0)},
+        )
+        self.person.refresh_from_db()
+        self.assertEqual(
+            (self.person.goals, self.person.motm_awards, self.person.totw_appearances),
+            (5, 2, 1),
+        )
+
+        self.match_two.mom = None
+        self.match_two.save()
+        Goal.objects.filter(match=self.match_two).delete()
+        self.assertEqual(self.seasons(self.person), {self.first.id: (3, 1, 1)})
+
+    def test_records_page_and_api(self):
+        response = self.client.get(reverse("tournament_records", args=[self.first.id]))
+        self.assertTemplateUsed(response, "league/records.html")
+        _, leaders = response.context["all_time"][0]
+        self.assertEqual(
+            [(row["name"], row["total"]) for row in leaders],
+            [("Ravi Das", 5), ("Sam Roy", 4)],
+        )
+        _, seasons = response.context["best_seasons"][0]
+        self.assertEqual([row["total"] for row in seasons], [4, 3, 2])
+
+        data = self.client.get(reverse("api_records")).json()["results"]
+        self.assertEqual(data["totw_appearances"]["all_time"][0]["player"], "Sam Roy")
+        self.assertEqual(data["totw_appearances"]["all_time"][0]["total"], 5)
+
+        data = self.client.get(
+            reverse("api_records"), {"tournament": self.second.id}
+        ).json()["results"]
+        self.assertNotIn("all_time", data["goals"])
+        self.assertEqual(
+            data["goals"]["best_seasons"],
+            [{"player": "Ravi Das", "tournament": self.second.id, "total": 2}],
+        )
+
+    def test_rebuild_recounts_everything(self):
+        before = {person.pk: self.seasons(person) for person in Person.objects.all()}
+        SeasonRollup.objects.all().delete()
+        Person.objects.update(goals=0, motm_awards=0, totw_appearances=0)
+
+        out = StringIO()
+        call_command("rebuild_leaderboards", chunk_size=1, stdout=out)
+        self.assertIn("2 people", out.getvalue())
+        self.assertEqual(
+            {person.pk: self.seasons(person) for person in Person.objects.all()},
+            before,
+        )
+        self.person.refresh_from_db()
+        self.assertEqual(self.person.goals, 5)
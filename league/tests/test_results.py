@@ -0,0 +1,119 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from league.models import Match, Team, Tournament
+from league.results import build_results_matrix, head_to_head, team_season
+
+from .test_views import LOCAL_CACHE, BaseViewTest
+
+
+class TeamPageTest(BaseViewTest):
+    """
+    Tests the results matrix and the team page built from it.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.team3 = Team.objects.create(name="Test Team C", tournament=self.tournament)
+        self.play(self.team3, self.team1, 0, 4, week=2)
+        self.play(self.team1, self.team2, 1, 1, week=3)
+        self.play(self.team2, self.team1, 3, 0, week=4)
+
+    def play(self, home, away, home_score, away_score, week, tournament=None):
+        return Match.objects.create(
+            week_number=week,
+            match_date=timezone.now().date(),
+            home_team=home,
+            away_team=away,
+            home_score=home_score,
+            away_score=away_score,
+            is_played=True,
+            tournament=tournament or self.tournament,
+        )
+
+    def test_matrix_is_built_in_one_query(self):
+        with self.assertNumQueries(1):
+            matrix = build_results_matrix(self.tournament)
+        self.assertEqual(matrix.weeks, [1, 2, 3, 4])
+        a, b = matrix.index[self.team1.id], matrix.index[self.team2.id]
+        self.assertEqual(matrix.points_to_date[3, a, b], 4)
+        self.assertEqual(matrix.goals_to_date[3, b, a], 5)
+
+    def test_form_splits_and_biggest_wins(self):
+        season = team_season(build_results_matrix(self.tournament), self.team1.id)
+        self.assertEqual([match["result"] for match in season["form"]], list("LDWW"))
+        self.assertEqual(
+            (
+                season["home"]["played"],
+                season["home"]["wins"],
+                season["away"]["losses"],
+            ),
+            (2, 1, 1),
+        )
+        self.assertEqual(
+            [(m["goals_for"], m["goals_against"]) for m in season["biggest_wins"]],
+            [(4, 0), (2, 1)],
+        )
+
+    def test_head_to_head_across_tournaments(self):
+        later = Tournament.objects.create(short_description="ICCL Next Season")
+        self.play(self.team1, self.team2, 2, 2, week=1, tournament=later)
+        rows = head_to_head(self.team1.id)
+        self.assertEqual(rows[0]["opponent"], self.team2.name)
+        self.assertEqual(
+            (rows[0]["played"], rows[0]["wins"], rows[0]["draws"], rows[0]["losses"]),
+            (4, 1, 2, 1),
+        )
+        # Newest first: the later tournament's meeting, then this one's week 4.
+        self.assertEqual(
+            [(m["tournament"], m["week"]) for m in rows[0]["meetings"][:2]],
+            [(later.short_description, 1), (self.tournament.short_description, 4)],
+        )
+
+    @override_settings(CACHES=LOCAL_CACHE)
+    def test_team_page_sees_results_of_other_tournaments(self):
+        cache.clear()
+        url = reverse("tournament_team", args=[self.tournament.id, self.team1.id])
+
+        def meetings_with_team3():
+            rows = self.client.get(url).context["head_to_head"]
+            return next(r for r in rows if r["opponent"] == self.team3.name)["played"]
+
+        self.assertEqual(meetings_with_team3(), 1)
+        later = Tournament.objects.create(short_description="ICCL Next Season")
+        self.play(self.team1, self.team3, 5, 0, week=1, tournament=later)
+        self.assertEqual(meetings_with_team3(), 2)
+        cache.clear()
+
+    @override_settings(CACHES=LOCAL_CACHE)
+    def test_cached_head_to_head_reads_fixed_number_of_keys(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for n in range(5):
+            Tournament.objects.create(short_description=f"ICCL {n}")
+        head_to_head(self.team1.id)
+
+        with mock.patch.object(cache, "get", wraps=cache.get) as get:
+            rows = head_to_head(self.team1.id)
+        self.assertEqual(rows[0]["opponent"], self.team2.name)
+        # The shared generation, then the cached rows
+        self.assertEqual(get.call_count, 2)
+
+    def test_team_page(self):
+        response = self.client.get(
+            reverse("tournament_team", args=[self.tournament.id, self.team1.id])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "league/team.html")
+        self.assertContains(response, "Head to Head")
+        self.assertEqual(len(response.context["head_to_head"]), 2)
+
+        other = Tournament.objects.create(short_description="ICCL Other")
+        response = self.client.get(
+            reverse("tournament_team", args=[other.id, self.team1.id])
+        )
+        self.assertEqual(response.status_code, 404)
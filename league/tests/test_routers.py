@@ -0,0 +1,127 @@
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import SimpleTestCase, RequestFactory, override_settings
+
+from league.middleware import PRIMARY_PIN_COOKIE, PrimaryPinningMiddleware
+from league.models import Match, Tournament
+from league.routers import (
+    PRIMARY_DB,
+    REPLICA_DB,
+    PrimaryReplicaRouter,
+    primary_reads,
+)
+
+# Two SQLite files stand in for the Postgres primary and its replica.
+PRIMARY_AND_REPLICA = {
+    PRIMARY_DB: {"ENGINE": "django.db.backends.sqlite3", "NAME": "primary.sqlite3"},
+    REPLICA_DB: {"ENGINE": "django.db.backends.sqlite3", "NAME": "replica.sqlite3"},
+}
+
+
+@override_settings(DATABASES=PRIMARY_AND_REPLICA)
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    """
+    Tests the routing decisions of PrimaryReplicaRouter.
+    """
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_league_reads_use_replica(self):
+        with primary_reads(False):
+            self.assertEqual(self.router.db_for_read(Match), REPLICA_DB)
+
+    def test_non_league_reads_use_primary(self):
+        with primary_reads(False):
+            self.assertEqual(self.router.db_for_read(Session), PRIMARY_DB)
+
+    def test_writes_use_primary_and_pin_later_reads(self):
+        with primary_reads(False):
+            self.assertEqual(self.router.db_for_write(Match), PRIMARY_DB)
+            self.assertEqual(self.router.db_for_read(Tournament), PRIMARY_DB)
+
+    def test_pinned_reads_use_primary(self):
+        with primary_reads(True):
+            self.assertEqual(self.router.db_for_read(Match), PRIMARY_DB)
+
+    def test_related_reads_follow_instance(self):
+        match = Match()
+        match._state.db = PRIMARY_DB
+        with primary_reads(False):
+            self.assertEqual(
+                self.router.db_for_read(Tournament, instance=match), PRIMARY_DB
+            )
+
+    def test_migrations_only_run_on_primary(self):
+        self.assertTrue(self.router.allow_migrate(PRIMARY_DB, "league"))
+        self.assertFalse(self.router.allow_migrate(REPLICA_DB, "league"))
+
+    @override_settings(DATABASES={PRIMARY_DB: PRIMARY_AND_REPLICA[PRIMARY_DB]})
+    def test_without_replica_everything_uses_primary(self):
+        with primary_reads(False):
+            self.assertEqual(self.router.db_for_read(Match), PRIMARY_DB)
+
+
+@override_settings(DATABASES=PRIMARY_AND_REPLICA)
+class PrimaryPinningMiddlewareTest(SimpleTestCase):
+    """
+    Tests which requests the middleware pins to the primary.
+    """
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+
+    def run_middleware(self, request, write=False):
+        """Runs a dummy view; returns (db used for a league read, response)."""
+        seen = {}
+
+        def view(request):
+            if write:
+                self.router.db_for_write(Match)
+            seen["db"] = self.router.db_for_read(Match)
+            return HttpResponse()
+
+        response = PrimaryPinningMiddleware(view)(request)
+        return seen["db"], response
+
+    def test_public_get_reads_replica(self):
+        db, response = self.run_middleware(self.factory.get("/table/"))
+        self.assertEqual(db, REPLICA_DB)
+        self.assertNotIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+    def test_admin_pages_read_primary(self):
+        db, _ = self.run_middleware(self.factory.get("/admin/league/match/"))
+        self.assertEqual(db, PRIMARY_DB)
+
+    def test_post_reads_primary(self):
+        db, _ = self.run_middleware(self.factory.post("/posts/"))
+        self.assertEqual(db, PRIMARY_DB)
+
+    def test_write_sets_pin_cookie(self):
+        db, response = self.run_middleware(
+            self.factory.post("/admin/league/match/1/change/"), write=True
+        )
+        self.assertEqual(db, PRIMARY_DB)
+        self.assertEqual(
+            response.cookies[PRIMARY_PIN_COOKIE]["max-age"],
+            settings.DATABASE_REPLICA_PIN_SECONDS,
+        )
+
+    def test_pin_cookie_reads_primary_after_own_write(self):
+        request = self.factory.get("/results/")
+        request.COOKIES[PRIMARY_PIN_COOKIE] = "1"
+        db, _ = self.run_middleware(request)
+        self.assertEqual(db, PRIMARY_DB)
+
+    async def test_async_view_is_pinned_after_write(self):
+        router = self.router
+
+        async def view(request):
+            router.db_for_write(Match)
+            return HttpResponse(router.db_for_read(Match))
+
+        response = await PrimaryPinningMiddleware(view)(self.factory.get("/table/"))
+        self.assertEqual(response.content.decode(), PRIMARY_DB)
+        self.assertIn(PRIMARY_PIN_COOKIE, response.cookies)
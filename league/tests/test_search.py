@@ -0,0 +1,107 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from league.models import Match, Player, Team, Tournament
+
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "stale_pages": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
+
+class SearchTest(TestCase):
+    """
+    Tests the player and team search endpoint and the admin player pickers
+    behind it.
+    """
+
+    def setUp(self):
+        self.first = Tournament.objects.create(short_description="ICCL 2024")
+        self.second = Tournament.objects.create(short_description="ICCL 2025")
+        self.home = Team.objects.create(name="Asha Strikers", tournament=self.second)
+        self.away = Team.objects.create(name="Rovers", tournament=self.second)
+        self.other = Team.objects.create(name="Others", tournament=self.second)
+        dob = date(1993, 6, 1)
+        Player.objects.create(
+            name="Asha Rao", team=self.home, tournament=self.first, dob=dob
+        )
+        self.asha = Player.objects.create(
+            name="Asha Rao", team=self.home, tournament=self.second, dob=dob
+        )
+        self.ashwin = Player.objects.create(
+            name="Ashwin Pal", team=self.other, tournament=self.second
+        )
+
+    def search(self, query):
+        return self.client.get(reverse("api_search"), {"q": query}).json()
+
+    def test_people_and_teams_by_prefix(self):
+        data = self.search("  ASH ")
+        self.assertEqual(
+            [(row["name"], row["team"]) for row in data["players"]],
+            [("Asha Rao", "Asha Strikers"), ("Ashwin Pal", "Others")],
+        )
+        self.assertEqual(
+            data["players"][0]["url"],
+            reverse("tournament_player", args=[self.second.id, self.asha.id]),
+        )
+        self.assertEqual([row["name"] for row in data["teams"]], ["Asha Strikers"])
+        self.assertEqual(self.search("r"), {"query": "r", "players": [], "teams": []})
+
+    def test_prefix_lowered_by_the_database(self):
+        """Both sides of the prefix match follow the database's case rules."""
+        team = Team.objects.create(name="Ålesund", tournament=self.second)
+        Player.objects.create(name="Åse Lie", team=team, tournament=self.second)
+        data = self.search("Åse")
+        self.assertEqual([row["name"] for row in data["players"]], ["Åse Lie"])
+        self.assertEqual(
+            [row["name"] for row in self.search("Åles")["teams"]], ["Ålesund"]
+        )
+
+    @override_settings(CACHES=LOCAL_CACHE)
+    def test_results_are_cached_per_term(self):
+        cache.clear()
+        self.assertEqual(len(self.search("ashw")["players"]), 1)
+        Player.objects.create(
+            name="Ashwini Sen", team=self.away, tournament=self.second
+        )
+        # Served from the cache until it expires
+        self.assertEqual(len(self.search("Ashw")["players"]), 1)
+        cache.clear()
+
+    def test_admin_picker_offers_the_teams_of_the_match(self):
+        match = Match.objects.create(
+            week_number=1,
+            match_date=timezone.now().date(),
+            home_team=self.home,
+            away_team=self.away,
+            tournament=self.second,
+        )
+        User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.login(username="admin", password="password")
+        params = {
+            "app_label": "league",
+            "model_name": "goal",
+            "field_name": "player",
+            "term": "ash",
+        }
+        url = reverse("admin:autocomplete")
+
+        everyone = self.client.get(url, params).json()["results"]
+        self.assertEqual(len(everyone), 3)
+
+        change_page = self.client.get(
+            reverse("admin:league_match_change", args=[match.id])
+        )
+        # The picker's searches carry the match, whatever page sent them
+        self.assertContains(change_page, f'data-ajax--url="{url}?match={match.id}"')
+        players = self.client.get(
+            url, {**params, "match": match.id}, HTTP_REFERER="http://testserver/"
+        ).json()["results"]
+        self.assertNotIn(str(self.ashwin.id), [row["id"] for row in players])
+        self.assertIn(str(self.asha.id), [row["id"] for row in players])
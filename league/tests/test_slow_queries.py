@@ -0,0 +1,38 @@
+import json
+import logging
+
+from django.test import override_settings
+from django.urls import reverse
+
+from league.logs import JsonFormatter
+
+from .test_views import BaseViewTest
+
+
+@override_settings(SLOW_QUERY_SECONDS=0)
+class SlowQueryLogTest(BaseViewTest):
+    """
+    Tests that slow statements are logged with the request they came from.
+    """
+
+    def test_query_is_attributed_to_view_and_week(self):
+        url = reverse("tournament_fixtures_week", args=[self.tournament.id, 1])
+        with self.assertLogs("league.slow_queries", logging.WARNING) as logs:
+            self.client.get(url)
+
+        record = logs.records[-1]
+        self.assertEqual(
+            (record.view, record.path, record.tournament, record.week),
+            ("tournament_fixtures_week", url, self.tournament.id, 1),
+        )
+        self.assertIn("SELECT", record.sql)
+        self.assertTrue(any(frame.startswith("league/") for frame in record.stack))
+
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry["level"], "WARNING")
+        self.assertEqual(entry["view"], "tournament_fixtures_week")
+
+    @override_settings(SLOW_QUERY_SECONDS=60)
+    def test_fast_queries_are_not_logged(self):
+        with self.assertNoLogs("league.slow_queries"):
+            self.client.get(reverse("tournament_table", args=[self.tournament.id]))
@@ -0,0 +1,62 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import OperationalError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from .test_views import BaseViewTest
+
+LOCMEM_STALE_PAGES = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    "stale_pages": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "stale-pages-test",
+        "TIMEOUT": None,
+    },
+}
+
+DATABASE_DOWN = mock.patch(
+    "league.views.get_tournament_details",
+    side_effect=OperationalError("server closed the connection unexpectedly"),
+)
+
+
+@override_settings(CACHES=LOCMEM_STALE_PAGES)
+class StalePageMiddlewareTest(BaseViewTest):
+    """
+    Tests that public pages fall back to their last good copy when the
+    database is unreachable.
+    """
+
+    def setUp(self):
+        super().setUp()
+        caches["stale_pages"].clear()
+        self.client = Client(raise_request_exception=False)
+        self.url = reverse("tournament_fixtures_week", args=[self.tournament.id, 1])
+
+    def test_serves_last_good_copy_with_banner(self):
+        fresh = self.client.get(self.url)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotContains(fresh, "stale-banner")
+
+        with DATABASE_DOWN:
+            stale = self.client.get(self.url)
+
+        self.assertEqual(stale.status_code, 200)
+        self.assertContains(stale, "stale-banner")
+        self.assertContains(stale, self.team1.name)
+        self.assertEqual(stale["Cache-Control"], "no-store")
+
+    def test_error_without_copy_is_still_an_error(self):
+        with DATABASE_DOWN:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 500)
+
+    def test_copies_are_per_url(self):
+        self.client.get(self.url)
+        with DATABASE_DOWN:
+            response = self.client.get(
+                reverse("tournament_fixtures_week", args=[self.tournament.id, 2])
+            )
+        self.assertEqual(response.status_code, 500)
@@ -0,0 +1,90 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from league.models import Card, Match, Player, Team, Team_Standing, Tournament
+from league.standings import rank_standings
+from league.views import table_data
+
+
+class TiebreakerTest(TestCase):
+    """
+    Tests the tiebreakers of the league table.
+    """
+
+    def setUp(self):
+        self.tournament = Tournament.objects.create(short_description="ICCL Test")
+        self.teams = {
+            name: Team.objects.create(name=name, tournament=self.tournament)
+            for name in "ABCD"
+        }
+
+    def play(self, home, away, home_score, away_score, week=1):
+        return Match.objects.create(
+            week_number=week,
+            match_date=timezone.now().date(),
+            home_team=self.teams[home],
+            away_team=self.teams[away],
+            home_score=home_score,
+            away_score=away_score,
+            is_played=True,
+            tournament=self.tournament,
+        )
+
+    def rows(self, names, points=4):
+        return [
+            {"name": name, "points": points, "goal_difference": 0, "goals_for": 5}
+            for name in names
+        ]
+
+    def ranked(self, names, week=3, **kwargs):
+        rows = rank_standings(self.tournament, week, self.rows(names), **kwargs)
+        return "".join(row["name"] for row in rows)
+
+    def test_head_to_head_points(self):
+        self.play("B", "A", 1, 0)
+        self.assertEqual(self.ranked("AB"), "BA")
+
+    def test_head_to_head_only_counts_matches_up_to_the_week(self):
+        self.play("A", "B", 2, 0, week=1)
+        self.play("B", "A", 3, 0, week=2)
+        self.assertEqual(self.ranked("BA", week=1), "AB")
+        self.assertEqual(self.ranked("AB", week=2), "BA")
+
+    def test_mini_league_restarts_among_teams_still_level(self):
+        self.play("B", "A", 1, 0)
+        self.play("A", "C", 5, 0)
+        self.play("A", "D", 0, 0)
+        self.play("B", "C", 0, 0)
+        self.play("D", "B", 1, 0)
+        self.play("C", "D", 0, 0, week=2)
+        # D has 5 head-to-head points, A and B 4, C 2. A has the better
+        # head-to-head goal difference of the four, but B beat A.
+        self.assertEqual(self.ranked("ABCD"), "DBAC")
+        rules = ["points", "head_to_head_points", "head_to_head_goal_difference"]
+        self.assertEqual(self.ranked("ABCD", rules=rules), "DBAC")
+
+    def test_fair_play_then_lots(self):
+        match = self.play("C", "D", 1, 1)
+        player = Player.objects.create(name="P", team=self.teams["A"])
+        Card.objects.create(
+            match=match, player=player, card_type="RED", tournament=self.tournament
+        )
+        self.assertEqual(self.ranked("AB"), "BA")
+        drawn = self.ranked("CD")
+        self.assertEqual(self.ranked("DC"), drawn)
+        with self.assertRaises(ValueError):
+            self.ranked("CD", rules=["points", "coin_toss"])
+
+    def test_table_uses_tiebreakers(self):
+        self.play("B", "A", 1, 0)
+        for name in "AB":
+            Team_Standing.objects.create(
+                name=name,
+                matches_played=1,
+                points=3,
+                goal_difference=0,
+                goals_for=2,
+                tournament=self.tournament,
+            )
+        html = table_data(self.tournament)["points_table_html"]
+        self.assertLess(html.index("<td>B</td>"), html.index("<td>A</td>"))
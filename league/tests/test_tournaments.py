@@ -0,0 +1,63 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from league.models import Tournament
+from league.tournaments import TOURNAMENT_COOKIE, clear_tournament_cache
+
+from .test_views import BaseViewTest
+
+
+@override_settings(TOURNAMENT_CACHE_SECONDS=60)
+class TournamentMiddlewareTest(BaseViewTest):
+    """
+    Tests that the selected tournament is resolved once per request from a
+    per-process copy of the tournaments table.
+    """
+
+    def setUp(self):
+        super().setUp()
+        clear_tournament_cache()
+        self.other = Tournament.objects.create(short_description="ICCL Other")
+
+    def tearDown(self):
+        clear_tournament_cache()
+
+    def tournament_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [q for q in ctx.captured_queries if '"league_tournament"' in q["sql"]]
+
+    def test_tournaments_are_not_queried_again(self):
+        url = reverse("tournament_fixtures", args=[self.other.id])
+        self.assertEqual(len(self.tournament_queries(url)), 1)
+        self.assertEqual(self.tournament_queries(url), [])
+
+    def test_saving_a_tournament_reloads_the_copy(self):
+        url = reverse("tournament_sponsors", args=[self.tournament.id])
+        self.tournament_queries(url)
+        self.other.short_description = "ICCL Renamed"
+        self.other.save()
+        response = self.client.get(url)
+        self.assertIn(
+            "ICCL Renamed",
+            [t.short_description for t in response.context["tournaments"]],
+        )
+
+    def test_path_selects_the_tournament(self):
+        response = self.client.get(reverse("tournament_table", args=[self.other.id]))
+        self.assertEqual(response.wsgi_request.tournament, self.other)
+        self.assertEqual(response.context["selected_tournament"], self.other)
+
+    def test_legacy_url_uses_the_tournament_cookie(self):
+        self.client.cookies[TOURNAMENT_COOKIE] = str(self.other.id)
+        response = self.client.get(reverse("stats"))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], f"/t/{self.other.id}/stats/")
+
+    def test_team_of_the_week_without_tournament(self):
+        response = self.client.get(reverse("team_of_the_week"), follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["selected_tournament"], self.tournament)
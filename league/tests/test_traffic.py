@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from tracking.models import Pageview, Visitor
+
+from league.models import Tournament, TrafficRollup
+from league.traffic import period_start, prune_raw_rows, rollup_period
+
+
+@override_settings(TRACK_RAW_RETENTION_DAYS=30, TRAFFIC_ROLLUP_CHUNK=2)
+class TrafficRollupTest(TestCase):
+    """
+    Tests the incremental hourly and daily rollups and raw row pruning.
+    """
+
+    def setUp(self):
+        self.tournament = Tournament.objects.create(short_description="ICCL Test")
+        self.now = period_start(timezone.now(), TrafficRollup.HOUR) + timedelta(
+            minutes=30
+        )
+        self.hour = period_start(self.now, TrafficRollup.HOUR) - timedelta(hours=2)
+        self.alice = Visitor.objects.create(session_key="a" * 40, ip_address="10.0.0.1")
+        self.bob = Visitor.objects.create(session_key="b" * 40, ip_address="10.0.0.2")
+        self.view(self.alice, f"/t/{self.tournament.id}/table/week/3/", minutes=5)
+        self.view(self.alice, f"/t/{self.tournament.id}/table/week/3/", minutes=10)
+        self.view(self.bob, f"/t/{self.tournament.id}/table/week/3/", minutes=20)
+        self.view(self.bob, "/posts/", minutes=70)
+
+    def view(self, visitor, url, minutes):
+        Pageview.objects.create(
+            visitor=visitor, url=url, view_time=self.hour + timedelta(minutes=minutes)
+        )
+
+    def test_hourly_rollup(self):
+        self.assertEqual(rollup_period(TrafficRollup.HOUR, now=self.now), 2)
+        rows = TrafficRollup.objects.filter(period_start=self.hour)
+        table = rows.get(page="table")
+        self.assertEqual(
+            (table.tournament, table.week_number, table.views, table.visitors),
+            (self.tournament, 3, 3, 2),
+        )
+        self.assertEqual(rows.get(page=TrafficRollup.ALL_PAGES).views, 3)
+        self.assertEqual(
+            TrafficRollup.objects.get(page="posts").period_start,
+            self.hour + timedelta(hours=1),
+        )
+        # Already rolled up hours are not read again.
+        self.assertEqual(rollup_period(TrafficRollup.HOUR, now=self.now), 0)
+
+    def test_raw_rows_are_kept_until_rolled_up(self):
+        Pageview.objects.update(view_time=self.now - timedelta(days=40))
+        Visitor.objects.update(start_time=self.now - timedelta(days=40))
+        self.assertEqual(prune_raw_rows(now=self.now)[0], 0)
+
+        rollup_period(TrafficRollup.DAY, now=self.now)
+        self.assertEqual(prune_raw_rows(now=self.now)[:2], (4, 2))
+        self.assertFalse(Pageview.objects.exists())
+        self.assertEqual(
+            TrafficRollup.objects.get(page=TrafficRollup.ALL_PAGES).visitors, 2
+        )
+
+    def test_dashboard_reads_rollups(self):
+        call_command("rollup_traffic", stdout=open("/dev/null", "w"))
+        User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.login(username="admin", password="password")
+        response = self.client.get(reverse("admin:league_trafficrollup_changelist"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["top_pages"][0]["page"], "table")
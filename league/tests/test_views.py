@@ -1,7 +1,9 @@
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
+from league import views
 from league.models import (
     Tournament,
     Team,
@@ -12,6 +14,11 @@ from league.models import (
     Card,
 )
 
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "stale_pages": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
 
 class BaseViewTest(TestCase):
     """
@@ -61,6 +68,7 @@ class FixtureViewTest(BaseViewTest):
         response = self.client.get(
             reverse("fixtures"),
             {"week_number": 1, "tournament": self.tournament.id},
+            follow=True,
         )
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "league/fixture.html")
@@ -71,7 +79,7 @@ class FixtureViewTest(BaseViewTest):
     def test_fixture_view_without_week_number(self):
         """Test the fixture view defaults to the first week."""
         response = self.client.get(
-            reverse("fixtures"), {"tournament": self.tournament.id}
+            reverse("fixtures"), {"tournament": self.tournament.id}, follow=True
         )
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "league/fixture.html")
@@ -84,6 +92,7 @@ class ResultViewTest(BaseViewTest):
         response = self.client.get(
             reverse("results"),
             {"week_number": 1, "tournament": self.tournament.id},
+            follow=True,
         )
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "league/result.html")
@@ -94,7 +103,9 @@ class ResultViewTest(BaseViewTest):
 class TableViewTest(BaseViewTest):
     def test_table_view_renders_correctly(self):
         """Test the table view generates the standings table HTML."""
-        response = self.client.get(reverse("table"), {"tournament": self.tournament.id})
+        response = self.client.get(
+            reverse("table"), {"tournament": self.tournament.id}, follow=True
+        )
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "league/table.html")
         self.assertIn("league-table", response.context["points_table_html"])
@@ -105,7 +116,9 @@ class TableViewTest(BaseViewTest):
 class StatsViewTest(BaseViewTest):
     def test_stats_view_aggregates_data_correctly(self):
         """Test that the stats view correctly aggregates data from models."""
-        response = self.client.get(reverse("stats"), {"tournament": self.tournament.id})
+        response = self.client.get(
+            reverse("stats"), {"tournament": self.tournament.id}, follow=True
+        )
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "league/stats.html")
 
@@ -137,13 +150,46 @@ class PlayersViewTest(BaseViewTest):
         response = self.client.get(
             reverse("players"),
             {"team_id": self.team1.id, "tournament": self.tournament.id},
+            follow=True,
         )
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "league/players.html")
         self.assertEqual(
-            response.context["players_for_team"].first().name, "Test Player A"
+            response.context["players_for_team"][0]["name"], "Test Player A"
+        )
+        self.assertEqual(len(response.context["players_for_team"]), 1)
+        self.assertEqual(response.context["selected_team"]["name"], "Test Team A")
+
+    def test_tournament_rosters(self):
+        """Teams without players are listed too, all from one query."""
+        with self.assertNumQueries(1):
+            rosters = views.tournament_rosters(self.tournament)
+        self.assertEqual(
+            [team["name"] for team in rosters], ["Test Team A", "Test Team B"]
         )
-        self.assertEqual(response.context["players_for_team"].count(), 1)
+        self.assertEqual(rosters[0]["players"][0]["id"], self.player1.id)
+        self.assertEqual(rosters[1]["players"], [])
+
+    @override_settings(CACHES=LOCAL_CACHE)
+    def test_rosters_follow_players_without_a_tournament(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        def roster(tournament, team):
+            teams = {team["id"]: team for team in views.tournament_rosters(tournament)}
+            return [player["name"] for player in teams[team.id]["players"]]
+
+        self.assertEqual(roster(self.tournament, self.team2), [])
+        player = Player.objects.create(name="No Tournament", team=self.team2)
+        self.assertEqual(roster(self.tournament, self.team2), ["No Tournament"])
+
+        later = Tournament.objects.create(short_description="ICCL Later")
+        elsewhere = Team.objects.create(name="Elsewhere", tournament=later)
+        self.assertEqual(roster(later, elsewhere), [])
+        player.team = elsewhere
+        player.save()
+        self.assertEqual(roster(self.tournament, self.team2), [])
+        self.assertEqual(roster(later, elsewhere), ["No Tournament"])
 
 
 class PlayerProfileViewTest(BaseViewTest):
@@ -152,9 +198,19 @@ class PlayerProfileViewTest(BaseViewTest):
         response = self.client.get(
             reverse("player_profile", args=[self.player1.id]),
             {"tournament": self.tournament.id},
+            follow=True,
         )
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "league/player_profile.html")
         self.assertEqual(response.context["player"].name, "Test Player A")
         self.assertEqual(response.context["total_goals"], 2)
-        self.assertEqual(response.context["moms"].count(), 1)
+        self.assertEqual(len(response.context["moms"]), 1)
+
+    def test_player_profile_timeline(self):
+        """The profile's events come with their opponent and totals."""
+        with self.assertNumQueries(1):
+            timeline = views.player_timeline(self.player1, self.tournament)
+        self.assertEqual(timeline["goals"][0]["opponent"], "Test Team B")
+        self.assertEqual(timeline["cards"][0]["card"], "YELLOW")
+        self.assertEqual(timeline["moms"][0]["week"], 1)
+        self.assertEqual((timeline["yellow_cards"], timeline["red_cards"]), (1, 0))
@@ -0,0 +1,66 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from tracking.models import Pageview, Visitor
+
+from league import visits
+from league.middleware import BufferedTrackingMiddleware
+
+
+class BufferedTrackingTest(TestCase):
+    """
+    Tests that requests only buffer hits and that batches are written in bulk.
+    """
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = BufferedTrackingMiddleware(lambda request: HttpResponse())
+
+    def hit(self, key, url, seconds=0):
+        return visits.Hit(
+            key, "10.0.0.1", "Firefox", None, url, "GET", None, None,
+            timezone.now() + timedelta(seconds=seconds),
+        )  # fmt: skip
+
+    def test_request_only_buffers(self):
+        with mock.patch.object(visits.buffer, "add") as add:
+            with self.assertNumQueries(0):
+                self.middleware(self.factory.get("/t/1/table/"))
+                self.middleware(self.factory.get("/static/league/css/app.css"))
+        add.assert_called_once()
+        self.assertEqual(add.call_args.args[0].url, "/t/1/table/")
+
+    @override_settings(TRACK_SAMPLE_RATE=0)
+    def test_unsampled_visitors_are_skipped(self):
+        with mock.patch.object(visits.buffer, "add") as add:
+            self.middleware(self.factory.get("/t/1/table/"))
+        add.assert_not_called()
+
+    def test_same_visitor_without_session(self):
+        first = visits.visitor_key(self.factory.get("/", REMOTE_ADDR="10.0.0.1"))
+        again = visits.visitor_key(self.factory.get("/", REMOTE_ADDR="10.0.0.1"))
+        other = visits.visitor_key(self.factory.get("/", REMOTE_ADDR="10.0.0.2"))
+        self.assertEqual(first, again)
+        self.assertNotEqual(first, other)
+
+    @mock.patch.object(visits, "TRACK_PAGEVIEWS", True)
+    def test_save_hits_in_bulk(self):
+        Visitor.objects.create(
+            session_key="b" * 40,
+            ip_address="10.0.0.2",
+            start_time=timezone.now() - timedelta(seconds=100),
+        )
+        hits = [
+            self.hit("a" * 40, "/t/1/table/"),
+            self.hit("b" * 40, "/t/1/stats/"),
+            self.hit("a" * 40, "/t/1/fixtures/", seconds=30),
+        ]
+        # Existing visitors, new visitors, updated visitors, pageviews.
+        with self.assertNumQueries(4):
+            visits.save_hits(hits)
+        self.assertEqual(Visitor.objects.get(pk="a" * 40).time_on_site, 30)
+        self.assertGreaterEqual(Visitor.objects.get(pk="b" * 40).time_on_site, 100)
+        self.assertEqual(Pageview.objects.count(), 3)
@@ -0,0 +1,105 @@
+"""
+Which tournament a request is about, resolved once per request.
+
+The tournaments table is tiny and changes a few times a year, so each process
+keeps a snapshot of it for TOURNAMENT_CACHE_SECONDS (dropped at once in the
+process that saves a tournament). TournamentMiddleware resolves the selected
+tournament from, in order:
+
+1. the ``/t/<tournament>/`` path,
+2. the legacy ``?tournament=`` query parameter,
+3. the ``iccl_tournament`` cookie set by the tournament selector,
+4. the first tournament,
+
+and exposes it as ``request.tournament`` (and the snapshot as
+``request.tournaments``), so views never query ``Tournament`` themselves.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.http import Http404
+
+from .models import Tournament
+
+TOURNAMENT_COOKIE = "iccl_tournament"
+
+_snapshot_lock = threading.Lock()
+_snapshot = {"expires": 0.0, "tournaments": (), "by_id": {}}
+
+
+def _load_snapshot():
+    tournaments = tuple(Tournament.objects.order_by("id"))
+    _snapshot.update(
+        expires=time.monotonic() + settings.TOURNAMENT_CACHE_SECONDS,
+        tournaments=tournaments,
+        by_id={t.pk: t for t in tournaments},
+    )
+
+
+def _current_snapshot():
+    if _snapshot["expires"] <= time.monotonic():
+        with _snapshot_lock:
+            if _snapshot["expires"] <= time.monotonic():
+                _load_snapshot()
+    return _snapshot
+
+
+def all_tournaments():
+    """Every tournament, ordered by id, from the process-level snapshot."""
+    return list(_current_snapshot()["tournaments"])
+
+
+def get_tournament(tournament_id):
+    """The tournament with this id (an int or digit string), or None."""
+    try:
+        return _current_snapshot()["by_id"].get(int(tournament_id))
+    except (TypeError, ValueError):
+        return None
+
+
+def clear_tournament_cache():
+    """Forgets this process's snapshot; the next lookup reloads it."""
+    _snapshot["expires"] = 0.0
+
+
+def requested_tournament_id(request, path_tournament=None):
+    """The tournament id asked for by the URL or cookie, if any."""
+    if path_tournament is not None:
+        return path_tournament
+    if request.GET.get("tournament"):
+        return request.GET["tournament"]
+    return request.COOKIES.get(TOURNAMENT_COOKIE)
+
+
+def resolve_tournament(request, path_tournament=None):
+    """
+    Sets and returns ``request.tournament``: the requested tournament, or the
+    first one when none (or an unknown one) was requested. With a
+    ``path_tournament`` that does not exist it is None, so canonical pages 404.
+    """
+    tournament = get_tournament(requested_tournament_id(request, path_tournament))
+    if tournament is None and path_tournament is None:
+        tournaments = _current_snapshot()["tournaments"]
+        tournament = tournaments[0] if tournaments else None
+    request.tournament = tournament
+    request.tournaments = all_tournaments()
+    return tournament
+
+
+def request_tournament(request):
+    """(selected tournament, all tournaments) of a request, resolved at most once."""
+    if not hasattr(request, "tournament"):
+        resolve_tournament(request)
+    return request.tournament, request.tournaments
+
+
+def path_tournament(request, tournament_id):
+    """The tournament of a ``/t/<tournament>/`` URL; Http404 if there is none."""
+    tournament = getattr(request, "tournament", None)
+    if tournament is None or tournament.pk != tournament_id:
+        tournament = resolve_tournament(request, tournament_id)
+    if tournament is None:
+        raise Http404("No such tournament")
+    return tournament
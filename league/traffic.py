@@ -0,0 +1,174 @@
+"""
+Traffic rollups from the tracking app's raw page views.
+
+``manage.py rollup_traffic`` turns every completed hour and day into
+TrafficRollup rows (views and distinct visitors by page, tournament and week),
+streaming the raw rows of one period at a time in chunks, and then prunes raw
+rows older than TRACK_RAW_RETENTION_DAYS. Reports read only the rollups.
+"""
+
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+from tracking.models import Pageview, Visitor
+
+from .canonical import LEGACY_PAGES
+from .models import TrafficRollup
+from .tournaments import get_tournament
+
+PERIOD_LENGTHS = {
+    TrafficRollup.HOUR: timedelta(hours=1),
+    TrafficRollup.DAY: timedelta(days=1),
+}
+
+# Canonical URL name -> (page, whether its trailing number is a week)
+CANONICAL_PAGES = {}
+for legacy_name, (page_name, number_param, numbered_name) in LEGACY_PAGES.items():
+    CANONICAL_PAGES[page_name] = (legacy_name, False)
+    if numbered_name:
+        CANONICAL_PAGES[numbered_name] = (legacy_name, number_param != "team_id")
+CANONICAL_PAGES["tournament_player"] = ("player", False)
+CANONICAL_PAGES["tournament_team"] = ("team", False)
+
+
+@lru_cache(maxsize=4096)
+def classify(url):
+    """(page, tournament id, week number) of a tracked URL."""
+    try:
+        match = resolve(url)
+    except Resolver404:
+        return "other", None, None
+    page, numbered_by_week = CANONICAL_PAGES.get(
+        match.url_name, (match.url_name or "other", False)
+    )
+    week = match.kwargs.get("number") if numbered_by_week else None
+    return page[:40], match.kwargs.get("tournament"), week
+
+
+def period_start(moment, period):
+    """Start of the local hour or day ``moment`` falls in."""
+    local = timezone.localtime(moment)
+    if period == TrafficRollup.HOUR:
+        return local.replace(minute=0, second=0, microsecond=0)
+    return timezone.make_aware(datetime.combine(local.date(), time.min))
+
+
+def rollup_rows(period, start, end):
+    """The TrafficRollup rows of the page views in [start, end)."""
+    buckets = {}
+    views = Pageview.objects.filter(view_time__gte=start, view_time__lt=end)
+    for url, visitor_id in (
+        views.order_by()
+        .values_list("url", "visitor_id")
+        .iterator(chunk_size=settings.TRAFFIC_ROLLUP_CHUNK)
+    ):
+        page, tournament_id, week = classify(url)
+        for key in ((page, tournament_id, week), (TrafficRollup.ALL_PAGES, None, None)):
+            bucket = buckets.setdefault(key, [0, set()])
+            bucket[0] += 1
+            bucket[1].add(visitor_id)
+
+    return [
+        TrafficRollup(
+            period=period,
+            period_start=start,
+            page=page,
+            tournament=get_tournament(tournament_id) if tournament_id else None,
+            week_number=week,
+            views=count,
+            visitors=len(visitors),
+        )
+        for (page, tournament_id, week), (count, visitors) in buckets.items()
+    ]
+
+
+def rollup_period(period, now=None):
+    """
+    Rolls up every completed ``period`` not rolled up yet; returns how many
+    periods had page views. Hits still in the workers' buffers are waited for.
+    """
+    length = PERIOD_LENGTHS[period]
+    now = now or timezone.now()
+    settled = now - timedelta(seconds=settings.TRACK_FLUSH_SECONDS + 60)
+    until = period_start(settled, period)
+
+    last = TrafficRollup.objects.filter(period=period).aggregate(
+        last=Max("period_start")
+    )["last"]
+    if last is not None:
+        start = last + length
+    else:
+        first_view = Pageview.objects.aggregate(first=Min("view_time"))["first"]
+        if first_view is None:
+            return 0
+        start = period_start(first_view, period)
+
+    done = 0
+    while start < until:
+        end = start + length
+        rows = rollup_rows(period, start, end)
+        if rows:
+            with transaction.atomic():
+                TrafficRollup.objects.bulk_create(rows)
+            done += 1
+            start = end
+        else:
+            # Skip straight to the next period with page views.
+            next_view = Pageview.objects.filter(view_time__gte=end).aggregate(
+                next=Min("view_time")
+            )["next"]
+            if next_view is None:
+                break
+            start = max(end, period_start(next_view, period))
+    return done
+
+
+def delete_in_chunks(queryset):
+    """Deletes the rows of ``queryset`` a chunk at a time; returns the count."""
+    deleted = 0
+    while True:
+        ids = list(
+            queryset.order_by().values_list("pk", flat=True)[
+                : settings.TRAFFIC_ROLLUP_CHUNK
+            ]
+        )
+        if not ids:
+            return deleted
+        queryset.model.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+
+
+def prune_raw_rows(now=None):
+    """
+    Deletes raw page views older than TRACK_RAW_RETENTION_DAYS that are rolled
+    up, visitors left without page views, and hourly rollups older than
+    TRAFFIC_HOURLY_RETENTION_DAYS. Returns (page views, visitors, hourly rows).
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=settings.TRACK_RAW_RETENTION_DAYS)
+    last_day = TrafficRollup.objects.filter(period=TrafficRollup.DAY).aggregate(
+        last=Max("period_start")
+    )["last"]
+    # Never delete raw rows that are not in a daily rollup yet.
+    rolled_until = last_day + timedelta(days=1) if last_day else None
+    cutoff = min(cutoff, rolled_until) if rolled_until else None
+
+    pageviews = visitors = 0
+    if cutoff is not None:
+        pageviews = delete_in_chunks(Pageview.objects.filter(view_time__lt=cutoff))
+        visitors = delete_in_chunks(
+            Visitor.objects.filter(start_time__lt=cutoff, pageviews__isnull=True)
+        )
+    hourly = delete_in_chunks(
+        TrafficRollup.objects.filter(
+            period=TrafficRollup.HOUR,
+            period_start__lt=now
+            - timedelta(days=settings.TRAFFIC_HOURLY_RETENTION_DAYS),
+        )
+    )
+    return pageviews, visitors, hourly
@@ -1,18 +1,144 @@
-from django.urls import path
-from . import views
+from django.conf import settings
+from django.urls import include, path
+from . import api, views
+from .canonical import legacy_page, legacy_player_profile, tournament_page
+
+# Under ASGI the read-only public pages are served by their async versions.
+if settings.ASYNC_VIEWS:
+    from . import async_views as public_views
+else:
+    public_views = views
+
+# Canonical tournament pages: /t/<tournament>/<page>/[week/<n>/]
+tournament_urlpatterns = [
+    path("", tournament_page(public_views.sponsors_view), name="tournament_home"),
+    path(
+        "sponsors/",
+        tournament_page(public_views.sponsors_view),
+        name="tournament_sponsors",
+    ),
+    path(
+        "fixtures/",
+        tournament_page(public_views.fixture_view),
+        name="tournament_fixtures",
+    ),
+    path(
+        "fixtures/week/<int:number>/",
+        tournament_page(public_views.fixture_view, "week_number"),
+        name="tournament_fixtures_week",
+    ),
+    path(
+        "results/",
+        tournament_page(public_views.result_view),
+        name="tournament_results",
+    ),
+    path(
+        "results/week/<int:number>/",
+        tournament_page(public_views.result_view, "week_number"),
+        name="tournament_results_week",
+    ),
+    path("table/", tournament_page(public_views.table_view), name="tournament_table"),
+    path(
+        "table/week/<int:number>/",
+        tournament_page(public_views.table_view, "match_week"),
+        name="tournament_table_week",
+    ),
+    path("stats/", tournament_page(public_views.stats_view), name="tournament_stats"),
+    path(
+        "records/",
+        tournament_page(views.records_view, spans_tournaments=True),
+        name="tournament_records",
+    ),
+    path(
+        "team-of-the-week/",
+        tournament_page(views.team_of_the_week),
+        name="tournament_team_of_the_week",
+    ),
+    path(
+        "team-of-the-week/week/<int:number>/",
+        tournament_page(views.team_of_the_week, "week_number"),
+        name="tournament_team_of_the_week_week",
+    ),
+    path("players/", tournament_page(views.players_view), name="tournament_players"),
+    path(
+        "players/team/<int:number>/",
+        tournament_page(views.players_view, "team_id"),
+        name="tournament_players_team",
+    ),
+    path(
+        "player/<int:player_id>/",
+        tournament_page(views.player_profile_view),
+        name="tournament_player",
+    ),
+    path(
+        "team/<int:team_id>/",
+        tournament_page(views.team_view, spans_tournaments=True),
+        name="tournament_team",
+    ),
+]
 
 urlpatterns = [
-    path("", views.sponsors_view, name="home"),
-    path("fixtures/", views.fixture_view, name="fixtures"),
-    path("results/", views.result_view, name="results"),
-    path("table/", views.table_view, name="table"),
-    path("stats/", views.stats_view, name="stats"),
-    path("players/", views.players_view, name="players"),
-    path("player/<int:player_id>/", views.player_profile_view, name="player_profile"),
-    path("players/", views.players_view, name="players"),
+    path("t/<int:tournament>/", include(tournament_urlpatterns)),
+    # Legacy query-string URLs redirect to the canonical ones.
+    path("", legacy_page(public_views.sponsors_view, "home"), name="home"),
+    path(
+        "fixtures/", legacy_page(public_views.fixture_view, "fixtures"), name="fixtures"
+    ),
+    path("results/", legacy_page(public_views.result_view, "results"), name="results"),
+    path("table/", legacy_page(public_views.table_view, "table"), name="table"),
+    path("stats/", legacy_page(public_views.stats_view, "stats"), name="stats"),
+    path("records/", legacy_page(views.records_view, "records"), name="records"),
+    path("players/", legacy_page(views.players_view, "players"), name="players"),
+    path("player/<int:player_id>/", legacy_player_profile, name="player_profile"),
     path("healthz", views.health_check),
+    path("metrics", views.metrics_view, name="metrics"),
     # New URL for image upload
     path("posts/", views.posts_view, name="posts"),
-    path("team-of-the-week/", views.team_of_the_week, name="team_of_the_week"),
-    path("sponsors/", views.sponsors_view, name="sponsors"),
+    path(
+        "team-of-the-week/",
+        legacy_page(views.team_of_the_week, "team_of_the_week"),
+        name="team_of_the_week",
+    ),
+    path(
+        "sponsors/",
+        legacy_page(public_views.sponsors_view, "sponsors"),
+        name="sponsors",
+    ),
+    # Read-only JSON API
+    path("api/v1/tournaments/", api.tournaments, name="api_tournaments"),
+    path("api/v1/tournaments/<int:tournament_id>/weeks/", api.weeks, name="api_weeks"),
+    path(
+        "api/v1/tournaments/<int:tournament_id>/fixtures/",
+        api.fixtures,
+        name="api_fixtures",
+    ),
+    path(
+        "api/v1/tournaments/<int:tournament_id>/results/",
+        api.results,
+        name="api_results",
+    ),
+    path(
+        "api/v1/tournaments/<int:tournament_id>/standings/",
+        api.standings,
+        name="api_standings",
+    ),
+    path(
+        "api/v1/tournaments/<int:tournament_id>/leaderboards/",
+        api.leaderboards,
+        name="api_leaderboards",
+    ),
+    path(
+        "api/v1/tournaments/<int:tournament_id>/players/",
+        api.tournament_players,
+        name="api_players",
+    ),
+    path("api/v1/players/<int:player_id>/", api.player_profile, name="api_player"),
+    path("api/v1/records/", api.records, name="api_records"),
+    path("api/v1/search/", api.search, name="api_search"),
+    path("api/v1/ratings/", api.ratings, name="api_ratings"),
+    path(
+        "api/v1/teams/<int:team_id>/ratings/",
+        api.team_ratings,
+        name="api_team_ratings",
+    ),
 ]
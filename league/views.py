@@ -1,17 +1,34 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse
-from django.db.models import Count, Sum, Q
-from .models import Team_Standing, Match, Tournament
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.cache import never_cache
+from django.db.models import Count, Sum, Q, Prefetch
+from django.db.models import CharField, F, Value
+from .models import Team_Standing, Match
 from .models import VENUE, Card, Goal, Team, Player, TeamOfTheWeek, Sponsor
+from .models import Person, SeasonRollup
 import pandas as pd  # For the league table
 import requests
 from django.contrib.postgres.aggregates import ArrayAgg
 from .forms import PlayerImageForm
+from .cache import league_cache_key, league_stale_key, single_flight
+from .tournaments import request_tournament
+from .images import image_url
+from .projections import project_season, projections_cache_key
+from .standings import rank_standings
+from .results import team_page_data
+from .ratings import chart_points, rating_history
+from .people import birthday_players
+from . import metrics
 from django.db import connection
 from django.db.models import Min
 from django.utils import timezone
 from django.db.models import Max
-from django.db.models.functions import ExtractMonth, ExtractDay
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def get_week_labels(tournament_id):
@@ -33,29 +50,22 @@ def get_week_labels(tournament_id):
         week_labels[week_number] = (
             f"{week_number} - {match_date.strftime('%A, %d %B %Y')}"
         )
-    print(week_labels)
+    logger.debug("Week labels: %s", week_labels)
     return week_labels
 
 
 def get_tournament_details(request):
-    # Get the selected tournament from the request, default to the first one if none is specified.
-    tournament_id = request.GET.get("tournament")
-    tournaments = Tournament.objects.all().order_by("id")
-    selected_tournament = None
+    """The selected tournament and all tournaments, as resolved by TournamentMiddleware."""
+    return request_tournament(request)
 
-    if tournament_id:
-        try:
-            selected_tournament = tournaments.get(id=tournament_id)
-        except Tournament.DoesNotExist:
-            # Handle case where the tournament_id is invalid, default to the first tournament.
-            if tournaments.exists():
-                selected_tournament = tournaments.first()
-    else:
-        # If no tournament_id is in the URL, select the first one by default.
-        if tournaments.exists():
-            selected_tournament = tournaments.first()
 
-    return selected_tournament, tournaments
+def get_birthday_players():
+    """Returns "Name (Team)" labels for the players whose birthday is today."""
+    # One row per person, with their current team; see league/people.py
+    return [
+        f"{name} ({team_name})"
+        for name, team_name in birthday_players(timezone.localdate())
+    ]
 
 
 def get_base_context(active_tab, request):
@@ -67,34 +77,92 @@ def get_base_context(active_tab, request):
     context["venue"] = VENUE
     context["active_tab"] = active_tab
     context["week_labels"] = get_week_labels(context["selected_tournament"])
+    context["birthday_players"] = get_birthday_players()
+
+    return context
+
 
+# -------------------------------
+# Query helpers shared by the sync views and their async versions (async_views.py)
+# -------------------------------
+
+
+def get_default_fixture_week(tournament):
+    """The week of the next unplayed match, else the latest played week, else 1."""
     today = timezone.now().date()
+    upcoming_match = (
+        Match.objects.filter(
+            tournament=tournament,
+            match_date__gte=today,
+            is_played=False,
+        )
+        .order_by("week_number", "match_date")
+        .first()
+    )
+    if upcoming_match:
+        return upcoming_match.week_number
+
+    # If no upcoming matches, default to the latest played week.
+    last_played_match = (
+        Match.objects.filter(tournament=tournament, is_played=True)
+        .order_by("-week_number")
+        .first()
+    )
+    if last_played_match:
+        return last_played_match.week_number
+    return 1  # Fallback to week 1 if no matches exist at all.
 
-    # 1. Find the maximum 'id' (latest team entry) for each player with a birthday today.
-    # We group by 'name' (the player) to find their latest record ID.
-    latest_record_ids = (
-        Player.objects.filter(
-            dob__month=ExtractMonth(today), dob__day=ExtractDay(today)
+
+def get_default_result_week(tournament):
+    """The latest week with a played or walkover match, else 1."""
+    last_played_match = (
+        Match.objects.filter(
+            Q(tournament=tournament) & (Q(is_played=True) | Q(is_walkover=True))
         )
-        .values("name")
-        .annotate(latest_id=Max("id"))
-        .values_list("latest_id", flat=True)
+        .order_by("-week_number")
+        .first()
     )
+    return last_played_match.week_number if last_played_match else 1
+
 
-    # 2. Filter the Player records to include only those with the latest IDs found above.
-    # This ensures we only get the *current* team for each player.
-    birthday_players_data = Player.objects.filter(id__in=latest_record_ids).values_list(
-        "name", "team__name"
+def get_max_week_number(tournament):
+    max_week_number_match = (
+        Match.objects.filter(tournament=tournament).order_by("-week_number").first()
     )
+    return max_week_number_match.week_number if max_week_number_match else 0
 
-    # 3. Format the data for the banner, combining name and team name.
-    # Since 'latest_record_ids' already ensures uniqueness per player,
-    # the resulting list will have unique player names with their latest team.
-    context["birthday_players"] = [
-        f"{name} ({team_name})" for name, team_name in birthday_players_data
-    ]
 
-    return context
+def fixtures_queryset(tournament, week_number):
+    return (
+        Match.objects.filter(tournament=tournament, week_number=week_number)
+        .select_related("home_team", "away_team")
+        .order_by("match_date", "kickoff")
+    )
+
+
+def results_queryset(tournament, week_number):
+    """Results of a week with everything result.html shows loaded up front."""
+    return (
+        Match.objects.filter(
+            Q(tournament=tournament)
+            & Q(week_number=week_number)
+            & (Q(is_played=True) | Q(is_walkover=True))
+        )
+        .select_related("home_team", "away_team", "walkover_winner", "mom")
+        .prefetch_related(
+            Prefetch("goals", queryset=Goal.objects.select_related("player__team")),
+            Prefetch("cards", queryset=Card.objects.select_related("player__team")),
+        )
+        .order_by("match_date", "kickoff")
+    )
+
+
+def format_week_date(matches):
+    """Formats the date of the first match of a week, or "N/A"."""
+    first_match_of_week = matches[0] if matches else None
+    if first_match_of_week is None:
+        return "N/A"
+    return first_match_of_week.match_date.strftime("%A, %d %B %Y")
 
 
 def fixture_view(request):
@@ -102,63 +170,22 @@ def fixture_view(request):
     context = get_base_context(active_tab, request)
 
     if context["selected_tournament"]:
-        # Determine the default week number if not specified in the URL.
-        today = timezone.now().date()
-        upcoming_matches = Match.objects.filter(
-            tournament=context["selected_tournament"],
-            match_date__gte=today,
-            is_played=False,
-        ).order_by("week_number", "match_date")
-
-        next_match_week_number = None
-        if upcoming_matches.exists():
-            next_match_week_number = upcoming_matches.first().week_number
-        else:
-            # If no upcoming matches, default to the latest played week.
-            last_played_match = (
-                Match.objects.filter(
-                    tournament=context["selected_tournament"],
-                    is_played=True,
-                )
-                .order_by("-week_number")
-                .first()
+        # Get the selected week from the URL, defaulting to the next match week.
+        selected_week_number = request.GET.get("week_number")
+        if selected_week_number is None:
+            selected_week_number = get_default_fixture_week(
+                context["selected_tournament"]
             )
-            if last_played_match:
-                next_match_week_number = last_played_match.week_number
-            else:
-                next_match_week_number = (
-                    1  # Fallback to week 1 if no matches exist at all.
-                )
+        selected_week_number = int(selected_week_number)
 
-        # Get the selected week from the URL, defaulting to the determined week number.
-        selected_week_number = int(
-            request.GET.get("week_number", next_match_week_number)
+        fixtures_for_week = fixtures_queryset(
+            context["selected_tournament"], selected_week_number
         )
 
-        fixtures_for_week = Match.objects.filter(
-            tournament=context["selected_tournament"], week_number=selected_week_number
-        ).order_by("match_date", "match_time")
-
-        if fixtures_for_week.exists():
-            first_match_of_week = fixtures_for_week.first()
-            week_date = first_match_of_week.match_date
-            context["week_date_str"] = week_date.strftime("%A, %d %B %Y")
-        else:
-            context["week_date_str"] = "N/A"
-
+        context["week_date_str"] = format_week_date(fixtures_for_week)
         context["selected_week_number"] = selected_week_number
         context["fixtures_for_week"] = fixtures_for_week
-
-        # Filter the max_week_number query by the selected tournament
-        max_week_number_match = (
-            Match.objects.filter(tournament=context["selected_tournament"])
-            .order_by("-week_number")
-            .first()
-        )
-
-        context["max_week_number"] = (
-            max_week_number_match.week_number if max_week_number_match else 0
-        )
+        context["max_week_number"] = get_max_week_number(context["selected_tournament"])
     else:
         # No tournament selected, so no data to display
         context["fixtures_for_week"] = []
@@ -173,57 +200,25 @@ def result_view(request):
     active_tab = "Result"
     context = get_base_context(active_tab, request)
 
-    results_for_week = None
     if context["selected_tournament"]:
-        # Find the latest week number with played matches
-        last_played_match = (
-            Match.objects.filter(
-                Q(tournament=context["selected_tournament"])
-                & (Q(is_played=True) | Q(is_walkover=True))
+        # Get the selected week from the URL, defaulting to the latest played week
+        selected_week_number = request.GET.get("week_number")
+        if selected_week_number is None:
+            selected_week_number = get_default_result_week(
+                context["selected_tournament"]
             )
-            .order_by("-week_number")
-            .first()
-        )
-
-        # Set the default week number to the latest played week or 1 if no matches exist
-        default_week_number = last_played_match.week_number if last_played_match else 1
+        selected_week_number = int(selected_week_number)
 
-        # Get the selected week from the URL, defaulting to the determined week number
-        selected_week_number = int(request.GET.get("week_number", default_week_number))
-
-        # Retrieve match results for the selected week,
-        # and use select_related() to pre-fetch the related M.O.M. player
-        results_for_week = (
-            Match.objects.filter(
-                Q(tournament=context["selected_tournament"])
-                & Q(week_number=selected_week_number)
-                & (Q(is_played=True) | Q(is_walkover=True))
-            )
-            .select_related("mom")
-            .prefetch_related("goals", "cards")
-            .order_by("match_date", "match_time")
+        # Retrieve match results for the selected week, with teams, M.O.M.,
+        # goals and cards loaded up front
+        results_for_week = results_queryset(
+            context["selected_tournament"], selected_week_number
         )
 
-        if results_for_week and results_for_week.exists():
-            first_match_of_week = results_for_week.first()
-            week_date = first_match_of_week.match_date
-            context["week_date_str"] = week_date.strftime("%A, %d %B %Y")
-        else:
-            context["week_date_str"] = "N/A"
-
+        context["week_date_str"] = format_week_date(results_for_week)
         context["selected_week_number"] = selected_week_number
-        context["results_for_week"] = results_for_week if results_for_week else []
-
-        # Get the maximum overall week number for the tournament
-        max_week_number_match = (
-            Match.objects.filter(tournament=context["selected_tournament"])
-            .order_by("-week_number")
-            .first()
-        )
-
-        context["max_week_number"] = (
-            max_week_number_match.week_number if max_week_number_match else 0
-        )
+        context["results_for_week"] = results_for_week
+        context["max_week_number"] = get_max_week_number(context["selected_tournament"])
     else:
         # No tournament selected
         context["results_for_week"] = []
@@ -234,139 +229,175 @@ def result_view(request):
     return render(request, "league/result.html", context)
 
 
-def table_view(request):
-    active_tab = "Table"
-    context = get_base_context(active_tab, request)
+STANDING_FIELDS = [
+    "name",
+    "matches_played",
+    "wins",
+    "draws",
+    "losses",
+    "goals_for",
+    "goals_against",
+    "goal_difference",
+    "points",
+]
 
-    selected_tournament = context["selected_tournament"]
-    if not selected_tournament:
-        context["points_table_html"] = "<p>Please select a tournament.</p>"
-        context["match_weeks"] = []
-        context["selected_week"] = 1
-        return render(request, "league/table.html", context)
 
-    # Get all unique match weeks
-    match_weeks = (
-        Team_Standing.objects.filter(tournament=selected_tournament)
+def get_standing_weeks(tournament):
+    """All matchweeks with standings for the tournament, in order."""
+    return (
+        Team_Standing.objects.filter(tournament=tournament)
         .values_list("matches_played", flat=True)
         .distinct()
         .order_by("matches_played")
     )
 
-    # Selected week
-    selected_week = request.GET.get("match_week")
-    if selected_week and str(selected_week).isdigit():
-        selected_week = int(selected_week)
-    else:
-        selected_week = match_weeks.last() if match_weeks else 1
 
-    # Current standings (ordered)
-    standings_data = Team_Standing.objects.filter(
-        tournament=selected_tournament, matches_played=selected_week
+def standings_queryset(tournament, week):
+    return Team_Standing.objects.filter(
+        tournament=tournament, matches_played=week
     ).order_by("-points", "-goal_difference", "-goals_for")
 
-    df = pd.DataFrame(
-        list(
-            standings_data.values(
-                "name",
-                "matches_played",
-                "wins",
-                "draws",
-                "losses",
-                "goals_for",
-                "goals_against",
-                "goal_difference",
-                "points",
-            )
-        )
+
+def ranked_standings(tournament, week):
+    """Standings rows of the matchweek in table order, ties broken by the tiebreakers."""
+    return rank_standings(
+        tournament,
+        week,
+        standings_queryset(tournament, week).values(*STANDING_FIELDS),
     )
 
-    if not df.empty:
-        # numeric positions for calculation
-        df["Position"] = range(1, len(df) + 1)
-
-        # Compare with previous week (if not the first recorded week)
-        if match_weeks and selected_week > min(match_weeks):
-            prev_week_qs = Team_Standing.objects.filter(
-                tournament=selected_tournament, matches_played=selected_week - 1
-            ).order_by("-points", "-goal_difference", "-goals_for")
-
-            prev_df = pd.DataFrame(list(prev_week_qs.values("name")))
-            if not prev_df.empty:
-                prev_df["Prev_Position"] = range(1, len(prev_df) + 1)
-                # merge prev position into current df
-                df = df.merge(prev_df[["name", "Prev_Position"]], on="name", how="left")
-                df["Change"] = df["Prev_Position"] - df["Position"]
-
-                def decorated_position(row):
-                    pos = int(row["Position"])
-                    change = row.get("Change")
-                    # base wrapper with two spans: number and arrow area
-                    base = (
-                        f'<span class="pos-cell"><span class="pos-number">{pos}</span>'
+
+def render_points_table(standings, previous_standings=None):
+    """
+    Renders the league table HTML from standings rows (dicts with STANDING_FIELDS),
+    with position-change arrows against the previous week's rows when given.
+    """
+    df = pd.DataFrame(list(standings))
+    if df.empty:
+        return "<p>No standings available</p>"
+
+    # numeric positions for calculation
+    df["Position"] = range(1, len(df) + 1)
+
+    # Compare with previous week (if not the first recorded week)
+    if previous_standings is not None:
+        prev_df = pd.DataFrame(list(previous_standings))
+        if not prev_df.empty:
+            prev_df["Prev_Position"] = range(1, len(prev_df) + 1)
+            # merge prev position into current df
+            df = df.merge(prev_df[["name", "Prev_Position"]], on="name", how="left")
+            df["Change"] = df["Prev_Position"] - df["Position"]
+
+            def decorated_position(row):
+                pos = int(row["Position"])
+                change = row.get("Change")
+                # base wrapper with two spans: number and arrow area
+                base = f'<span class="pos-cell"><span class="pos-number">{pos}</span>'
+                if pd.isna(change) or change == 0:
+                    arrow_html = '<span class="pos-arrow"></span>'
+                elif change > 0:
+                    arrow_html = (
+                        f'<span class="pos-arrow up">&#9650;{int(change)}</span>'
                     )
-                    if pd.isna(change) or change == 0:
-                        arrow_html = '<span class="pos-arrow"></span>'
-                    elif change > 0:
-                        arrow_html = (
-                            f'<span class="pos-arrow up">&#9650;{int(change)}</span>'
-                        )
-                    else:
-                        arrow_html = f'<span class="pos-arrow down">&#9660;{abs(int(change))}</span>'
-                    return base + arrow_html + "</span>"
-
-                df["Position"] = df.apply(decorated_position, axis=1)
-            else:
-                # previous week empty — still render wrapped position to keep spacing
-                df["Position"] = df["Position"].apply(
-                    lambda x: f'<span class="pos-cell"><span class="pos-number">{int(x)}</span><span class="pos-arrow"></span></span>'
-                )
+                else:
+                    arrow_html = f'<span class="pos-arrow down">&#9660;{abs(int(change))}</span>'
+                return base + arrow_html + "</span>"
+
+            df["Position"] = df.apply(decorated_position, axis=1)
         else:
-            # first week (or only one week) — wrap with empty arrow span for alignment
+            # previous week empty — still render wrapped position to keep spacing
             df["Position"] = df["Position"].apply(
                 lambda x: f'<span class="pos-cell"><span class="pos-number">{int(x)}</span><span class="pos-arrow"></span></span>'
             )
-
-        # Reorder columns (no separate Indicator column)
-        df = df[
-            [
-                "Position",
-                "name",
-                "matches_played",
-                "wins",
-                "draws",
-                "losses",
-                "goals_for",
-                "goals_against",
-                "goal_difference",
-                "points",
-            ]
-        ]
-
-        df = df.rename(
-            columns={
-                "name": "Team",
-                "matches_played": "MP",
-                "wins": "W",
-                "draws": "D",
-                "losses": "L",
-                "goals_for": "GF",
-                "goals_against": "GA",
-                "goal_difference": "GD",
-                "points": "Pts",
-            }
+    else:
+        # first week (or only one week) — wrap with empty arrow span for alignment
+        df["Position"] = df["Position"].apply(
+            lambda x: f'<span class="pos-cell"><span class="pos-number">{int(x)}</span><span class="pos-arrow"></span></span>'
         )
 
-        # keep escape=False so our HTML spans remain
-        points_table_html = df.to_html(
-            index=False, escape=False, classes="league-table"
-        )
-    else:
-        points_table_html = "<p>No standings available</p>"
+    # Reorder columns (no separate Indicator column)
+    df = df[["Position"] + STANDING_FIELDS]
+
+    df = df.rename(
+        columns={
+            "name": "Team",
+            "matches_played": "MP",
+            "wins": "W",
+            "draws": "D",
+            "losses": "L",
+            "goals_for": "GF",
+            "goals_against": "GA",
+            "goal_difference": "GD",
+            "points": "Pts",
+        }
+    )
+
+    # keep escape=False so our HTML spans remain
+    return df.to_html(index=False, escape=False, classes="league-table")
+
+
+def selected_match_week(match_weeks, requested_week):
+    """The requested matchweek if it is a number, else the latest one (or 1)."""
+    if requested_week and str(requested_week).isdigit():
+        return int(requested_week)
+    return match_weeks[-1] if match_weeks else 1
+
+
+def table_data(tournament, requested_week=None):
+    """Matchweeks, selected week and rendered league table of a tournament."""
+    # Get all unique match weeks
+    match_weeks = list(get_standing_weeks(tournament))
+    selected_week = selected_match_week(match_weeks, requested_week)
+
+    # Current standings (ordered), compared with the previous week if there is one
+    standings = ranked_standings(tournament, selected_week)
+    previous_standings = None
+    if match_weeks and selected_week > min(match_weeks):
+        previous_standings = ranked_standings(tournament, selected_week - 1)
+
+    return {
+        "points_table_html": render_points_table(standings, previous_standings),
+        "match_weeks": match_weeks,
+        "selected_week": selected_week,
+    }
+
+
+def table_week(requested_week):
+    return requested_week if requested_week and requested_week.isdigit() else "latest"
+
+
+def table_cache_key(tournament, requested_week):
+    return league_cache_key(tournament, "table", table_week(requested_week))
+
+
+def table_view(request):
+    active_tab = "Table"
+    context = get_base_context(active_tab, request)
 
-    context["points_table_html"] = points_table_html
-    context["match_weeks"] = match_weeks
-    context["selected_week"] = selected_week
+    selected_tournament = context["selected_tournament"]
+    if not selected_tournament:
+        context["points_table_html"] = "<p>Please select a tournament.</p>"
+        context["match_weeks"] = []
+        context["selected_week"] = 1
+        return render(request, "league/table.html", context)
+
+    # One process renders the table per tournament and week; see league/cache.py
+    requested_week = request.GET.get("match_week")
+    context.update(
+        single_flight(
+            table_cache_key(selected_tournament, requested_week),
+            lambda: table_data(selected_tournament, requested_week),
+            stale_key=league_stale_key(
+                selected_tournament, "table", table_week(requested_week)
+            ),
+        )
+    )
+    context["projections"] = single_flight(
+        projections_cache_key(selected_tournament),
+        lambda: project_season(selected_tournament),
+        settings.PROJECTION_CACHE_SECONDS,
+        stale_key=league_stale_key(selected_tournament, "projections"),
+    )
 
     return render(request, "league/table.html", context)
 
@@ -428,41 +459,44 @@ def submit_post(request):
     return redirect("post")
 
 
-def stats_view(request):
-    active_tab = "Stats"
-    context = get_base_context(active_tab, request)
-    selected_tournament = context["selected_tournament"]
+TOTW_POSITIONS = [
+    "goal_keeper",
+    "left_defence",
+    "right_defence",
+    "left_mid",
+    "right_mid",
+    "striker",
+]
 
-    if selected_tournament:
+
+def stats_querysets(tournament):
+    """The independent leaderboard queries of the stats page, by context name."""
+    return {
         # Top Goal Scorers
-        top_scorers = (
-            Goal.objects.filter(match__tournament=selected_tournament)
+        "top_scorers": (
+            Goal.objects.filter(match__tournament=tournament)
             .values("player__name", "player__team__name")
             .annotate(total_goals=Sum("goals"))
             .order_by("-total_goals")
-        )
+        ),
         # Yellow Cards
-        yellow_cards = (
-            Card.objects.filter(
-                card_type="YELLOW", match__tournament=selected_tournament
-            )
+        "yellow_cards": (
+            Card.objects.filter(card_type="YELLOW", match__tournament=tournament)
             .values("player__name", "player__team__name")
             .annotate(total_yellows=Count("id"))
             .order_by("-total_yellows")
-        )
-
+        ),
         # Red Cards
-        red_cards = (
-            Card.objects.filter(card_type="RED", match__tournament=selected_tournament)
+        "red_cards": (
+            Card.objects.filter(card_type="RED", match__tournament=tournament)
             .values("player__name", "player__team__name")
             .annotate(total_reds=Count("id"))
             .order_by("-total_reds")
-        )
-
+        ),
         # Man of the Match summary
-        motm_summary = (
+        "motm_list": (
             Match.objects.filter(
-                Q(tournament=selected_tournament)
+                Q(tournament=tournament)
                 & (Q(is_played=True) | Q(is_walkover=True))
                 & Q(mom__isnull=False)  # only include matches that have MOM
             )
@@ -472,89 +506,131 @@ def stats_view(request):
                 week_numbers=ArrayAgg("week_number", distinct=True),
             )
             .order_by("-total_mom_count", "mom__name")
-        )
-        # Convert to list for template usage
-        motm_list = list(motm_summary)
-
-        # ------------------------------------
-        # Team of the Week (TOTW) Logic - CORRECTED
-        # ------------------------------------
-
-        # Define the fields that link to the Player model
-        player_fields = [
-            "goal_keeper",
-            "left_defence",
-            "right_defence",
-            "left_mid",
-            "right_mid",
-            "striker",
-        ]
-
-        # Dictionary to hold the final aggregated data: {player_id: {data}}
-        totw_aggregates = {}
-
-        # 1. Gather all individual TOTW appearances across all positions
-        for field in player_fields:
-            # Query all entries where this position was filled for the selected tournament
-            position_entries = TeamOfTheWeek.objects.filter(
-                tournament=selected_tournament, **{f"{field}__isnull": False}
-            ).values_list(
-                f"{field}__id", "week_number", f"{field}__name", f"{field}__team__name"
-            )
+        ),
+    }
 
-            # Manually aggregate the data in Python
-            for player_id, week_number, player_name, player_team in position_entries:
-                if player_id not in totw_aggregates:
-                    # Initialize entry for a new player
-                    totw_aggregates[player_id] = {
-                        "player__id": player_id,
-                        "player__name": player_name,
-                        "player__team__name": player_team,
-                        "total_totw_count": 0,
-                        "week_numbers": set(),  # Use set to store unique weeks efficiently
-                    }
 
-                # Update the aggregate count and weeks
-                totw_aggregates[player_id]["total_totw_count"] += 1
-                totw_aggregates[player_id]["week_numbers"].add(week_number)
-
-        # 2. Finalize and sort the list
-        team_of_the_week_unsorted = []
-        for player_data in totw_aggregates.values():
-            # Convert the set of week numbers to a sorted list for the template
-            player_data["week_numbers"] = sorted(list(player_data["week_numbers"]))
-            team_of_the_week_unsorted.append(player_data)
-
-        # 3. Sort by count (descending) then name (ascending)
-        team_of_the_week = sorted(
-            team_of_the_week_unsorted,
-            key=lambda x: (x["total_totw_count"], x["player__name"]),
-            reverse=True,
-        )
+def totw_position_queryset(tournament, field):
+    """TOTW appearances in one position: (player id, week, name, team name) rows."""
+    return TeamOfTheWeek.objects.filter(
+        tournament=tournament, **{f"{field}__isnull": False}
+    ).values_list(
+        f"{field}__id", "week_number", f"{field}__name", f"{field}__team__name"
+    )
+
+
+def build_totw_leaderboard(position_entries):
+    """
+    Aggregates TOTW appearances (one iterable of rows per position) into a list
+    of players sorted by appearance count.
+    """
+    # Dictionary to hold the final aggregated data: {player_id: {data}}
+    totw_aggregates = {}
+
+    # 1. Gather all individual TOTW appearances across all positions
+    for entries in position_entries:
+        # Manually aggregate the data in Python
+        for player_id, week_number, player_name, player_team in entries:
+            if player_id not in totw_aggregates:
+                # Initialize entry for a new player
+                totw_aggregates[player_id] = {
+                    "player__id": player_id,
+                    "player__name": player_name,
+                    "player__team__name": player_team,
+                    "total_totw_count": 0,
+                    "week_numbers": set(),  # Use set to store unique weeks efficiently
+                }
+
+            # Update the aggregate count and weeks
+            totw_aggregates[player_id]["total_totw_count"] += 1
+            totw_aggregates[player_id]["week_numbers"].add(week_number)
+
+    # 2. Finalize and sort the list
+    team_of_the_week_unsorted = []
+    for player_data in totw_aggregates.values():
+        # Convert the set of week numbers to a sorted list for the template
+        player_data["week_numbers"] = sorted(list(player_data["week_numbers"]))
+        team_of_the_week_unsorted.append(player_data)
+
+    # 3. Sort by count (descending) then name (ascending)
+    return sorted(
+        team_of_the_week_unsorted,
+        key=lambda x: (x["total_totw_count"], x["player__name"]),
+        reverse=True,
+    )
+
+
+def stats_data(tournament):
+    """The stats page leaderboards of a tournament, evaluated for caching."""
+    data = {name: list(qs) for name, qs in stats_querysets(tournament).items()}
+    data["team_of_the_week"] = build_totw_leaderboard(
+        totw_position_queryset(tournament, field) for field in TOTW_POSITIONS
+    )
+    return data
+
 
+def stats_view(request):
+    active_tab = "Stats"
+    context = get_base_context(active_tab, request)
+    selected_tournament = context["selected_tournament"]
+
+    if selected_tournament:
+        context.update(
+            single_flight(
+                league_cache_key(selected_tournament, "stats"),
+                lambda: stats_data(selected_tournament),
+                stale_key=league_stale_key(selected_tournament, "stats"),
+            )
+        )
     else:
-        top_scorers = []
-        yellow_cards = []
-        red_cards = []
-        motm_list = []
-        team_of_the_week = []  # Initialize TOTW list
-
-    context["top_scorers"] = top_scorers
-    context["yellow_cards"] = yellow_cards
-    context["red_cards"] = red_cards
-    context["motm_list"] = motm_list
-    context["team_of_the_week"] = team_of_the_week  # Add to context
+        context["top_scorers"] = []
+        context["yellow_cards"] = []
+        context["red_cards"] = []
+        context["motm_list"] = []
+        context["team_of_the_week"] = []  # Initialize TOTW list
 
     return render(request, "league/stats.html", context)
 
 
+def tournament_rosters(tournament):
+    """
+    The teams of ``tournament`` by name, each with its players (id, name and
+    image URL) by name, from one query. Cached until league data of the
+    tournament, such as a team or player, changes.
+    """
+
+    def compute():
+        rows = (
+            Team.objects.filter(tournament=tournament)
+            .values("id", "name", "players__id", "players__name", "players__image")
+            .order_by("name", "id", "players__name")
+        )
+        teams = {}
+        for row in rows:
+            team = teams.setdefault(
+                row["id"], {"id": row["id"], "name": row["name"], "players": []}
+            )
+            if row["players__id"] is not None:
+                image = row["players__image"]
+                team["players"].append(
+                    {
+                        "id": row["players__id"],
+                        "name": row["players__name"],
+                        "image_url": image_url(image, "avatar"),
+                    }
+                )
+        return list(teams.values())
+
+    return cache.get_or_set(league_cache_key(tournament, "rosters"), compute, None)
+
+
 def players_view(request):
     active_tab = "Players"
     context = get_base_context(active_tab, request)
     selected_tournament = context["selected_tournament"]
 
     if selected_tournament:
-        all_teams = Team.objects.filter(tournament=selected_tournament).order_by("name")
+        all_teams = tournament_rosters(selected_tournament)
         selected_team_id_str = request.GET.get("team_id")
 
         # Determine the selected team ID
@@ -568,87 +644,127 @@ def players_view(request):
 
         # If no valid ID was provided (or the ID was invalid), default to the first team.
         # This will be None if there are no teams for the selected tournament.
-        if selected_team_id is None and all_teams.exists():
-            selected_team_id = all_teams.first().id
+        if selected_team_id is None and all_teams:
+            selected_team_id = all_teams[0]["id"]
 
         # We explicitly set selected_team_id to 0 if it's still None to avoid TypeError in templates.
-        # The template filter must handle 0 as a valid "no team" state.
         context["selected_team_id"] = selected_team_id if selected_team_id else 0
 
-        # Fetch players for the determined team ID.
-        players_for_team = []
-        if selected_team_id:
-            players_for_team = Player.objects.filter(
-                team_id=selected_team_id, team__tournament=selected_tournament
-            ).order_by("name")
+        # The selected team's roster; None for a team outside this tournament.
+        selected_team = next(
+            (team for team in all_teams if team["id"] == selected_team_id), None
+        )
 
         context["all_teams"] = all_teams
-        context["players_for_team"] = players_for_team
+        context["selected_team"] = selected_team
+        context["players_for_team"] = selected_team["players"] if selected_team else []
     else:
         context["all_teams"] = []
+        context["selected_team"] = None
         context["players_for_team"] = []
         context["selected_team_id"] = 0
 
     return render(request, "league/players.html", context)
 
 
+def timeline_rows(queryset, kind, amount=None, card=None, match=""):
+    """
+    One branch of the profile timeline UNION: a row per event with the same
+    columns whatever the source model. ``match`` is the path to the match.
+    """
+    return queryset.order_by().values(
+        kind=Value(kind, output_field=CharField()),
+        match_pk=F(f"{match}id"),
+        amount=amount or Value(1),
+        card=card or Value("", output_field=CharField()),
+        week=F(f"{match}week_number"),
+        date=F(f"{match}match_date"),
+        home_id=F(f"{match}home_team_id"),
+        home_name=F(f"{match}home_team__name"),
+        away_name=F(f"{match}away_team__name"),
+    )
+
+
+def player_timeline(player, tournament):
+    """
+    Every goal, card and man of the match award of ``player`` in ``tournament``,
+    in match order with the opponent resolved, plus the totals of the profile.
+
+    One query; cached until league data of the tournament changes.
+    """
+
+    def compute():
+        rows = (
+            timeline_rows(
+                Goal.objects.filter(player=player, match__tournament=tournament),
+                "goals",
+                amount=F("goals"),
+                match="match__",
+            )
+            .union(
+                timeline_rows(
+                    Card.objects.filter(player=player, match__tournament=tournament),
+                    "cards",
+                    card=F("card_type"),
+                    match="match__",
+                ),
+                timeline_rows(
+                    Match.objects.filter(mom=player, tournament=tournament), "moms"
+                ),
+                all=True,
+            )
+            .order_by("date", "week")
+        )
+        timeline = {"goals": [], "cards": [], "moms": []}
+        for row in rows:
+            home = row["home_id"] == player.team_id
+            row["opponent"] = row["away_name"] if home else row["home_name"]
+            timeline[row["kind"]].append(row)
+        cards = [row["card"] for row in timeline["cards"]]
+        timeline.update(
+            total_goals=sum(row["amount"] for row in timeline["goals"]),
+            yellow_cards=cards.count("YELLOW"),
+            red_cards=cards.count("RED"),
+        )
+        return timeline
+
+    return cache.get_or_set(
+        league_cache_key(tournament, "player", player.pk, "timeline"),
+        compute,
+        settings.PAGE_CACHE_SECONDS,
+    )
+
+
 def player_profile_view(request, player_id):
     active_tab = "Players"
     context = get_base_context(active_tab, request)
     selected_tournament = context["selected_tournament"]
 
-    player = get_object_or_404(Player, id=player_id)
+    player = get_object_or_404(
+        Player.objects.select_related("team", "person"), id=player_id
+    )
     # Instantiate the form for both cases
     image_form = PlayerImageForm()
 
     if selected_tournament:
         # Check if the player belongs to the selected tournament
-        if player.team.tournament != selected_tournament:
+        if player.team.tournament_id != selected_tournament.id:
             # Handle the case where the player is not in the current tournament.
             # You might want to redirect, show an error, or just return an empty profile.
             # For now, we'll return an an empty profile page.
             # return render(request, "league/players.html", context)
-            return redirect(f"/players/?tournament={selected_tournament.id}")
-
-        # Fetch total goals for the player in this tournament
-        total_goals = (
-            Goal.objects.filter(
-                player=player, match__tournament=selected_tournament
-            ).aggregate(Sum("goals"))["goals__sum"]
-            or 0
-        )
-
-        # Fetch all goals scored by the player in this tournament
-        goals = Goal.objects.filter(
-            player=player, match__tournament=selected_tournament
-        ).order_by("match__match_date")
+            return redirect("tournament_players", selected_tournament.id)
 
-        # Fetch all cards for the player in this tournament
-        cards = Card.objects.filter(
-            player=player, match__tournament=selected_tournament
-        ).order_by("match__match_date")
-
-        # Fetch Man of the Match (MOM) details for the player in this tournament
-        moms = Match.objects.filter(
-            mom=player, tournament=selected_tournament
-        ).order_by("week_number")
-
-        # Add the player-specific data to the context
-        context.update(
-            {
-                "player": player,
-                "total_goals": total_goals,
-                "goals": goals,
-                "cards": cards,
-                "moms": moms,  # Add the MOM queryset
-                "form": image_form,  # Pass the form in the context
-            }
-        )
+        # Goals, cards and MOM awards (with opponents and totals) in one query
+        context.update(player_timeline(player, selected_tournament))
+        context.update({"player": player, "form": image_form})
     else:
         context.update(
             {
                 "player": None,
                 "total_goals": 0,
+                "yellow_cards": 0,
+                "red_cards": 0,
                 "goals": [],
                 "cards": [],
                 "moms": [],
@@ -659,6 +775,86 @@ def player_profile_view(request, player_id):
     return render(request, "league/player_profile.html", context)
 
 
+def team_view(request, team_id):
+    """A team's form, home/away record, biggest wins, head-to-head and Elo rating history."""
+    context = get_base_context("Players", request)
+    tournament = context["selected_tournament"]
+    team = get_object_or_404(Team, id=team_id, tournament=tournament)
+    context["team"] = team
+    # Slices of the cached results matrices; see league/results.py
+    context.update(team_page_data(tournament, team))
+    context["splits"] = [("Home", context["home"]), ("Away", context["away"])]
+    # Ratings span every tournament, so they are read outside the cached data.
+    ratings = rating_history(team.pk)
+    context["ratings"] = ratings[::-1]
+    context["rating_chart"] = chart_points([row["rating"] for row in ratings])
+    return render(request, "league/team.html", context)
+
+
+# (field, title) of the boards of the records page
+RECORD_BOARDS = [
+    ("goals", "Goals"),
+    ("motm_awards", "Man of the Match Awards"),
+    ("totw_appearances", "Team of the Week Appearances"),
+]
+
+
+def all_time_leaders(field, limit):
+    """The people with the most ``field`` over their career (top-N index on Person)."""
+    return list(
+        Person.objects.filter(**{f"{field}__gt": 0})
+        .order_by(f"-{field}", "name")
+        .values(
+            "name",
+            "tournaments",
+            "current_player_id",
+            "current_player__tournament_id",
+            "current_player__team__name",
+            total=F(field),
+        )[:limit]
+    )
+
+
+def best_seasons(field, limit, tournament=None):
+    """The single tournaments with the most ``field`` by one person (top-N index)."""
+    seasons = SeasonRollup.objects.filter(**{f"{field}__gt": 0})
+    if tournament is not None:
+        seasons = seasons.filter(tournament=tournament)
+    return list(
+        seasons.order_by(f"-{field}", "pk").values(
+            "person__name",
+            "tournament_id",
+            "tournament__short_description",
+            total=F(field),
+        )[:limit]
+    )
+
+
+def records_data():
+    """All-time and best-season boards of the records page, from the rollups."""
+
+    def compute():
+        limit = settings.RECORDS_TOP_N
+        return {
+            "all_time": [
+                (title, all_time_leaders(field, limit))
+                for field, title in RECORD_BOARDS
+            ],
+            "best_seasons": [
+                (title, best_seasons(field, limit)) for field, title in RECORD_BOARDS
+            ],
+        }
+
+    return single_flight("records", compute)
+
+
+def records_view(request):
+    """All-time leaderboards and best single seasons over every tournament."""
+    context = get_base_context("Records", request)
+    context.update(records_data())
+    return render(request, "league/records.html", context)
+
+
 def health_check(request):
     try:
         # Attempt to execute a simple database query
@@ -669,12 +865,27 @@ def health_check(request):
         return HttpResponse("Database connection failed", status=500)
 
 
+@never_cache
+def metrics_view(request):
+    """
+    Prometheus metrics of this host's workers, for staff or a scraper sending
+    ``Authorization: Bearer <METRICS_TOKEN>``.
+    """
+    token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    allowed = request.user.is_staff or (
+        settings.METRICS_TOKEN and constant_time_compare(token, settings.METRICS_TOKEN)
+    )
+    if not allowed:
+        return HttpResponseForbidden("Staff only")
+    return HttpResponse(
+        metrics.exposition(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 def team_of_the_week(request):
     active_tab = "TeamOfTheWeek"
     context = get_base_context(active_tab, request)
-
-    tournament_id = request.GET.get("tournament")
-    selected_tournament = Tournament.objects.get(id=tournament_id)
+    selected_tournament = context["selected_tournament"]
 
     # Get the latest week number for the selected tournament
     latest_week = TeamOfTheWeek.objects.filter(
@@ -715,8 +926,6 @@ def team_of_the_week(request):
 
     context.update(
         {
-            "tournaments": Tournament.objects.all(),
-            "selected_tournament": selected_tournament,
             "active_tab": "TeamOfTheWeek",
             "week_labels": week_labels,
             "selected_week_number": week_number,
@@ -850,20 +1059,20 @@ def posts_view(request):
     if selected_tournament and selected_week_number is not None:
         base_query = Match.objects.filter(
             tournament=selected_tournament, week_number=selected_week_number
-        )
+        ).select_related("home_team", "away_team")
 
         if post_type == "results":
             # Only include matches with a result (is_played=True or is_walkover=True)
             matches_for_week = base_query.filter(
                 Q(is_played=True) | Q(is_walkover=True)
-            ).order_by("match_date", "match_time")
+            ).order_by("match_date", "kickoff")
 
             # If no matches have a result, the queryset is empty,
             # and the template will display "N/A" by showing no match blocks.
 
         else:  # post_type == "fixtures"
             # For fixtures, show all matches for the week, played or not
-            matches_for_week = base_query.order_by("match_date", "match_time")
+            matches_for_week = base_query.order_by("match_date", "kickoff")
 
     else:
         matches_for_week = []  # Set to empty list if no tournament/week is selected
@@ -873,5 +1082,5 @@ def posts_view(request):
         matches_for_week  # Use existing context key for template compatibility
     )
     context["total_count"] = range(len(matches_for_week))
-    print(matches_for_week)
+    logger.debug("Posts for week: %d matches", len(matches_for_week))
     return render(request, "league/posts.html", context)
@@ -0,0 +1,208 @@
+"""
+Buffered visitor tracking for the django-tracking2 tables.
+
+django-tracking2's middleware saves a session, reads and saves a Visitor and
+optionally inserts a Pageview on every request, static files included. Here a
+request only appends a hit to an in-process buffer; a background thread writes
+the buffer in bulk every TRACK_FLUSH_SECONDS, or as soon as it holds
+TRACK_FLUSH_SIZE hits, and once more when the process exits. At most one flush
+interval of hits is lost if a worker is killed.
+
+Visitors are keyed by their session when they have one, otherwise by a hash of
+IP address, user agent and day, so no session has to be created to count them.
+TRACK_SAMPLE_RATE keeps that share of visitors (all their hits, so time on site
+stays right); TRACK_IGNORE_URLS and TRACK_IGNORE_USER_AGENTS are honoured as by
+django-tracking2.
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from tracking.models import Pageview, Visitor
+from tracking.settings import (
+    TRACK_AJAX_REQUESTS,
+    TRACK_IGNORE_STATUS_CODES,
+    TRACK_IGNORE_URLS,
+    TRACK_IGNORE_USER_AGENTS,
+    TRACK_PAGEVIEWS,
+    TRACK_QUERY_STRING,
+    TRACK_REFERER,
+)
+from tracking.utils import get_ip_address
+
+logger = logging.getLogger(__name__)
+
+ignore_urls = [re.compile(url) for url in TRACK_IGNORE_URLS]
+ignore_user_agents = [re.compile(ua, re.IGNORECASE) for ua in TRACK_IGNORE_USER_AGENTS]
+
+
+Hit = namedtuple(
+    "Hit",
+    "visitor_key ip_address user_agent user_id url method referer query_string time",
+)
+
+
+def visitor_key(request):
+    session_key = request.session.session_key if hasattr(request, "session") else None
+    if session_key:
+        return session_key
+    fingerprint = "|".join(
+        [
+            get_ip_address(request) or "",
+            request.META.get("HTTP_USER_AGENT", ""),
+            timezone.now().date().isoformat(),
+        ]
+    )
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+
+def is_sampled(key):
+    """The same TRACK_SAMPLE_RATE share of visitors, whichever worker asks."""
+    return int(hashlib.sha1(key.encode()).hexdigest()[:8], 16) < (
+        settings.TRACK_SAMPLE_RATE * 0x100000000
+    )
+
+
+def should_track(request, response):
+    if response.status_code in TRACK_IGNORE_STATUS_CODES:
+        return False
+    if (
+        request.headers.get("x-requested-with") == "XMLHttpRequest"
+        and not TRACK_AJAX_REQUESTS
+    ):
+        return False
+    path = request.path_info.lstrip("/")
+    if any(url.match(path) for url in ignore_urls):
+        return False
+    user_agent = request.META.get("HTTP_USER_AGENT", "")
+    return not any(ua.match(user_agent) for ua in ignore_user_agents)
+
+
+def make_hit(request, key):
+    # Only a user AuthenticationMiddleware has already loaded: looking it up
+    # here would cost a query (and can't be done in an async request).
+    user = getattr(request, "_cached_user", None)
+    return Hit(
+        visitor_key=key,
+        ip_address=get_ip_address(request) or "",
+        user_agent=request.META.get("HTTP_USER_AGENT", ""),
+        user_id=user.pk if user is not None and user.is_authenticated else None,
+        url=request.path,
+        method=request.method,
+        referer=request.META.get("HTTP_REFERER") if TRACK_REFERER else None,
+        query_string=request.META.get("QUERY_STRING") if TRACK_QUERY_STRING else None,
+        time=timezone.now(),
+    )
+
+
+def save_hits(hits):
+    """Writes a batch of hits: Visitors in three queries, Pageviews in one."""
+    first, last = {}, {}
+    for hit in hits:
+        first.setdefault(hit.visitor_key, hit)
+        last[hit.visitor_key] = hit
+
+    existing = Visitor.objects.in_bulk(list(first))
+    Visitor.objects.bulk_create(
+        [
+            Visitor(
+                session_key=key,
+                ip_address=hit.ip_address,
+                user_agent=last[key].user_agent,
+                user_id=last[key].user_id,
+                start_time=hit.time,
+                time_on_site=int((last[key].time - hit.time).total_seconds()),
+            )
+            for key, hit in first.items()
+            if key not in existing
+        ],
+        ignore_conflicts=True,
+    )
+    for key, visitor in existing.items():
+        hit = last[key]
+        visitor.user_agent = hit.user_agent or visitor.user_agent
+        visitor.user_id = visitor.user_id or hit.user_id
+        visitor.time_on_site = int((hit.time - visitor.start_time).total_seconds())
+    Visitor.objects.bulk_update(
+        existing.values(), ["user_agent", "user", "time_on_site"]
+    )
+
+    if TRACK_PAGEVIEWS:
+        Pageview.objects.bulk_create(
+            Pageview(
+                visitor_id=hit.visitor_key,
+                url=hit.url,
+                method=hit.method,
+                referer=hit.referer,
+                query_string=hit.query_string,
+                view_time=hit.time,
+            )
+            for hit in hits
+        )
+
+
+class HitBuffer:
+    """
+    Hits waiting to be written. ``add`` only takes a lock and appends; the
+    writes happen on a daemon thread started by the first hit of the process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = []
+        self.wake = threading.Event()
+        self.pid = None
+
+    def add(self, hit):
+        with self.lock:
+            if self.pid != os.getpid():
+                # First hit of this (possibly forked) worker process.
+                self.pid = os.getpid()
+                self.hits = []
+                threading.Thread(target=self.run, daemon=True).start()
+            self.hits.append(hit)
+            if len(self.hits) >= settings.TRACK_FLUSH_SIZE:
+                self.wake.set()
+
+    def run(self):
+        while True:
+            self.wake.wait(settings.TRACK_FLUSH_SECONDS)
+            self.wake.clear()
+            self.flush()
+            connections.close_all()
+
+    def flush(self):
+        with self.lock:
+            hits, self.hits = self.hits, []
+        if not hits:
+            return
+        try:
+            save_hits(hits)
+        except Exception:
+            logger.exception("Could not save %d visitor tracking hits", len(hits))
+            with self.lock:
+                # Keep them for the next flush, but don't grow without bound
+                # while the database is down.
+                room = settings.TRACK_BUFFER_MAX - len(self.hits)
+                self.hits[:0] = hits[:room] if room > 0 else []
+
+
+buffer = HitBuffer()
+atexit.register(buffer.flush)
+
+
+def track(request, response):
+    """Buffers a hit for this request if it is tracked and sampled."""
+    if not should_track(request, response):
+        return
+    key = visitor_key(request)
+    if is_sampled(key):
+        buffer.add(make_hit(request, key))